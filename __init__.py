@@ -1,15 +1,34 @@
 """
 College Football Prediction Model Package
 
-A production-ready machine learning model for predicting college football 
+A production-ready machine learning model for predicting college football
 game outcomes using data from the College Football Data API.
+
+The exported classes are imported on first access so that importing the
+package (or running a CLI's --help) does not load pandas, sklearn or requests.
 """
 
+import importlib
+
 __version__ = "2.0.0"
 __author__ = "Zach Ring"
 
-from model import CFBModel
-from preprocessor import CFBPreprocessor
-from data_fetcher import CFBDataFetcher
+_EXPORTS = {
+    'CFBModel': 'model',
+    'CFBPreprocessor': 'preprocessor',
+    'CFBDataFetcher': 'data_fetcher',
+}
 
 __all__ = ['CFBModel', 'CFBPreprocessor', 'CFBDataFetcher']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
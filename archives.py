@@ -0,0 +1,232 @@
+"""
+Read the bundled data archives in place
+
+season_stats.zip, advanced_season_stats.zip and model_pack.zip are opened
+directly; macOS resource-fork entries (__MACOSX/, ._*) are ignored and a
+season's CSV is only decompressed and parsed when it is first requested.
+"""
+
+import logging
+import os
+import re
+import threading
+import zipfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+import schema
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEASON_STATS_ZIP = os.path.join(PACKAGE_DIR, "season_stats.zip")
+ADVANCED_SEASON_STATS_ZIP = os.path.join(PACKAGE_DIR, "advanced_season_stats.zip")
+MODEL_PACK_ZIP = os.path.join(PACKAGE_DIR, "model_pack.zip")
+
+TRAINING_DATA_MEMBER = "model_pack/training_data.csv"
+
+# Top-level directory or file name of a member -> schema table
+_MEMBER_TABLES = {
+    "season_stats": "season_stats",
+    "advanced_season_stats": "advanced_season_stats",
+    "advanced_game_stats": "advanced_game_stats",
+    "game_stats": "game_stats",
+    "drives": "drives",
+    "plays": "plays",
+    "training_data.csv": "training_data",
+}
+
+_SEASON_MEMBER = re.compile(r"(?:^|/)(\d{4})\.csv$")
+
+
+def is_resource_fork(name: str) -> bool:
+    """Check whether a zip entry is macOS metadata rather than data"""
+    return name.startswith("__MACOSX/") or os.path.basename(name).startswith("._")
+
+
+def table_for_member(member: str) -> Optional[str]:
+    """Schema table for an archive member, or None if it has no schema"""
+    for part in member.split("/"):
+        if part in _MEMBER_TABLES:
+            return _MEMBER_TABLES[part]
+    return None
+
+
+class BundledArchive:
+    """Lazy, cached reader for one of the bundled zip archives"""
+
+    def __init__(self, path: str):
+        """
+        Open an archive without extracting it
+
+        Args:
+            path: Path to the zip file
+
+        Raises:
+            FileNotFoundError: If the archive doesn't exist
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Archive not found: {path}")
+
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._lock = threading.Lock()
+        self._frames: Dict[Tuple[str, Optional[Tuple[str, ...]]], pd.DataFrame] = {}
+
+    def members(self) -> List[str]:
+        """Data files in the archive, excluding directories and resource forks"""
+        return [info.filename for info in self._zip.infolist()
+                if not info.is_dir() and not is_resource_fork(info.filename)]
+
+    def seasons(self) -> List[int]:
+        """Seasons available as <year>.csv members"""
+        found = []
+        for name in self.members():
+            match = _SEASON_MEMBER.search(name)
+            if match:
+                found.append(int(match.group(1)))
+        return sorted(found)
+
+    def season_member(self, season: int) -> str:
+        """
+        Name of the CSV member holding a season
+
+        Raises:
+            KeyError: If the season is not in the archive
+        """
+        for name in self.members():
+            match = _SEASON_MEMBER.search(name)
+            if match and int(match.group(1)) == season:
+                return name
+        raise KeyError(f"Season {season} not found in {self.path}. "
+                       f"Available: {self.seasons()}")
+
+    def read_csv(self, member: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Stream and parse one CSV member, caching the parsed result
+
+        Only this member is decompressed. Repeated calls return a copy of
+        the cached frame.
+
+        Args:
+            member: Name of the CSV inside the archive
+            columns: Columns to parse (default: all)
+
+        Returns:
+            DataFrame with the member's compact schema applied
+        """
+        if is_resource_fork(member):
+            raise KeyError(f"{member} is a macOS resource fork, not data")
+
+        key = (member, tuple(columns) if columns is not None else None)
+        with self._lock:
+            cached = self._frames.get(key)
+        if cached is None:
+            logger.info(f"Parsing {member} from {os.path.basename(self.path)}")
+            usecols = list(columns) if columns is not None else None
+            table = table_for_member(member)
+            with self._zip.open(member) as f:
+                if table is not None:
+                    cached = schema.read_csv(f, table, usecols=usecols)
+                else:
+                    cached = pd.read_csv(f, usecols=usecols)
+            with self._lock:
+                self._frames[key] = cached
+        return cached.copy()
+
+    def read_season(self, season: int, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Load a single season's CSV
+
+        Args:
+            season: Season year
+            columns: Columns to parse (default: all)
+
+        Returns:
+            DataFrame for that season only
+        """
+        return self.read_csv(self.season_member(season), columns=columns)
+
+    def read_seasons(self, seasons: Iterable[int],
+                     columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Load and concatenate several seasons"""
+        frames = [self.read_season(season, columns=columns) for season in seasons]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def clear_cache(self):
+        """Drop all parsed frames"""
+        with self._lock:
+            self._frames.clear()
+
+    def close(self):
+        """Close the underlying zip file"""
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_open_archives: Dict[str, BundledArchive] = {}
+_open_archives_lock = threading.Lock()
+
+
+def open_archive(path: str) -> BundledArchive:
+    """
+    Shared BundledArchive for a path, so parsed frames are reused across calls
+
+    Args:
+        path: Path to the zip file
+
+    Returns:
+        BundledArchive instance
+    """
+    path = os.path.abspath(path)
+    with _open_archives_lock:
+        archive = _open_archives.get(path)
+        if archive is None:
+            archive = BundledArchive(path)
+            _open_archives[path] = archive
+    return archive
+
+
+def load_season_stats(season: int, columns: Optional[Sequence[str]] = None,
+                      path: str = SEASON_STATS_ZIP) -> pd.DataFrame:
+    """Season team stats (season_stats/<year>.csv) for one season"""
+    return open_archive(path).read_season(season, columns=columns)
+
+
+def load_advanced_season_stats(season: int, columns: Optional[Sequence[str]] = None,
+                               path: str = ADVANCED_SEASON_STATS_ZIP) -> pd.DataFrame:
+    """Advanced season stats (advanced_season_stats/<year>.csv) for one season"""
+    return open_archive(path).read_season(season, columns=columns)
+
+
+def load_training_data(seasons: Optional[Iterable[int]] = None,
+                       columns: Optional[Sequence[str]] = None,
+                       path: str = MODEL_PACK_ZIP) -> pd.DataFrame:
+    """
+    Model pack training data (model_pack/training_data.csv)
+
+    All seasons share one CSV, so it is parsed once and cached; season
+    selection is applied to the cached frame.
+
+    Args:
+        seasons: Seasons to keep (default: all)
+        columns: Columns to parse (default: all)
+        path: Path to model_pack.zip
+
+    Returns:
+        Training data DataFrame
+    """
+    if columns is not None and seasons is not None and "season" not in columns:
+        columns = list(columns) + ["season"]
+    df = open_archive(path).read_csv(TRAINING_DATA_MEMBER, columns=columns)
+    if seasons is not None:
+        df = df[df["season"].isin(list(seasons))].reset_index(drop=True)
+    return df
@@ -0,0 +1,271 @@
+"""
+Memory-mapped model artifacts
+
+An artifact is a directory holding a compiled tree ensemble (see
+tree_compiler) as one uncompressed .npy file per node array, plus a small
+manifest.json with the feature names, a hash of the training data, the
+training metrics and the blob files:
+
+    cfb_model/
+        manifest.json
+        v-3f9a1c0e5b2d/
+            feature.npy  threshold.npy  children.npy  value.npy  ...
+
+Each save writes its blobs to a new version subdirectory and then switches
+to it by atomically replacing manifest.json, so the path always holds a
+complete artifact.
+
+Loading memory-maps the arrays instead of unpickling an estimator, so it is
+close to instant and concurrent prediction processes share the same pages of
+the OS page cache.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from tree_compiler import CompiledEnsemble, compile_ensemble
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+# CompiledEnsemble arguments kept in the manifest rather than as blobs
+_MANIFEST_FIELDS = ('kind', 'max_depth', 'learning_rate', 'feature_names', 'classes')
+VERSION_PREFIX = "v-"
+
+
+def data_hash(X: pd.DataFrame, y=None) -> str:
+    """
+    Content hash of a feature matrix (and target)
+
+    Args:
+        X: Feature matrix; column names are part of the hash
+        y: Optional target aligned with X
+
+    Returns:
+        Hex sha256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, X.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    if y is not None:
+        digest.update(np.asarray(y).tobytes())
+    return digest.hexdigest()
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _jsonable(value):
+    """Convert numpy scalars/arrays (e.g. in training metrics) to JSON types"""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def check_features(expected: Iterable[str], actual: Iterable[str]):
+    """
+    Raise if two feature lists don't contain the same columns
+
+    Raises:
+        ValueError: Naming the missing and unexpected columns
+    """
+    expected, actual = list(expected), list(actual)
+    missing = [f for f in expected if f not in set(actual)]
+    unexpected = [f for f in actual if f not in set(expected)]
+    if missing or unexpected:
+        raise ValueError(f"Feature mismatch with the trained model: missing {missing}, "
+                         f"unexpected {unexpected}")
+
+
+class ModelArtifact:
+    """A loaded artifact: its manifest and the (memory-mapped) ensemble"""
+
+    def __init__(self, path: str, manifest: Dict[str, Any], ensemble: CompiledEnsemble):
+        self.path = path
+        self.manifest = manifest
+        self.ensemble = ensemble
+
+    @property
+    def feature_names(self):
+        return self.manifest['feature_names']
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        return self.manifest.get('metrics', {})
+
+    def verify(self) -> bool:
+        """Re-hash every blob and compare with the manifest"""
+        for name, info in self.manifest['arrays'].items():
+            if _file_hash(os.path.join(self.path, info['file'])) != info['sha256']:
+                logger.warning(f"Artifact blob {info['file']} does not match its manifest hash")
+                return False
+        return True
+
+
+def save_artifact(model, path: str, metrics: Optional[Dict[str, Any]] = None,
+                  training_hash: Optional[str] = None, model_type: Optional[str] = None) -> str:
+    """
+    Write a fitted ensemble as an artifact directory
+
+    The blobs go to a new version subdirectory, and replacing manifest.json
+    (a single atomic rename) switches readers to them, so readers never see
+    a half-written artifact. The previous version is kept for readers that
+    read the old manifest just before the switch; older ones are removed.
+
+    Args:
+        model: Fitted CFBModel, sklearn ensemble or CompiledEnsemble
+        path: Artifact directory (its artifact is replaced if it exists)
+        metrics: Training metrics to record (e.g. CFBModel.train output)
+        training_hash: data_hash() of the training data
+        model_type: Model type to record (default: CFBModel.model_type)
+
+    Returns:
+        The artifact path
+    """
+    ensemble = model if isinstance(model, CompiledEnsemble) else compile_ensemble(model)
+    if ensemble.feature_names is None:
+        raise ValueError("Model must be trained on a DataFrame so feature names can be recorded")
+
+    path = os.path.normpath(path)
+    previous = _read_json(os.path.join(path, MANIFEST_NAME))
+    tmp_path = os.path.join(path, f"{VERSION_PREFIX}tmp-{os.getpid()}")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    fields = ensemble.arrays()
+    blobs = {}
+    for name, array in fields.items():
+        if name in _MANIFEST_FIELDS:
+            continue
+        filename = f"{name}.npy"
+        np.save(os.path.join(tmp_path, filename), np.ascontiguousarray(array))
+        blobs[name] = {'file': filename, 'dtype': str(array.dtype), 'shape': list(array.shape),
+                       'sha256': _file_hash(os.path.join(tmp_path, filename))}
+
+    # Versions are named by content, so saving the same model twice reuses
+    # the blobs instead of rewriting files a reader may have mapped
+    digest = hashlib.sha256(json.dumps(blobs, sort_keys=True).encode()).hexdigest()
+    version = f"{VERSION_PREFIX}{digest[:12]}"
+    if os.path.isdir(os.path.join(path, version)):
+        shutil.rmtree(tmp_path)
+    else:
+        os.replace(tmp_path, os.path.join(path, version))
+    for info in blobs.values():
+        info['file'] = f"{version}/{info['file']}"
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'model_type': model_type or getattr(model, 'model_type', None),
+        'kind': ensemble.kind,
+        'classes': _jsonable(ensemble.classes_),
+        'feature_names': ensemble.feature_names,
+        'max_depth': ensemble.max_depth,
+        'learning_rate': ensemble.learning_rate,
+        'n_trees': ensemble.n_trees,
+        'training_data_hash': training_hash,
+        'metrics': _jsonable(metrics or {}),
+        'arrays': blobs,
+    }
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    tmp_manifest = f"{manifest_path}.tmp-{os.getpid()}"
+    with open(tmp_manifest, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_manifest, manifest_path)
+
+    # Readers holding maps of removed blobs keep them
+    keep = {_blob_dir(info['file']) for m in (manifest, previous) if m for info in m['arrays'].values()}
+    for entry in os.listdir(path):
+        if entry not in keep and (entry.startswith(VERSION_PREFIX) or entry.endswith('.npy')):
+            target = os.path.join(path, entry)
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            else:
+                os.remove(target)
+    logger.info(f"Saved model artifact ({ensemble.n_trees} trees) to {path}")
+    return path
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _blob_dir(file: str) -> str:
+    """Top-level entry of an artifact holding a blob (its version directory)"""
+    return file.split('/', 1)[0]
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """
+    Read an artifact's manifest without touching the blobs
+
+    Raises:
+        FileNotFoundError: If path is not an artifact directory
+        ValueError: If the artifact format is not supported
+    """
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"Model artifact not found: {path}")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version: {manifest.get('format_version')}")
+    return manifest
+
+
+def is_artifact(path: str) -> bool:
+    """Whether path is an artifact directory"""
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+
+def load_artifact(path: str, feature_names: Optional[Iterable[str]] = None,
+                  mmap: bool = True) -> ModelArtifact:
+    """
+    Load an artifact, memory-mapping its arrays
+
+    Args:
+        path: Artifact directory
+        feature_names: Columns the caller will predict with; checked against
+            the manifest before any blob is opened
+        mmap: Memory-map the blobs (False reads them into memory)
+
+    Returns:
+        ModelArtifact
+
+    Raises:
+        ValueError: If feature_names doesn't match the trained features
+    """
+    manifest = read_manifest(path)
+    if feature_names is not None:
+        check_features(manifest['feature_names'], feature_names)
+
+    fields = {name: manifest[name] for name in _MANIFEST_FIELDS}
+    for name, info in manifest['arrays'].items():
+        fields[name] = np.load(os.path.join(path, info['file']), mmap_mode='r' if mmap else None)
+    ensemble = CompiledEnsemble(**fields)
+    logger.info(f"Loaded model artifact from {path} ({manifest['n_trees']} trees)")
+    return ModelArtifact(path, manifest, ensemble)
@@ -0,0 +1,159 @@
+"""
+Concurrent College Football Data API client for multi-season pulls
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+import config
+from data_fetcher import CFBDataFetcher
+from rate_limiter import TokenBucketRateLimiter
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Endpoint name -> CFBDataFetcher method
+ENDPOINT_METHODS = {
+    "games": "get_games",
+    "team_stats": "get_team_stats",
+    "talent": "get_team_talent",
+    "records": "get_team_records",
+    "lines": "get_betting_lines",
+}
+
+# Endpoints that can be split into one request per week
+WEEKLY_ENDPOINTS = {"games", "lines"}
+
+
+class AsyncCFBDataFetcher:
+    """Asyncio client that runs CFBDataFetcher requests concurrently"""
+
+    def __init__(self, api_key: str, max_concurrency: int = config.API_MAX_CONCURRENCY,
+                 **fetcher_kwargs):
+        """
+        Initialize the async fetcher
+
+        Requests are issued through a regular CFBDataFetcher, so retries,
+        validation, caching and the returned DataFrames are identical to
+        the synchronous client. Unless one is passed in, a rate limiter
+        built from config is attached so bulk pulls stay under the quota.
+
+        Args:
+            api_key: Your College Football Data API key
+            max_concurrency: Maximum number of requests in flight at once
+            **fetcher_kwargs: Extra arguments passed to CFBDataFetcher
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1. Got {max_concurrency}")
+
+        self.max_concurrency = max_concurrency
+        fetcher_kwargs.setdefault("rate_limiter", TokenBucketRateLimiter())
+        self.fetcher = CFBDataFetcher(api_key, max_connections=max_concurrency, **fetcher_kwargs)
+        # The executor size is the in-flight request cap
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="cfbd-fetch")
+
+    async def fetch(self, endpoint: str, **kwargs) -> pd.DataFrame:
+        """
+        Fetch a single endpoint without blocking the event loop
+
+        Args:
+            endpoint: One of "games", "team_stats", "talent", "records", "lines"
+            **kwargs: Arguments for the matching CFBDataFetcher method
+
+        Returns:
+            DataFrame returned by the CFBDataFetcher method
+        """
+        if endpoint not in ENDPOINT_METHODS:
+            raise ValueError(f"Unknown endpoint: {endpoint}. "
+                             f"Must be one of {sorted(ENDPOINT_METHODS)}")
+
+        method = getattr(self.fetcher, ENDPOINT_METHODS[endpoint])
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, **kwargs))
+
+    async def fetch_many(self, requests: Iterable[Tuple[str, Dict]]) -> List[pd.DataFrame]:
+        """
+        Fetch many endpoint requests concurrently
+
+        Args:
+            requests: (endpoint, kwargs) pairs
+
+        Returns:
+            DataFrames in the same order as the requests
+        """
+        tasks = [self.fetch(endpoint, **kwargs) for endpoint, kwargs in requests]
+        return list(await asyncio.gather(*tasks))
+
+    async def fetch_seasons(self, years: Iterable[int],
+                            endpoints: Iterable[str] = tuple(ENDPOINT_METHODS),
+                            weeks: Optional[Iterable[int]] = None
+                            ) -> Dict[Tuple[str, int, Optional[int]], pd.DataFrame]:
+        """
+        Fetch several endpoints for many seasons (and optionally weeks) at once
+
+        Args:
+            years: Season years
+            endpoints: Endpoint names to fetch for every season
+            weeks: Week numbers; games and lines are then fetched per week
+
+        Returns:
+            Dictionary keyed by (endpoint, year, week) with week None for
+            season-level requests
+        """
+        weeks = list(weeks) if weeks is not None else None
+        keys = []
+        requests = []
+        for year in years:
+            for endpoint in endpoints:
+                if weeks and endpoint in WEEKLY_ENDPOINTS:
+                    for week in weeks:
+                        keys.append((endpoint, year, week))
+                        requests.append((endpoint, {"year": year, "week": week}))
+                else:
+                    keys.append((endpoint, year, None))
+                    requests.append((endpoint, {"year": year}))
+
+        logger.info(f"Fetching {len(requests)} requests with up to "
+                    f"{self.max_concurrency} in flight")
+        results = await self.fetch_many(requests)
+        return dict(zip(keys, results))
+
+    def close(self):
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def fetch_seasons(api_key: str, years: Iterable[int],
+                  endpoints: Iterable[str] = tuple(ENDPOINT_METHODS),
+                  weeks: Optional[Iterable[int]] = None,
+                  max_concurrency: int = config.API_MAX_CONCURRENCY,
+                  **fetcher_kwargs) -> Dict[Tuple[str, int, Optional[int]], pd.DataFrame]:
+    """
+    Blocking helper that runs AsyncCFBDataFetcher.fetch_seasons to completion
+
+    Args:
+        api_key: Your College Football Data API key
+        years: Season years
+        endpoints: Endpoint names to fetch for every season
+        weeks: Week numbers; games and lines are then fetched per week
+        max_concurrency: Maximum number of requests in flight at once
+        **fetcher_kwargs: Extra arguments passed to CFBDataFetcher
+
+    Returns:
+        Dictionary keyed by (endpoint, year, week)
+    """
+    with AsyncCFBDataFetcher(api_key, max_concurrency=max_concurrency, **fetcher_kwargs) as client:
+        return asyncio.run(client.fetch_seasons(years, endpoints=endpoints, weeks=weeks))
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Season-aware walk-forward backtesting
+
+Seasons are replayed week by week: for every week W the model is trained on
+all games before W (including earlier seasons) and scored on W's games.
+Folds are independent, so they run on a process pool. The feature matrix is
+sorted chronologically and cached once as .npy files; each fold's training
+set is then just a prefix of it, and workers memory-map the cache instead
+of receiving their own copy.
+"""
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss
+
+import config
+from artifact import data_hash
+from model import CFBModel
+from rolling_features import game_rounds
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# model_pack/training_data.csv columns that are identifiers or outcomes
+MODEL_PACK_NON_FEATURES = [
+    'id', 'start_date', 'season', 'season_type', 'week', 'home_team', 'home_conference',
+    'away_team', 'away_conference', 'home_points', 'away_points', 'margin',
+]
+
+# Arrays shared with the fold functions; set once per worker process
+_fold_data: Dict[str, np.ndarray] = {}
+
+
+def cache_feature_matrix(X: pd.DataFrame, y: pd.Series,
+                         cache_dir: str = config.BACKTEST_CACHE_DIR) -> Tuple[str, str]:
+    """
+    Write X (float32) and y to .npy files keyed by their content
+
+    Args:
+        X: Chronologically sorted feature matrix
+        y: Target aligned with X
+        cache_dir: Directory for the cached matrices
+
+    Returns:
+        Paths of the X and y files (existing files are reused)
+    """
+    key = data_hash(X, y)[:16]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    x_path = os.path.join(cache_dir, f"{key}_X.npy")
+    y_path = os.path.join(cache_dir, f"{key}_y.npy")
+    if os.path.exists(x_path) and os.path.exists(y_path):
+        logger.info(f"Reusing cached feature matrix {key}")
+        return x_path, y_path
+
+    for path, array in ((x_path, X.to_numpy(dtype=np.float32)), (y_path, np.asarray(y, dtype=np.int8))):
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+    logger.info(f"Cached {X.shape[0]}x{X.shape[1]} feature matrix as {key}")
+    return x_path, y_path
+
+
+def walk_forward_folds(df: pd.DataFrame, seasons: Iterable[int],
+                       min_train_games: int = config.BACKTEST_MIN_TRAIN_GAMES
+                       ) -> List[Dict[str, int]]:
+    """
+    Fold boundaries for a chronologically sorted frame
+
+    Args:
+        df: Games sorted by season and round (see sort_chronologically)
+        seasons: Seasons whose weeks are scored
+        min_train_games: Skip weeks with less training history than this
+
+    Returns:
+        List of folds with season, week, train_stop, test_start and test_stop
+        row positions; training uses rows [0, train_stop)
+    """
+    seasons = set(seasons)
+    keys = pd.DataFrame({'season': df['season'].to_numpy(), 'round': game_rounds(df),
+                         'week': df['week'].to_numpy()})
+    starts = keys.drop_duplicates(['season', 'round']).index
+    folds = []
+    for i, start in enumerate(starts):
+        stop = starts[i + 1] if i + 1 < len(starts) else len(keys)
+        season = int(keys.at[start, 'season'])
+        if season not in seasons:
+            continue
+        if start < min_train_games:
+            logger.info(f"Skipping {season} round {keys.at[start, 'round']}: only {start} training games")
+            continue
+        folds.append({'season': season, 'week': int(keys.at[start, 'week']),
+                      'round': int(keys.at[start, 'round']),
+                      'train_stop': int(start), 'test_start': int(start), 'test_stop': int(stop)})
+    return folds
+
+
+def sort_chronologically(df: pd.DataFrame) -> pd.DataFrame:
+    """Games ordered by season, then round (regular season before postseason)"""
+    order = np.lexsort((game_rounds(df), df['season'].to_numpy()))
+    return df.iloc[order].reset_index(drop=True)
+
+
+def _init_worker(x_path: str, y_path: str):
+    """Memory-map the cached matrices once per worker process"""
+    _fold_data['X'] = np.load(x_path, mmap_mode='r')
+    _fold_data['y'] = np.load(y_path, mmap_mode='r')
+
+
+def _run_fold(fold: Dict[str, int], model_type: str) -> Dict[str, float]:
+    """Train on everything before the fold's week and score that week"""
+    X, y = _fold_data['X'], _fold_data['y']
+    X_train, y_train = X[:fold['train_stop']], y[:fold['train_stop']]
+    X_test, y_test = X[fold['test_start']:fold['test_stop']], y[fold['test_start']:fold['test_stop']]
+
+    estimator = CFBModel(model_type=model_type).model
+    estimator.fit(X_train, y_train)
+    proba = np.zeros(len(y_test))
+    if 1 in estimator.classes_:
+        proba = estimator.predict_proba(X_test)[:, list(estimator.classes_).index(1)]
+
+    return {
+        'season': fold['season'],
+        'week': fold['week'],
+        'round': fold['round'],
+        'n_train': len(y_train),
+        'n_games': len(y_test),
+        'accuracy': accuracy_score(y_test, (proba > 0.5).astype(int)),
+        'log_loss': log_loss(y_test, np.clip(proba, 1e-15, 1 - 1e-15), labels=[0, 1]),
+        'brier': brier_score_loss(y_test, proba, pos_label=1),
+    }
+
+
+def backtest(df: pd.DataFrame, feature_cols: Sequence[str], target: pd.Series,
+             seasons: Iterable[int], model_type: str = "random_forest",
+             max_workers: Optional[int] = None,
+             min_train_games: int = config.BACKTEST_MIN_TRAIN_GAMES,
+             cache_dir: str = config.BACKTEST_CACHE_DIR) -> pd.DataFrame:
+    """
+    Walk-forward backtest: train before week W, predict week W
+
+    Args:
+        df: Games with season, week and the feature columns (any order)
+        feature_cols: Columns used as model features; they must describe the
+            game before kickoff (e.g. rolling features)
+        target: Binary outcome aligned with df (1 = home win)
+        seasons: Seasons to score week by week
+        model_type: CFBModel model type
+        max_workers: Worker processes (default: all cores; 1 runs in-process)
+        min_train_games: Skip weeks with less training history than this
+        cache_dir: Directory for the cached feature matrix
+
+    Returns:
+        DataFrame with one row per scored week: season, week, n_train,
+        n_games, accuracy, log_loss and brier
+    """
+    if df.empty:
+        raise ValueError("df cannot be empty")
+    if len(df) != len(target):
+        raise ValueError(f"df and target must have same length. Got df={len(df)}, target={len(target)}")
+
+    data = df.assign(_target=np.asarray(target))
+    data = sort_chronologically(data)
+    folds = walk_forward_folds(data, seasons, min_train_games=min_train_games)
+    if not folds:
+        raise ValueError("No weeks to backtest; check seasons and min_train_games")
+
+    x_path, y_path = cache_feature_matrix(data[list(feature_cols)].astype(np.float32),
+                                          data['_target'], cache_dir)
+    # Largest training sets first keeps the pool busy until the end
+    folds.sort(key=lambda fold: -fold['train_stop'])
+    logger.info(f"Backtesting {len(folds)} weeks with {model_type}")
+    start = time.time()
+
+    if max_workers == 1:
+        _init_worker(x_path, y_path)
+        results = [_run_fold(fold, model_type) for fold in folds]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(x_path, y_path)) as pool:
+            results = list(pool.map(_run_fold, folds, [model_type] * len(folds)))
+
+    logger.info(f"Backtest finished in {time.time() - start:.1f}s")
+    results = pd.DataFrame(results).sort_values(['season', 'round']).reset_index(drop=True)
+    return results.drop(columns='round')
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Game-weighted metrics per season plus an overall row
+
+    Args:
+        results: Output of backtest()
+
+    Returns:
+        DataFrame indexed by season (and "all") with games, accuracy,
+        log_loss and brier
+    """
+    metrics = ['accuracy', 'log_loss', 'brier']
+    weighted = results[metrics].multiply(results['n_games'], axis=0)
+    weighted['n_games'] = results['n_games']
+    weighted['season'] = results['season'].astype(str)
+    totals = weighted.groupby('season').sum()
+    totals.loc['all'] = weighted.drop(columns='season').sum()
+    summary = totals[metrics].divide(totals['n_games'], axis=0)
+    summary.insert(0, 'games', totals['n_games'].astype(int))
+    return summary
+
+
+def load_model_pack(seasons: Optional[Iterable[int]] = None
+                    ) -> Tuple[pd.DataFrame, List[str], pd.Series]:
+    """
+    Bundled model pack training data ready for backtest()
+
+    Every row's statistics only use games played before it, so all
+    non-identifier, non-outcome columns are usable features.
+
+    Returns:
+        Tuple of (games, feature columns, target); the target is 1 when
+        home_points > away_points (a home win), computed from the final
+        scores rather than from margin
+    """
+    import archives
+
+    df = archives.load_training_data(seasons=seasons)
+    feature_cols = [c for c in df.columns
+                    if c not in MODEL_PACK_NON_FEATURES
+                    and (pd.api.types.is_numeric_dtype(df[c]) or pd.api.types.is_bool_dtype(df[c]))]
+    # Home win from the final scores (margin is away minus home and not used)
+    return df, feature_cols, (df['home_points'] > df['away_points']).astype(int)
+
+
+def main():
+    """Backtest the bundled model pack data from the command line"""
+    parser = argparse.ArgumentParser(description="Walk-forward backtest on the bundled model pack")
+    parser.add_argument("--start", type=int, default=2016, help="First season to score")
+    parser.add_argument("--end", type=int, default=2024, help="Last season to score")
+    parser.add_argument("--model-type", default="random_forest",
+                        help="Model type (random_forest, gradient_boosting, "
+                             "hist_gradient_boosting, logistic_regression or stacked_ensemble)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", help="Write per-week results to this CSV file")
+    args = parser.parse_args()
+
+    df, feature_cols, target = load_model_pack()
+    results = backtest(df, feature_cols, target, range(args.start, args.end + 1),
+                       model_type=args.model_type, max_workers=args.workers)
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Per-week results saved to {args.output}")
+
+    print(summarize(results).to_string(float_format=lambda v: f"{v:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
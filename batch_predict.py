@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Batch predictions for ranges of seasons and weeks
+
+run_weekly_predictions.py and run_predictions_with_outputs.py score a single
+week and fetch everything that week needs again on every run. This runner
+does one pass per season instead:
+
+    1. Fetch the season's games, team stats and talent (or the per-game
+       stats for rolling features) once.
+    2. Build the features for every requested week in one call.
+    3. Score the weeks on a process pool. Each worker loads the model once;
+       artifact directories are memory-mapped, so that load is cheap.
+
+Each week is written as its own partition, in the same JSON/CSV format as
+run_predictions_with_outputs.py:
+
+    predictions/season=2024/week=5/predictions.json
+    predictions/season=2024/week=5/predictions.csv
+
+Regenerating a season of historical predictions is then one command:
+
+    python batch_predict.py --years 2024 --weeks 1-15 --model-path cfb_model
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import config
+from weeks import parse_range
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Model shared with the scoring function; set once per worker process
+_worker: Dict[str, Any] = {}
+
+
+def prediction_records(games, predictions, probabilities, confidence) -> List[Dict[str, Any]]:
+    """
+    Output rows for scored games (the run_predictions_with_outputs.py format)
+
+    Args:
+        games: Games DataFrame, row-aligned with the predictions
+        predictions: Predicted classes (1 = home win)
+        probabilities: (n_games, 2) class probabilities
+        confidence: Probability of the predicted winner
+
+    Returns:
+        One dict per game with percentages rounded to two decimals
+    """
+    records = []
+    for i, (_, game) in enumerate(games.iterrows()):
+        # Handle different column name formats
+        home = game.get('home_team', game.get('homeTeam', 'Unknown'))
+        away = game.get('away_team', game.get('awayTeam', 'Unknown'))
+        records.append({
+            "game_number": i + 1,
+            "home_team": home,
+            "away_team": away,
+            "start_date": game.get('start_date', game.get('startDate', '')),
+            "predicted_winner": home if predictions[i] == 1 else away,
+            "confidence": round(float(confidence[i]) * 100, 2),
+            "home_win_probability": round(float(probabilities[i][1]) * 100, 2),
+            "away_win_probability": round(float(probabilities[i][0]) * 100, 2),
+        })
+    return records
+
+
+def partition_dir(output_dir: str, season: int, week: int) -> str:
+    """Directory of a season/week partition"""
+    return os.path.join(output_dir, f"season={season}", f"week={week}")
+
+
+def write_partition(directory: str, output_data: Dict[str, Any]) -> None:
+    """Write predictions.json and predictions.csv for one week (atomically)"""
+    import pandas as pd
+
+    os.makedirs(directory, exist_ok=True)
+    json_path = os.path.join(directory, "predictions.json")
+    csv_path = os.path.join(directory, "predictions.csv")
+    with open(f"{json_path}.tmp", 'w') as f:
+        json.dump(output_data, f, indent=2)
+    pd.DataFrame(output_data['predictions']).to_csv(f"{csv_path}.tmp", index=False)
+    os.replace(f"{json_path}.tmp", json_path)
+    os.replace(f"{csv_path}.tmp", csv_path)
+
+
+def _init_worker(model_path: str):
+    from model import CFBModel
+
+    model = CFBModel()
+    model.load(model_path)
+    _worker['model'] = model
+    _worker['model_path'] = model_path
+
+
+def _score_week(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Score one week's feature rows and write its partition"""
+    model = _worker['model']
+    predictions, probabilities, confidence = model.predict_with_confidence(task['X'])
+    output_data = {
+        "metadata": {
+            "year": task['season'],
+            "week": task['week'],
+            "generated_at": datetime.now().isoformat(),
+            "model_path": _worker['model_path'],
+            "games_found": len(task['games']),
+            "model_type": model.model_type,
+        },
+        "predictions": prediction_records(task['games'], predictions, probabilities, confidence),
+    }
+    write_partition(task['directory'], output_data)
+    return {'season': task['season'], 'week': task['week'], 'games': len(task['games']),
+            'path': task['directory']}
+
+
+def season_tasks(fetcher, preprocessor, season: int, weeks: Optional[Iterable[int]],
+                 output_dir: str, categorical: bool = False,
+                 rolling_features: bool = False) -> List[Dict[str, Any]]:
+    """
+    Fetch a season's inputs once and split its feature matrix into weeks
+
+    Args:
+        fetcher: CFBDataFetcher instance
+        preprocessor: CFBPreprocessor instance
+        season: Season year
+        weeks: Weeks to score (default: every week with games)
+        output_dir: Root of the partitioned output
+        categorical: Model was trained with categorical features
+        rolling_features: Use point-in-time rolling features
+
+    Returns:
+        One scoring task per week with games
+    """
+    from run_weekly_predictions import fetch_season_inputs
+
+    weeks = None if weeks is None else sorted(set(weeks))
+    # Rolling features for week W are built from every earlier week
+    fetch_weeks = None if weeks is None else range(0, max(weeks) + 1)
+    inputs, prepare_features = fetch_season_inputs(fetcher, preprocessor, season,
+                                                   rolling_features, weeks=fetch_weeks)
+    games = inputs['games'].reset_index(drop=True)
+    if games.empty:
+        logger.warning(f"No games found for the {season} season")
+        return []
+
+    X, _ = preprocessor.create_training_data(prepare_features(), categorical=categorical)
+    game_weeks = games['week'].to_numpy()
+    tasks = []
+    for week in (weeks if weeks is not None else sorted(set(game_weeks))):
+        rows = game_weeks == week
+        if not rows.any():
+            logger.info(f"No games in week {week} of {season}")
+            continue
+        tasks.append({'season': season, 'week': int(week), 'X': X[rows].reset_index(drop=True),
+                      'games': games[rows].reset_index(drop=True),
+                      'directory': partition_dir(output_dir, season, int(week))})
+    return tasks
+
+
+def batch_predict(fetcher, model_path: str, seasons: Iterable[int],
+                  weeks: Optional[Iterable[int]] = None,
+                  output_dir: str = config.BATCH_OUTPUT_DIR,
+                  max_workers: Optional[int] = config.BATCH_MAX_WORKERS,
+                  rolling_features: bool = False):
+    """
+    Predict every requested week of every requested season
+
+    Args:
+        fetcher: CFBDataFetcher instance
+        model_path: Trained model file or artifact directory
+        seasons: Seasons to predict
+        weeks: Weeks to predict in each season (default: all)
+        output_dir: Root of the partitioned output
+        max_workers: Worker processes (default: all cores; 1 runs in-process)
+        rolling_features: Use point-in-time rolling features (the model must
+            have been trained with them)
+
+    Returns:
+        DataFrame with season, week, games and path for each partition written
+    """
+    import pandas as pd
+    from model import CFBModel
+    from preprocessor import CFBPreprocessor
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model not found: {model_path}")
+    model = CFBModel()
+    model.load(model_path)
+    preprocessor = CFBPreprocessor()
+
+    start = time.time()
+    tasks = []
+    for season in seasons:
+        tasks.extend(season_tasks(fetcher, preprocessor, season, weeks, output_dir,
+                                  categorical=model.categorical_features,
+                                  rolling_features=rolling_features))
+    logger.info(f"Built features for {len(tasks)} weeks in {time.time() - start:.1f}s")
+
+    if not tasks:
+        results = []
+    elif max_workers == 1 or len(tasks) == 1:
+        _worker.update(model=model, model_path=model_path)
+        results = [_score_week(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(model_path,)) as pool:
+            results = list(pool.map(_score_week, tasks))
+
+    logger.info(f"Wrote {len(results)} week partitions to {output_dir} in {time.time() - start:.1f}s")
+    return pd.DataFrame(results, columns=['season', 'week', 'games', 'path'])
+
+
+def main():
+    """Predict ranges of seasons and weeks from the command line"""
+    parser = argparse.ArgumentParser(description="Batch CFB predictions for ranges of seasons and weeks")
+    parser.add_argument("--api-key", default=os.environ.get("CFB_API_KEY"),
+                        help="College Football Data API key (or CFB_API_KEY)")
+    parser.add_argument("--years", required=True, help='Seasons, e.g. "2024" or "2022-2024"')
+    parser.add_argument("--weeks", help='Weeks, e.g. "1-15" or "1-4,8" (default: all weeks with games)')
+    parser.add_argument("--model-path", default="cfb_model.pkl", help="Trained model or artifact directory")
+    parser.add_argument("--output-dir", default=config.BATCH_OUTPUT_DIR, help="Root of the per-week partitions")
+    parser.add_argument("--workers", type=int, default=config.BATCH_MAX_WORKERS,
+                        help="Worker processes (default: all cores)")
+    parser.add_argument("--rolling-features", action="store_true",
+                        help="Use point-in-time rolling features (model must be trained with them)")
+    parser.add_argument("--cache-dir", default=os.environ.get("CFB_CACHE_DIR", config.CACHE_DIR),
+                        help="Directory for cached API responses")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the API response cache")
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("API key required. Set CFB_API_KEY or use --api-key")
+    try:
+        seasons = parse_range(args.years)
+        weeks = parse_range(args.weeks) if args.weeks else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    from cache import ResponseCache
+    from data_fetcher import CFBDataFetcher
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    fetcher = CFBDataFetcher(args.api_key, cache=cache)
+    try:
+        results = batch_predict(fetcher, args.model_path, seasons, weeks, args.output_dir,
+                                max_workers=args.workers, rolling_features=args.rolling_features)
+    except FileNotFoundError as e:
+        print(f"✗ {e}\n\nTip: Train a model first with run_weekly_predictions.py --train")
+        sys.exit(1)
+
+    if results.empty:
+        print("No games found for the requested seasons and weeks.")
+        return
+    print(results.drop(columns='path').to_string(index=False))
+    print(f"\n✓ {results['games'].sum()} predictions in {len(results)} partitions under {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
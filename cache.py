@@ -0,0 +1,222 @@
+"""
+On-disk response cache for the College Football Data API client
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def is_completed_season(year: int, now: Optional[datetime] = None) -> bool:
+    """
+    Check whether a season is over and its data is frozen
+
+    Bowl games run into January, so season Y is only treated as complete
+    from February of Y + 1 onwards.
+
+    Args:
+        year: Season year
+        now: Reference time (default: current time)
+
+    Returns:
+        True if the season has finished
+    """
+    now = now or datetime.now()
+    return year < now.year - 1 or (year == now.year - 1 and now.month >= 2)
+
+
+def ttl_for(endpoint: str, params: Optional[Dict[str, Any]] = None,
+            now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Time-to-live for a cached response
+
+    Args:
+        endpoint: API path, e.g. "/games"
+        params: Query parameters of the request
+        now: Reference time (default: current time)
+
+    Returns:
+        TTL in seconds, or None if the response never expires
+    """
+    year = (params or {}).get("year")
+    if year is not None and is_completed_season(int(year), now):
+        return None
+    return config.CACHE_TTL_SECONDS.get(endpoint, config.CACHE_DEFAULT_TTL_SECONDS)
+
+
+class ResponseCache:
+    """Size-bounded on-disk cache of JSON API responses keyed by endpoint and params"""
+
+    def __init__(self, cache_dir: str = config.CACHE_DIR,
+                 max_bytes: int = config.CACHE_MAX_BYTES):
+        """
+        Initialize the response cache
+
+        Args:
+            cache_dir: Directory to store cached responses in
+            max_bytes: Maximum total size of the cache before eviction
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive. Got {max_bytes}")
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Stable cache key for an endpoint and its query parameters"""
+        payload = json.dumps([endpoint, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response, fresh or stale
+
+        Args:
+            endpoint: API path
+            params: Query parameters
+
+        Returns:
+            Cache entry dict, or None on a miss
+        """
+        path = self._path(self.make_key(endpoint, params))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+
+        # Bump mtime so eviction drops the least recently used entries first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Check whether a cache entry is still within its TTL"""
+        ttl = entry.get("ttl")
+        if ttl is None:
+            return True
+        now = time.time() if now is None else now
+        return now - entry["stored_at"] < ttl
+
+    def set(self, endpoint: str, params: Optional[Dict[str, Any]], data: Any,
+            ttl: Optional[float] = None, etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """
+        Store a response in the cache
+
+        Args:
+            endpoint: API path
+            params: Query parameters
+            data: Decoded JSON response body
+            ttl: Time-to-live in seconds (None = never expires)
+            etag: ETag response header, used for revalidation
+            last_modified: Last-Modified response header, used for revalidation
+        """
+        entry = {
+            "endpoint": endpoint,
+            "params": params or {},
+            "stored_at": time.time(),
+            "ttl": ttl,
+            "etag": etag,
+            "last_modified": last_modified,
+            "data": data,
+        }
+        self._write(self._path(self.make_key(endpoint, params)), entry)
+        self._evict()
+
+    def refresh(self, endpoint: str, params: Optional[Dict[str, Any]],
+                entry: Dict[str, Any], ttl: Optional[float] = None):
+        """
+        Restart the TTL of an entry after a 304 Not Modified revalidation
+
+        Args:
+            endpoint: API path
+            params: Query parameters
+            entry: Cache entry returned by get()
+            ttl: New time-to-live in seconds (None = never expires)
+        """
+        entry = dict(entry, stored_at=time.time(), ttl=ttl)
+        self._write(self._path(self.make_key(endpoint, params)), entry)
+
+    def clear(self):
+        """Remove every cached response"""
+        for path in self._entries():
+            self._remove(path)
+
+    def size_bytes(self) -> int:
+        """Total size of all cached responses in bytes"""
+        total = 0
+        for path in self._entries():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _entries(self):
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if name.endswith(".json")]
+
+    def _write(self, path: str, entry: Dict[str, Any]):
+        # Write to a temporary file and rename so concurrent readers never
+        # see a partially written entry
+        tmp_path = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path}: {e}")
+            self._remove(tmp_path)
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            logger.debug(f"Evicted cache entry {path}")
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,10 +1,16 @@
 # CFB Model Configuration
 
 # Model Parameters
-MODEL_TYPE = "random_forest"  # Options: "random_forest", "gradient_boosting"
+MODEL_TYPE = "random_forest"  # Options: "random_forest", "gradient_boosting", "hist_gradient_boosting", "logistic_regression", "stacked_ensemble"
 RANDOM_STATE = 42
 TEST_SIZE = 0.2
 CV_FOLDS = 5
+CV_N_JOBS = -1  # parallel fits for the holdout split and CV folds (-1 = all cores)
+
+# Weekly Model Refresh
+REFRESH_POLICY = "incremental"  # "incremental" (warm start) or "full" (retrain from scratch)
+REFRESH_N_ESTIMATORS = 20  # trees / boosting stages added per incremental refresh
+REFRESH_DRIFT_TOLERANCE = 0.10  # full retrain when new-game accuracy falls this far below test accuracy
 
 # Random Forest Parameters
 RF_N_ESTIMATORS = 100
@@ -16,9 +22,94 @@ GB_N_ESTIMATORS = 100
 GB_MAX_DEPTH = 5
 GB_LEARNING_RATE = 0.1
 
+# Histogram Gradient Boosting Parameters
+HGB_MAX_ITER = 500  # upper bound; early stopping picks the number of iterations
+HGB_LEARNING_RATE = 0.1
+HGB_MAX_LEAF_NODES = 31
+
+# Logistic Regression (SGD) Parameters
+LR_ALPHA = 1e-3
+
+# Stacked Ensemble Parameters
+ENSEMBLE_BASE_MODELS = ("logistic_regression", "hist_gradient_boosting", "random_forest")
+ENSEMBLE_CV_FOLDS = 5  # folds for the out-of-fold base predictions
+ENSEMBLE_META_C = 1.0  # inverse regularization of the logistic meta-learner
+ENSEMBLE_CACHE_DIR = ".cfb_oof_cache"  # cached out-of-fold predictions (None disables)
+
+# Hyperparameter Tuning (successive halving over season folds)
+TUNING_DIR = ".cfb_tuning"  # resumable trial logs
+PROFILE_DIR = "profiles"  # winning hyperparameters, one JSON profile per model type
+TUNING_N_CANDIDATES = 27
+TUNING_ETA = 3  # keep the best 1/eta candidates and give them eta times the folds
+TUNING_N_FOLDS = 4  # most recent seasons used as validation folds
+TUNING_METRIC = "log_loss"  # "log_loss", "brier" (lower is better) or "accuracy"
+
 # API Parameters
 API_TIMEOUT = 30  # seconds
 API_MAX_RETRIES = 3
+API_MAX_CONCURRENCY = 8  # in-flight requests for bulk async pulls
+
+# Client-side Rate Limiting (token bucket)
+API_RATE_LIMIT_PER_SECOND = 5.0
+API_RATE_LIMIT_BURST = 10
+# Tokens per request by endpoint; unlisted endpoints cost 1
+API_ENDPOINT_WEIGHTS = {}
+
+# Response Cache Parameters
+CACHE_DIR = ".cfb_cache"
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+# TTLs for the in-progress season; completed seasons never expire
+CACHE_DEFAULT_TTL_SECONDS = 60 * 60
+CACHE_TTL_SECONDS = {
+    "/games": 15 * 60,
+    "/games/teams": 15 * 60,
+    "/lines": 15 * 60,
+    "/records": 60 * 60,
+    "/stats/season": 6 * 60 * 60,
+    "/stats/game/advanced": 60 * 60,
+    "/talent": 24 * 60 * 60,
+    "/teams/fbs": 24 * 60 * 60,
+}
+
+# Persisted point-in-time feature state (one file per season)
+FEATURE_STATE_DIR = ".cfb_feature_state"
+
+# Opponent Adjustment (SRS) Solver
+SRS_DAMPING = 1e-3  # ridge penalty; keeps the offense/defense split identifiable
+SRS_TOLERANCE = 1e-8
+SRS_MAX_ITER = 1000
+
+# Walk-forward Backtesting
+BACKTEST_CACHE_DIR = ".cfb_backtest_cache"
+BACKTEST_MIN_TRAIN_GAMES = 200  # folds with less history are skipped
+
+# Monte Carlo Season Simulation
+SIM_N_SIMULATIONS = 100_000
+SIM_CHUNK_SIZE = 10_000  # simulated seasons per draw matrix (bounds memory use)
+SIM_RATING_K = 0.0  # logit rating change per win above expectation between weeks (0 = off)
+PLAYOFF_TEAMS = 12
+PLAYOFF_AUTO_BIDS = 5  # spots reserved for the best conference champions
+
+# All-pairs Matchup Probabilities
+MATCHUP_CACHE_DIR = ".cfb_matchups"  # matrices keyed by model version and data week
+
+# Local Prediction Service (serve.py)
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8000
+SERVE_MAX_BATCH_SIZE = 256  # games per predict_proba call
+SERVE_MAX_WAIT_MS = 5  # how long a request waits for others to join its batch
+SERVE_RELOAD_INTERVAL = 5.0  # seconds between checks for a new model file
+
+# Batch Predictions (batch_predict.py)
+BATCH_OUTPUT_DIR = "predictions"  # season=<year>/week=<week> partitions
+BATCH_MAX_WORKERS = None  # scoring processes (None = all cores)
+
+# Local Model Registry (versioned models and cached training features)
+REGISTRY_DIR = ".cfb_registry"
+
+# Local Data Lake (Parquet)
+DATA_LAKE_DIR = "data_lake"
+DATA_LAKE_COMPRESSION = "zstd"
 
 # Data Parameters
 MIN_YEAR = 2000
@@ -6,9 +6,11 @@ Fetches data from https://api.collegefootballdata.com/
 import requests
 import pandas as pd
 import logging
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from cache import ResponseCache, is_completed_season, ttl_for
+from rate_limiter import PRIORITY_BACKFILL, PRIORITY_CURRENT, TokenBucketRateLimiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,7 +20,11 @@ logger = logging.getLogger(__name__)
 class CFBDataFetcher:
     """Client for fetching data from the College Football Data API"""
     
-    def __init__(self, api_key: str, timeout: int = 30, max_retries: int = 3):
+    def __init__(self, api_key: str, timeout: int = 30, max_retries: int = 3,
+                 cache: Optional[ResponseCache] = None,
+                 base_url: str = "https://api.collegefootballdata.com",
+                 max_connections: int = 10,
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None):
         """
         Initialize the CFB Data Fetcher
         
@@ -26,32 +32,118 @@ class CFBDataFetcher:
             api_key: Your College Football Data API key
             timeout: Request timeout in seconds (default: 30)
             max_retries: Maximum number of retry attempts (default: 3)
+            cache: On-disk response cache (default: no caching)
+            base_url: API base URL (default: the public CFBD API)
+            max_connections: Size of the HTTP connection pool (default: 10)
+            rate_limiter: Proactive client-side rate limiter (default: none)
         """
         if not api_key:
             raise ValueError("API key is required")
             
         self.api_key = api_key
-        self.base_url = "https://api.collegefootballdata.com"
+        self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Accept": "application/json"
         }
         
-        # Setup session with retry logic
+        # Setup session with retry logic. With a rate limiter, 429s are
+        # handled in _get so they can slow down every queued request
+        status_forcelist = [429, 500, 502, 503, 504]
+        if rate_limiter is not None:
+            status_forcelist.remove(429)
         self.session = requests.Session()
         retry_strategy = Retry(
             total=max_retries,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=status_forcelist,
             allowed_methods=["HEAD", "GET", "OPTIONS"]
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(max_retries=retry_strategy, pool_maxsize=max_connections)
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         
         logger.info("CFBDataFetcher initialized successfully")
     
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET an API path, serving and revalidating through the cache if enabled
+        
+        Args:
+            path: API path, e.g. "/games"
+            params: Query parameters
+            
+        Returns:
+            Decoded JSON response body
+            
+        Raises:
+            requests.RequestException: If API request fails
+        """
+        url = f"{self.base_url}{path}"
+        headers = self.headers
+        entry = None
+        
+        if self.cache is not None:
+            entry = self.cache.get(path, params)
+            if entry is not None:
+                if self.cache.is_fresh(entry):
+                    logger.info(f"Serving {path} from cache")
+                    return entry["data"]
+                # Stale entry: ask the server whether it changed
+                headers = dict(self.headers)
+                if entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+        
+        response = self._send(path, url, headers, params)
+        
+        if entry is not None and response.status_code == 304:
+            logger.info(f"Cached {path} response is still valid")
+            self.cache.refresh(path, params, entry, ttl=ttl_for(path, params))
+            return entry["data"]
+        
+        response.raise_for_status()
+        data = response.json()
+        
+        if self.cache is not None:
+            self.cache.set(path, params, data, ttl=ttl_for(path, params),
+                           etag=response.headers.get("ETag"),
+                           last_modified=response.headers.get("Last-Modified"))
+        return data
+    
+    def _send(self, path: str, url: str, headers: Dict[str, str],
+              params: Optional[Dict[str, Any]]) -> requests.Response:
+        """Send a GET request, waiting on the rate limiter if one is configured"""
+        if self.rate_limiter is None:
+            return self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+        
+        year = (params or {}).get("year")
+        if year is not None and is_completed_season(int(year)):
+            priority = PRIORITY_BACKFILL
+        else:
+            priority = PRIORITY_CURRENT
+        
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(path, priority=priority)
+            response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+            self.rate_limiter.record_throttled(self._retry_after(response))
+        return response
+    
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Seconds from a numeric Retry-After header, if present"""
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, TypeError, ValueError):
+            return None
+    
     def get_games(self, year: int, week: Optional[int] = None, 
                   season_type: str = "regular", team: Optional[str] = None) -> pd.DataFrame:
         """
@@ -73,7 +165,7 @@ class CFBDataFetcher:
         if year < 2000 or year > 2100:
             raise ValueError(f"Invalid year: {year}. Must be between 2000 and 2100")
         
-        url = f"{self.base_url}/games"
+        path = "/games"
         params = {
             "year": year,
             "seasonType": season_type
@@ -88,10 +180,7 @@ class CFBDataFetcher:
         
         try:
             logger.info(f"Fetching games for year={year}, week={week}, season_type={season_type}")
-            response = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get(path, params)
             logger.info(f"Successfully fetched {len(data)} games")
             return pd.DataFrame(data)
         except requests.RequestException as e:
@@ -116,7 +205,7 @@ class CFBDataFetcher:
         if year < 2000 or year > 2100:
             raise ValueError(f"Invalid year: {year}. Must be between 2000 and 2100")
             
-        url = f"{self.base_url}/stats/season"
+        path = "/stats/season"
         params = {"year": year}
         
         if team:
@@ -124,16 +213,131 @@ class CFBDataFetcher:
         
         try:
             logger.info(f"Fetching team stats for year={year}")
-            response = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get(path, params)
             logger.info(f"Successfully fetched stats for {len(data)} team records")
             return pd.DataFrame(data)
         except requests.RequestException as e:
             logger.error(f"Error fetching team stats: {e}")
             raise
     
+    def get_game_stats(self, year: int, week: Optional[int] = None,
+                       season_type: str = "regular", team: Optional[str] = None) -> pd.DataFrame:
+        """
+        Fetch per-team box score stats for each game
+        
+        The API nests a list of {category, stat} pairs under each team; these
+        are flattened to one row per (game, team) in the game_stats CSV layout,
+        with numeric stats converted to numbers.
+        
+        Args:
+            year: Season year
+            week: Week number (the API requires a week, team or conference)
+            season_type: Type of season (regular, postseason)
+            team: Specific team to filter by (optional)
+            
+        Returns:
+            DataFrame with one row per team per game
+            
+        Raises:
+            ValueError: If invalid parameters are provided
+            requests.RequestException: If API request fails
+        """
+        if year < 2000 or year > 2100:
+            raise ValueError(f"Invalid year: {year}. Must be between 2000 and 2100")
+        
+        path = "/games/teams"
+        params = {
+            "year": year,
+            "seasonType": season_type
+        }
+        
+        if week:
+            if week < 1 or week > 20:
+                raise ValueError(f"Invalid week: {week}. Must be between 1 and 20")
+            params["week"] = week
+        if team:
+            params["team"] = team
+        
+        try:
+            logger.info(f"Fetching game stats for year={year}, week={week}, season_type={season_type}")
+            data = self._get(path, params)
+            rows = []
+            for game in data:
+                for team_stats in game.get("teams", []):
+                    row = {
+                        "game_id": game.get("id"),
+                        "season": year,
+                        "week": week,
+                        "season_type": season_type,
+                        "home_away": team_stats.get("homeAway"),
+                        "team_id": team_stats.get("teamId"),
+                        "team": team_stats.get("team"),
+                        "conference": team_stats.get("conference"),
+                        "points": team_stats.get("points"),
+                    }
+                    for stat in team_stats.get("stats", []):
+                        row[stat.get("category")] = stat.get("stat")
+                    rows.append(row)
+            df = pd.DataFrame(rows)
+            # Stats arrive as strings; keep ratios like "5-12" as text
+            for col in df.columns:
+                if pd.api.types.is_string_dtype(df[col]) and col not in ("home_away", "team", "conference", "season_type"):
+                    numeric = pd.to_numeric(df[col], errors="coerce")
+                    if numeric.notna().sum() == df[col].notna().sum():
+                        df[col] = numeric
+            logger.info(f"Successfully fetched stats for {len(data)} games")
+            return df
+        except requests.RequestException as e:
+            logger.error(f"Error fetching game stats: {e}")
+            raise
+    
+    def get_advanced_game_stats(self, year: int, week: Optional[int] = None,
+                                season_type: str = "regular",
+                                team: Optional[str] = None) -> pd.DataFrame:
+        """
+        Fetch per-team advanced (PPA, success rate) stats for each game
+        
+        Nested offense/defense objects are flattened with "_" separators,
+        matching the advanced_game_stats CSV layout (e.g. offense_ppa).
+        
+        Args:
+            year: Season year
+            week: Week number (optional)
+            season_type: Type of season (regular, postseason)
+            team: Specific team to filter by (optional)
+            
+        Returns:
+            DataFrame with one row per team per game
+            
+        Raises:
+            ValueError: If invalid parameters are provided
+            requests.RequestException: If API request fails
+        """
+        if year < 2000 or year > 2100:
+            raise ValueError(f"Invalid year: {year}. Must be between 2000 and 2100")
+        
+        path = "/stats/game/advanced"
+        params = {
+            "year": year,
+            "seasonType": season_type
+        }
+        
+        if week:
+            if week < 1 or week > 20:
+                raise ValueError(f"Invalid week: {week}. Must be between 1 and 20")
+            params["week"] = week
+        if team:
+            params["team"] = team
+        
+        try:
+            logger.info(f"Fetching advanced game stats for year={year}, week={week}, season_type={season_type}")
+            data = self._get(path, params)
+            logger.info(f"Successfully fetched advanced stats for {len(data)} team games")
+            return pd.json_normalize(data, sep="_") if data else pd.DataFrame()
+        except requests.RequestException as e:
+            logger.error(f"Error fetching advanced game stats: {e}")
+            raise
+    
     def get_team_records(self, year: int, team: Optional[str] = None) -> pd.DataFrame:
         """
         Fetch team records for a given year
@@ -152,7 +356,7 @@ class CFBDataFetcher:
         if year < 2000 or year > 2100:
             raise ValueError(f"Invalid year: {year}. Must be between 2000 and 2100")
             
-        url = f"{self.base_url}/records"
+        path = "/records"
         params = {"year": year}
         
         if team:
@@ -160,10 +364,7 @@ class CFBDataFetcher:
         
         try:
             logger.info(f"Fetching team records for year={year}")
-            response = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get(path, params)
             logger.info(f"Successfully fetched records for {len(data)} teams")
             return pd.DataFrame(data)
         except requests.RequestException as e:
@@ -187,15 +388,12 @@ class CFBDataFetcher:
         if year < 2000 or year > 2100:
             raise ValueError(f"Invalid year: {year}. Must be between 2000 and 2100")
             
-        url = f"{self.base_url}/talent"
+        path = "/talent"
         params = {"year": year}
         
         try:
             logger.info(f"Fetching team talent for year={year}")
-            response = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get(path, params)
             logger.info(f"Successfully fetched talent for {len(data)} teams")
             return pd.DataFrame(data)
         except requests.RequestException as e:
@@ -212,14 +410,11 @@ class CFBDataFetcher:
         Raises:
             requests.RequestException: If API request fails
         """
-        url = f"{self.base_url}/teams/fbs"
+        path = "/teams/fbs"
         
         try:
             logger.info("Fetching all FBS teams")
-            response = self.session.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get(path)
             logger.info(f"Successfully fetched {len(data)} teams")
             return pd.DataFrame(data)
         except requests.RequestException as e:
@@ -246,7 +441,7 @@ class CFBDataFetcher:
         if year < 2000 or year > 2100:
             raise ValueError(f"Invalid year: {year}. Must be between 2000 and 2100")
             
-        url = f"{self.base_url}/lines"
+        path = "/lines"
         params = {"year": year}
         
         if week:
@@ -258,10 +453,7 @@ class CFBDataFetcher:
         
         try:
             logger.info(f"Fetching betting lines for year={year}, week={week}")
-            response = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get(path, params)
             logger.info(f"Successfully fetched betting lines for {len(data)} games")
             return pd.DataFrame(data)
         except requests.RequestException as e:
@@ -115,7 +115,7 @@ print("\nSTEP 5: Training machine learning model")
 print("-" * 70)
 
 model = CFBModel(model_type="random_forest")
-metrics = model.train(X, y, test_size=0.25)
+metrics = model.train(X, y)
 
 print(f"✅ Model trained successfully!")
 print(f"   Training Accuracy: {metrics['train_accuracy']:.1%}")
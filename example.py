@@ -39,7 +39,7 @@ print(f"  Away wins: {(y == 0).sum()}")
 # Example 5: Train a model
 print("\nTraining Random Forest model...")
 model = CFBModel(model_type="random_forest")
-metrics = model.train(X, y, test_size=0.2)
+metrics = model.train(X, y)
 
 print(f"\nModel Performance:")
 print(f"  Test Accuracy: {metrics['test_accuracy']:.4f}")
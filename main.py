@@ -5,9 +5,7 @@ Main entry point for the CFB model
 
 import argparse
 import os
-from data_fetcher import CFBDataFetcher
-from preprocessor import CFBPreprocessor
-from model import CFBModel
+import config
 
 
 def main():
@@ -19,40 +17,74 @@ def main():
     parser.add_argument("--predict", action="store_true", help="Make predictions")
     parser.add_argument("--week", type=int, help="Week number for predictions")
     parser.add_argument("--model-path", default="cfb_model.pkl", help="Path to save/load model")
+    parser.add_argument("--model-type", default=config.MODEL_TYPE,
+                        choices=["random_forest", "gradient_boosting", "hist_gradient_boosting", "logistic_regression",
+                                 "stacked_ensemble"],
+                        help="Model to train")
+    parser.add_argument("--profile", help="Tuning profile (see tuning.py) to train with instead of --model-type")
+    parser.add_argument("--cache-dir", default=os.environ.get("CFB_CACHE_DIR", config.CACHE_DIR),
+                        help="Directory for cached API responses")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the API response cache")
+    parser.add_argument("--data-lake", help="Parquet data lake directory to train from (requires pyarrow)")
     
     args = parser.parse_args()
     
+    # Heavy imports (pandas, sklearn, requests) wait until the arguments parse,
+    # so --help and usage errors return immediately
+    from data_fetcher import CFBDataFetcher
+    from preprocessor import CFBPreprocessor
+    from model import CFBModel
+    from cache import ResponseCache
+    from tuning import load_profile
+    
     # Initialize components
     print(f"Initializing CFB Model for {args.year} season...")
-    fetcher = CFBDataFetcher(args.api_key)
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    fetcher = CFBDataFetcher(args.api_key, cache=cache)
     preprocessor = CFBPreprocessor()
-    model = CFBModel(model_type="random_forest")
+    model_type, params = load_profile(args.profile) if args.profile else (args.model_type, None)
+    model = CFBModel(model_type=model_type, params=params)
     
     if args.train:
         print("\n=== Training Model ===")
         
-        # Fetch training data
-        print("Fetching games data...")
-        games = fetcher.get_games(args.year, season_type="regular")
-        print(f"Fetched {len(games)} games")
-        
-        print("Fetching team statistics...")
-        team_stats = fetcher.get_team_stats(args.year)
-        print(f"Fetched stats for {len(team_stats)} teams")
-        
-        # Try to get talent data (may not be available for all years)
-        try:
-            print("Fetching team talent ratings...")
-            talent = fetcher.get_team_talent(args.year)
-            print(f"Fetched talent ratings for {len(talent)} teams")
-        except Exception as e:
-            print(f"Could not fetch talent data: {e}")
-            talent = None
-        
-        # Prepare features
-        print("\nPreparing features...")
-        features = preprocessor.prepare_game_features(games, team_stats, talent)
-        X, y = preprocessor.create_training_data(features)
+        if args.data_lake:
+            from storage import DataLake
+            lake = DataLake(args.data_lake)
+            if args.year not in {season for season, _ in lake.partitions("games")}:
+                print(f"Ingesting {args.year} season into data lake {args.data_lake}...")
+                lake.ingest(fetcher, args.year, endpoints=["games", "team_stats"])
+                try:
+                    lake.ingest(fetcher, args.year, endpoints=["talent"])
+                except Exception as e:
+                    print(f"Could not fetch talent data: {e}")
+            
+            print("\nPreparing features from data lake...")
+            features = preprocessor.prepare_lake_features(lake, [args.year])
+        else:
+            # Fetch training data
+            print("Fetching games data...")
+            games = fetcher.get_games(args.year, season_type="regular")
+            print(f"Fetched {len(games)} games")
+        
+            print("Fetching team statistics...")
+            team_stats = fetcher.get_team_stats(args.year)
+            print(f"Fetched stats for {len(team_stats)} teams")
+        
+            # Try to get talent data (may not be available for all years)
+            try:
+                print("Fetching team talent ratings...")
+                talent = fetcher.get_team_talent(args.year)
+                print(f"Fetched talent ratings for {len(talent)} teams")
+            except Exception as e:
+                print(f"Could not fetch talent data: {e}")
+                talent = None
+        
+            # Prepare features
+            print("\nPreparing features...")
+            features = preprocessor.prepare_game_features(games, team_stats, talent)
+        
+        X, y = preprocessor.create_training_data(features, categorical=model.categorical_features)
         
         print(f"Training data shape: {X.shape}")
         print(f"Target distribution: {y.value_counts().to_dict()}")
@@ -112,11 +144,10 @@ def main():
         
         # Prepare features
         features = preprocessor.prepare_game_features(games, team_stats, talent)
-        X, _ = preprocessor.create_training_data(features)
+        X, _ = preprocessor.create_training_data(features, categorical=model.categorical_features)
         
         # Make predictions
-        predictions = model.predict(X)
-        probabilities = model.predict_proba(X)
+        predictions, _, confidence = model.predict_with_confidence(X)
         
         # Display predictions
         print("\n=== Predictions ===")
@@ -124,7 +155,7 @@ def main():
             home = game.get('homeTeam', game.get('home_team', 'Unknown'))
             away = game.get('awayTeam', game.get('away_team', 'Unknown'))
             pred = "Home Win" if predictions[i] == 1 else "Away Win"
-            prob = probabilities[i][predictions[i]]
+            prob = confidence[i]
             
             print(f"{away} @ {home}")
             print(f"  Prediction: {pred} (Confidence: {prob:.2%})")
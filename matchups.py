@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+All-pairs matchup probabilities
+
+Builds the feature rows for every ordered (home, away) pair of teams in one
+vectorized pass. This is the same feature construction as
+CFBPreprocessor.prepare_game_features, broadcast over a team x team grid.
+All pairs are scored with a single predict_proba call. The result is a
+matrix where home[i, j] is P(team i beats team j at i's home field):
+
+    away probability     1 - home[j, i]
+    neutral probability  (home[i, j] + 1 - home[j, i]) / 2
+
+The game features have no site variable, so a neutral-site game is the
+average of the two venues.
+
+Matrices are cached as .npz files keyed by model version and data week.
+Any lookup after the first is an array index:
+
+    .cfb_matchups/<model version>_<season>_w<week>.npz
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import config
+from preprocessor import CFBPreprocessor, TEAM_FEATURE_COLUMNS
+from simulator import home_win_probabilities
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SITES = ("home", "away", "neutral")
+
+
+def model_version(model) -> str:
+    """
+    Version string of a trained CFBModel for cache keys
+
+    Built from the model type, hyperparameter overrides and training data
+    hash, or from the pickled estimator when the training hash is unknown
+    (e.g. a model loaded from a pickle).
+    """
+    if getattr(model, 'data_hash', None):
+        payload = json.dumps({'model_type': model.model_type, 'params': getattr(model, 'params', {}),
+                              'data': model.data_hash}, sort_keys=True, default=str).encode()
+    else:
+        payload = pickle.dumps(model.model)
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def matchup_features(team_features: pd.DataFrame,
+                     conferences: Optional[Dict[str, str]] = None,
+                     week: Optional[int] = None) -> pd.DataFrame:
+    """
+    Game feature rows for every ordered pair of teams
+
+    Args:
+        team_features: CFBPreprocessor.build_team_features output (indexed
+            by team)
+        conferences: Team -> conference, adds home/away_conference columns
+            (for models trained with categorical features)
+        week: Adds a week column (for models trained with categorical
+            features)
+
+    Returns:
+        DataFrame with n_teams ** 2 rows, row i * n_teams + j being team i
+        at home against team j, with the columns prepare_game_features adds
+    """
+    teams = team_features.index.to_numpy()
+    n = len(teams)
+    values = team_features[TEAM_FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    home = np.repeat(values, n, axis=0)
+    away = np.tile(values, (n, 1))
+
+    columns = {'homeTeam': np.repeat(teams, n), 'awayTeam': np.tile(teams, n)}
+    columns.update({f'home_{col}': home[:, k] for k, col in enumerate(TEAM_FEATURE_COLUMNS)})
+    columns.update({f'away_{col}': away[:, k] for k, col in enumerate(TEAM_FEATURE_COLUMNS)})
+    features = pd.DataFrame(columns)
+    features['talent_diff'] = features['home_talent'] - features['away_talent']
+    features['yards_diff'] = features['home_off_total_yards'] - features['away_off_total_yards']
+    features['points_diff'] = features['home_off_points'] - features['away_off_points']
+
+    if conferences is not None:
+        conference = pd.Series(conferences).reindex(teams).to_numpy()
+        features['home_conference'] = np.repeat(conference, n)
+        features['away_conference'] = np.tile(conference, n)
+    if week is not None:
+        features['week'] = week
+    return features
+
+
+class MatchupMatrix:
+    """Home-win probabilities for every pair of teams"""
+
+    def __init__(self, teams: Sequence[str], home: np.ndarray,
+                 metadata: Optional[Dict[str, object]] = None):
+        """
+        Args:
+            teams: Team names, in matrix order
+            home: (n_teams, n_teams) array; home[i, j] is P(teams[i] beats
+                teams[j] at home); the diagonal is NaN
+            metadata: Model version, season, week, etc.
+        """
+        self.teams = np.asarray(teams, dtype=object)
+        self.home = np.asarray(home)
+        if self.home.shape != (len(self.teams), len(self.teams)):
+            raise ValueError(f"home must be {len(self.teams)}x{len(self.teams)}. Got {self.home.shape}")
+        self.metadata = dict(metadata or {})
+        self.index = {team: i for i, team in enumerate(self.teams)}
+
+    @property
+    def away(self) -> np.ndarray:
+        """away[i, j]: P(teams[i] beats teams[j] on the road)"""
+        return 1 - self.home.T
+
+    @property
+    def neutral(self) -> np.ndarray:
+        """neutral[i, j]: P(teams[i] beats teams[j] at a neutral site)"""
+        return (self.home + 1 - self.home.T) / 2
+
+    def probability(self, team: str, opponent: str, site: str = "home") -> float:
+        """
+        P(team beats opponent)
+
+        Args:
+            team: Team whose win probability is returned
+            opponent: Its opponent
+            site: "home" (team hosts), "away" (opponent hosts) or "neutral"
+
+        Raises:
+            KeyError: For a team not in the matrix
+            ValueError: For an unknown site
+        """
+        if site not in SITES:
+            raise ValueError(f"Unknown site: {site}. Use one of {SITES}")
+        i, j = self.index[team], self.index[opponent]
+        if site == "home":
+            return float(self.home[i, j])
+        if site == "away":
+            return float(1 - self.home[j, i])
+        return float((self.home[i, j] + 1 - self.home[j, i]) / 2)
+
+    def frame(self, site: str = "home") -> pd.DataFrame:
+        """The matrix for a site as a team x opponent DataFrame"""
+        if site not in SITES:
+            raise ValueError(f"Unknown site: {site}. Use one of {SITES}")
+        return pd.DataFrame(getattr(self, site), index=self.teams, columns=self.teams)
+
+    def save(self, path: str) -> str:
+        """Write the matrix as an .npz file (atomically)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(tmp_path, teams=self.teams.astype(str), home=self.home,
+                 metadata=np.array(json.dumps(self.metadata, default=str)))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "MatchupMatrix":
+        with np.load(path) as data:
+            return cls(data['teams'].astype(object), data['home'], json.loads(str(data['metadata'])))
+
+
+def build_matchup_matrix(model, team_features: pd.DataFrame,
+                         conferences: Optional[Dict[str, str]] = None,
+                         week: Optional[int] = None,
+                         metadata: Optional[Dict[str, object]] = None) -> MatchupMatrix:
+    """
+    Score every pair of teams in one predict_proba call
+
+    Args:
+        model: Trained CFBModel
+        team_features: CFBPreprocessor.build_team_features output
+        conferences: Team -> conference (categorical-feature models)
+        week: Week for the week feature (categorical-feature models)
+        metadata: Stored with the matrix
+
+    Returns:
+        MatchupMatrix
+    """
+    if team_features.empty:
+        raise ValueError("team_features cannot be empty")
+    teams = team_features.index.to_numpy()
+    categorical = getattr(model, 'categorical_features', False)
+    features = matchup_features(team_features, conferences if categorical else None,
+                                week if categorical else None)
+    X, _ = CFBPreprocessor().create_training_data(features, categorical=categorical)
+
+    home = home_win_probabilities(model, X).reshape(len(teams), len(teams)).astype(np.float32)
+    np.fill_diagonal(home, np.nan)
+    logger.info(f"Scored {len(X)} matchups for {len(teams)} teams")
+    return MatchupMatrix(teams, home, metadata)
+
+
+def cache_path(version: str, week: int, season: Optional[int] = None,
+               cache_dir: str = config.MATCHUP_CACHE_DIR) -> str:
+    """Cache file of the matrix for a model version and data week"""
+    season_part = f"_{season}" if season is not None else ""
+    return os.path.join(cache_dir, f"{version}{season_part}_w{week}.npz")
+
+
+def matchup_matrix(model, team_features: pd.DataFrame, week: int,
+                   season: Optional[int] = None,
+                   conferences: Optional[Dict[str, str]] = None,
+                   version: Optional[str] = None,
+                   cache_dir: str = config.MATCHUP_CACHE_DIR) -> MatchupMatrix:
+    """
+    Cached all-pairs matrix for a model and the data through a week
+
+    Args:
+        model: Trained CFBModel
+        team_features: Team features as of the week
+        week: Data week the team features describe
+        season: Season, also part of the cache key
+        conferences: Team -> conference (categorical-feature models)
+        version: Model version (default: model_version(model), e.g. pass a
+            registry version instead)
+        cache_dir: Cache directory
+
+    Returns:
+        MatchupMatrix (loaded from the cache when it has this key)
+    """
+    version = version or model_version(model)
+    path = cache_path(version, week, season, cache_dir)
+    if os.path.exists(path):
+        logger.info(f"Loaded cached matchup matrix {path}")
+        return MatchupMatrix.load(path)
+
+    matrix = build_matchup_matrix(model, team_features, conferences, week,
+                                  metadata={'model_version': version, 'season': season, 'week': week,
+                                            'model_type': model.model_type})
+    matrix.save(path)
+    logger.info(f"Cached matchup matrix to {path}")
+    return matrix
+
+
+def main():
+    """Build the matchup matrix for a season and look up a matchup"""
+    from data_fetcher import CFBDataFetcher
+    from model import CFBModel
+
+    parser = argparse.ArgumentParser(description="All-pairs matchup win probabilities")
+    parser.add_argument("--api-key", default=os.environ.get("CFB_API_KEY"),
+                        help="College Football Data API key (or CFB_API_KEY)")
+    parser.add_argument("--year", type=int, required=True, help="Season year")
+    parser.add_argument("--week", type=int, required=True, help="Data week the statistics cover")
+    parser.add_argument("--model-path", default="cfb_model.pkl", help="Trained model or artifact directory")
+    parser.add_argument("--team", help="Team to look up")
+    parser.add_argument("--opponent", help="Opponent to look up")
+    parser.add_argument("--site", choices=SITES, default="neutral", help="Where --team plays")
+    parser.add_argument("--cache-dir", default=config.MATCHUP_CACHE_DIR, help="Matrix cache directory")
+    parser.add_argument("--output", help="Write the matrix for --site to this CSV file")
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("API key required. Set CFB_API_KEY or use --api-key")
+
+    model = CFBModel()
+    model.load(args.model_path)
+    fetcher = CFBDataFetcher(args.api_key)
+    teams = fetcher.get_teams()
+    try:
+        talent = fetcher.get_team_talent(args.year)
+    except Exception as e:
+        logger.warning(f"Could not fetch talent data: {e}")
+        talent = None
+    team_features = CFBPreprocessor().build_team_features(fetcher.get_team_stats(args.year), talent)
+    # FBS teams only; FCS teams missing from the stats get zeros like in prepare_game_features
+    team_features = team_features.reindex(sorted(teams['school'].dropna().unique()), fill_value=0)
+    conferences = dict(zip(teams['school'], teams['conference'])) if 'conference' in teams else None
+
+    matrix = matchup_matrix(model, team_features, args.week, season=args.year,
+                            conferences=conferences, cache_dir=args.cache_dir)
+    if args.output:
+        matrix.frame(args.site).to_csv(args.output)
+        print(f"Matchup matrix saved to {args.output}")
+    if args.team and args.opponent:
+        p = matrix.probability(args.team, args.opponent, args.site)
+        print(f"{args.team} vs {args.opponent} ({args.site}): {p:.1%}")
+
+
+if __name__ == "__main__":
+    main()
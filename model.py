@@ -5,56 +5,146 @@ College Football Prediction Model
 import numpy as np
 import pandas as pd
 import logging
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.ensemble import (RandomForestClassifier, GradientBoostingClassifier,
+                              HistGradientBoostingClassifier)
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import check_cv
+from threadpoolctl import threadpool_limits
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
+import hashlib
 import pickle
 import os
 
+import artifact
+import config
+from stacking import StackedEnsemble
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _model_type_of(estimator) -> Optional[str]:
+    """CFBModel model type of a fitted estimator (e.g. one loaded from a pickle)"""
+    if isinstance(estimator, Pipeline):
+        return "logistic_regression"
+    types = {RandomForestClassifier: "random_forest", GradientBoostingClassifier: "gradient_boosting",
+             HistGradientBoostingClassifier: "hist_gradient_boosting", StackedEnsemble: "stacked_ensemble"}
+    return types.get(type(estimator))
+
+
+def _fit_and_predict(estimator, X: pd.DataFrame, y: pd.Series,
+                     train: np.ndarray, test: np.ndarray):
+    """Fit a fresh estimator on one split and predict probabilities for its test rows"""
+    estimator.fit(X.iloc[train], y.iloc[train])
+    return estimator, estimator.predict_proba(X.iloc[test])
+
+
 class CFBModel:
     """Machine learning model for predicting college football games"""
     
-    def __init__(self, model_type: str = "random_forest"):
+    def __init__(self, model_type: str = "random_forest", n_jobs: Optional[int] = None,
+                 params: Optional[Dict[str, Any]] = None):
         """
         Initialize the CFB model
         
         Args:
-            model_type: Type of model to use ("random_forest" or "gradient_boosting")
+            model_type: Type of model to use ("random_forest", "gradient_boosting",
+                "hist_gradient_boosting", "logistic_regression" or
+                "stacked_ensemble")
+            n_jobs: Threads used inside the estimator where supported (random
+                forest; parallel base fits of the stacked ensemble; histogram
+                boosting always uses OpenMP threads); see train() for
+                parallelism across CV folds
+            params: Hyperparameters overriding the config defaults, as
+                accepted by the estimator's set_params (e.g. a tuning profile,
+                see tuning.load_profile)
         """
         self.model_type = model_type
+        self.n_jobs = n_jobs
+        self.params = dict(params or {})
+        # Filled in by train()
+        self.fold_models = []
+        self.oof_proba = None
+        self.metrics = {}
+        self.data_hash = None
         
         if model_type == "random_forest":
             self.model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                min_samples_split=10,
-                random_state=42
+                n_estimators=config.RF_N_ESTIMATORS,
+                max_depth=config.RF_MAX_DEPTH,
+                min_samples_split=config.RF_MIN_SAMPLES_SPLIT,
+                random_state=config.RANDOM_STATE,
+                n_jobs=n_jobs
             )
         elif model_type == "gradient_boosting":
             self.model = GradientBoostingClassifier(
-                n_estimators=100,
-                max_depth=5,
-                learning_rate=0.1,
-                random_state=42
+                n_estimators=config.GB_N_ESTIMATORS,
+                max_depth=config.GB_MAX_DEPTH,
+                learning_rate=config.GB_LEARNING_RATE,
+                random_state=config.RANDOM_STATE
+            )
+        elif model_type == "hist_gradient_boosting":
+            # Binned, multi-threaded boosting; pandas category columns (see
+            # create_training_data(categorical=True)) are split natively, and
+            # a held-out validation fraction stops training early
+            self.model = HistGradientBoostingClassifier(
+                max_iter=config.HGB_MAX_ITER,
+                learning_rate=config.HGB_LEARNING_RATE,
+                max_leaf_nodes=config.HGB_MAX_LEAF_NODES,
+                categorical_features="from_dtype",
+                early_stopping=True,
+                validation_fraction=0.1,
+                n_iter_no_change=20,
+                random_state=config.RANDOM_STATE
+            )
+        elif model_type == "logistic_regression":
+            # SGD-fitted so refresh() can update it with partial_fit
+            self.model = Pipeline([
+                ("scaler", StandardScaler()),
+                ("classifier", SGDClassifier(loss="log_loss", alpha=config.LR_ALPHA,
+                                              random_state=config.RANDOM_STATE)),
+            ])
+        elif model_type == "stacked_ensemble":
+            # Logistic meta-learner over out-of-fold probabilities of the
+            # base backends; fold models are averaged at prediction time
+            self.model = StackedEnsemble(
+                estimators=[(name, CFBModel(name).model) for name in config.ENSEMBLE_BASE_MODELS],
+                cv=config.ENSEMBLE_CV_FOLDS,
+                meta_C=config.ENSEMBLE_META_C,
+                n_jobs=config.CV_N_JOBS if n_jobs is None else n_jobs,
+                cache_dir=config.ENSEMBLE_CACHE_DIR,
+                random_state=config.RANDOM_STATE
             )
         else:
             raise ValueError(f"Unknown model type: {model_type}")
+        if self.params:
+            # Unknown parameter names raise ValueError here
+            self.model.set_params(**self.params)
     
-    def train(self, X: pd.DataFrame, y: pd.Series, 
-              test_size: float = 0.2) -> Dict[str, Any]:
+    def train(self, X: pd.DataFrame, y: pd.Series, cv: int = config.CV_FOLDS,
+              n_jobs: Optional[int] = config.CV_N_JOBS) -> Dict[str, Any]:
         """
         Train the model
         
+        One cross-validation pass evaluates the model: the fold fits are kept
+        in fold_models and their out-of-fold probabilities in oof_proba, from
+        which the test (holdout) and CV metrics are computed. The trained
+        model is fitted once on all of X, in the same parallel batch as the
+        folds.
+        
         Args:
             X: Feature matrix
             y: Target variable
-            test_size: Proportion of data to use for testing
+            cv: Number of stratified cross-validation folds
+            n_jobs: Parallel fits across the folds and the final fit
+                (-1 uses all cores); the estimators' own threads are capped
+                so the two levels don't oversubscribe the cores
             
         Returns:
             Dictionary with training metrics
@@ -68,35 +158,57 @@ class CFBModel:
         if len(X) != len(y):
             raise ValueError(f"X and y must have same length. Got X={len(X)}, y={len(y)}")
         
-        if test_size <= 0 or test_size >= 1:
-            raise ValueError(f"test_size must be between 0 and 1. Got {test_size}")
-        
         logger.info(f"Training {self.model_type} model on {len(X)} samples")
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=42
-        )
+        y = pd.Series(np.asarray(y), index=X.index)
+        folds = list(check_cv(cv, y, classifier=True).split(X, y))
+        everything = np.arange(len(X))
+        splits = folds + [(everything, everything)]
         
-        logger.info(f"Training set: {len(X_train)} samples, Test set: {len(X_test)} samples")
+        # Threads per fit when the fits themselves run in parallel
+        outer = min(effective_n_jobs(n_jobs), len(splits))
+        inner = max(1, (os.cpu_count() or 1) // outer)
+        estimator_jobs = self.model.get_params().get('n_jobs')
         
-        # Train model
-        self.model.fit(X_train, y_train)
-        logger.info("Model training completed")
+        def fresh_estimator():
+            estimator = clone(self.model)
+            if outer > 1 and 'n_jobs' in estimator.get_params():
+                capped = inner if estimator_jobs is None or estimator_jobs < 0 else min(estimator_jobs, inner)
+                estimator.set_params(n_jobs=capped)
+            return estimator
         
-        # Evaluate
-        train_pred = self.model.predict(X_train)
-        test_pred = self.model.predict(X_test)
+        logger.info(f"Fitting {len(folds)} CV folds and the final model in parallel "
+                    f"(n_jobs={n_jobs}, {inner} thread(s) per fit)")
+        # Tree fitting releases the GIL, so threads avoid copying X to worker
+        # processes; OpenMP pools (histogram boosting) are capped the same way
+        with threadpool_limits(limits=inner if outer > 1 else None, user_api="openmp"):
+            fits = Parallel(n_jobs=n_jobs, prefer="threads")(
+                delayed(_fit_and_predict)(fresh_estimator(), X, y, train, test)
+                for train, test in splits
+            )
+        self.model, train_proba = fits[-1]
+        if 'n_jobs' in self.model.get_params():
+            # Predictions use the configured threads again
+            self.model.set_params(n_jobs=estimator_jobs)
+        self.fold_models = [estimator for estimator, _ in fits[:-1]]
+        logger.info("Model training completed")
         
-        train_acc = accuracy_score(y_train, train_pred)
-        test_acc = accuracy_score(y_test, test_pred)
+        # Out-of-fold probabilities: every row predicted by the fold that held it out
+        classes = np.unique(y)
+        self.oof_proba = np.zeros((len(X), len(classes)))
+        cv_scores = []
+        for (estimator, proba), (_, fold_test) in zip(fits[:-1], folds):
+            # A fold may not have seen every class
+            self.oof_proba[np.ix_(fold_test, np.searchsorted(classes, estimator.classes_))] = proba
+            fold_pred = estimator.classes_[np.argmax(proba, axis=1)]
+            cv_scores.append(accuracy_score(y.iloc[fold_test], fold_pred))
+        cv_scores = np.array(cv_scores)
+        oof_pred = classes[np.argmax(self.oof_proba, axis=1)]
         
+        train_acc = accuracy_score(y, self.model.classes_[np.argmax(train_proba, axis=1)])
+        test_acc = accuracy_score(y, oof_pred)
         logger.info(f"Training accuracy: {train_acc:.4f}")
-        logger.info(f"Test accuracy: {test_acc:.4f}")
-        
-        # Cross-validation score
-        logger.info("Performing cross-validation...")
-        cv_scores = cross_val_score(self.model, X, y, cv=5)
+        logger.info(f"Test accuracy (out-of-fold): {test_acc:.4f}")
         logger.info(f"CV score: {cv_scores.mean():.4f} (+/- {cv_scores.std():.4f})")
         
         metrics = {
@@ -104,12 +216,182 @@ class CFBModel:
             "test_accuracy": test_acc,
             "cv_mean": cv_scores.mean(),
             "cv_std": cv_scores.std(),
-            "feature_importance": dict(zip(X.columns, self.model.feature_importances_)),
-            "classification_report": classification_report(y_test, test_pred)
+            "cv_scores": cv_scores.tolist(),
+            "oof_accuracy": test_acc,
+            "feature_importance": dict(zip(X.columns, self._feature_importance())),
+            "classification_report": classification_report(y, oof_pred)
         }
+        self.metrics = metrics
+        self.data_hash = artifact.data_hash(X, y)
         
         return metrics
     
+    @property
+    def categorical_features(self) -> bool:
+        """Whether the model expects create_training_data(categorical=True) features"""
+        return self.model_type == "hist_gradient_boosting"
+    
+    @property
+    def incremental_refresh(self) -> bool:
+        """Whether refresh() can update the model in place instead of retraining it"""
+        if self.model_type == "stacked_ensemble":
+            return False
+        # Histogram boosting refits its category encoding on every fit, so a
+        # warm start on a few weeks' games would remap the categories that the
+        # existing trees split on
+        is_categorical = getattr(self.model, 'is_categorical_', None)
+        return is_categorical is None or not np.any(is_categorical)
+    
+    def _feature_importance(self) -> np.ndarray:
+        """Tree importances, or absolute standardized coefficients for linear models"""
+        if hasattr(self.model, 'feature_importances_'):
+            return self.model.feature_importances_
+        if self.model_type == "logistic_regression":
+            return np.abs(self.model[-1].coef_).mean(axis=0)
+        # Histogram boosting has no impurity-based importances
+        return np.full(self.model.n_features_in_, np.nan)
+    
+    def check_drift(self, X_new: pd.DataFrame, y_new: pd.Series,
+                    tolerance: float = config.REFRESH_DRIFT_TOLERANCE) -> Tuple[bool, float]:
+        """
+        Whether the model has degraded on newly completed games
+        
+        Compares accuracy on the new games, predicted before the model has
+        seen them, with the holdout accuracy recorded at training time.
+        
+        Args:
+            X_new: Features of the new games
+            y_new: Outcomes of the new games
+            tolerance: Allowed drop in accuracy
+            
+        Returns:
+            Tuple of (drifted, accuracy on the new games)
+        """
+        accuracy = accuracy_score(y_new, self.predict(X_new))
+        baseline = self.metrics.get("test_accuracy")
+        drifted = baseline is not None and accuracy < baseline - tolerance
+        if drifted:
+            logger.warning(f"Accuracy on new games {accuracy:.4f} is below the training "
+                           f"baseline {baseline:.4f} by more than {tolerance:.2f}")
+        return drifted, accuracy
+    
+    def refresh(self, X_new: pd.DataFrame, y_new: pd.Series,
+                X_history: Optional[pd.DataFrame] = None, y_history: Optional[pd.Series] = None,
+                policy: str = config.REFRESH_POLICY,
+                n_new_estimators: int = config.REFRESH_N_ESTIMATORS,
+                drift_tolerance: float = config.REFRESH_DRIFT_TOLERANCE) -> Dict[str, Any]:
+        """
+        Update a trained model with newly completed games
+        
+        With the "incremental" policy the model is updated in place: random
+        forests grow n_new_estimators extra trees on the new games, gradient
+        boosting continues with n_new_estimators more stages fitted to the
+        new games, and logistic regression takes partial_fit steps. A full
+        retrain on history + new games happens instead with the "full"
+        policy, when check_drift() reports degraded accuracy, or when the new
+        games don't contain both outcomes. Stacked ensembles and histogram
+        boosting with categorical features are always retrained in full (see
+        incremental_refresh).
+        
+        Args:
+            X_new: Features of the new games
+            y_new: Outcomes of the new games
+            X_history: Features the model was trained on (needed for a full
+                retrain)
+            y_history: Outcomes aligned with X_history
+            policy: "incremental" or "full"
+            n_new_estimators: Trees or boosting stages added per refresh
+            drift_tolerance: Allowed accuracy drop before a full retrain
+            
+        Returns:
+            Dictionary with the refresh mode ("incremental" or "full"), the
+            accuracy on the new games before the update and whether drift
+            was detected; a full retrain also includes the train() metrics
+            
+        Raises:
+            ValueError: For an unknown policy, or a full retrain without history
+        """
+        if policy not in ("incremental", "full"):
+            raise ValueError(f"Unknown refresh policy: {policy}")
+        if X_new.empty or len(y_new) == 0:
+            raise ValueError("Cannot refresh on empty dataset")
+        if len(X_new) != len(y_new):
+            raise ValueError(f"X and y must have same length. Got X={len(X_new)}, y={len(y_new)}")
+        if not hasattr(self.model, 'fit'):
+            raise ValueError("Memory-mapped artifacts are prediction-only; load the pickled model to refresh")
+        
+        self.check_features(X_new)
+        drifted, accuracy = self.check_drift(X_new, y_new, drift_tolerance)
+        missing_outcomes = self.missing_outcomes(y_new)
+        result = {"new_games": len(X_new), "new_accuracy": accuracy, "drift": drifted}
+        
+        if policy == "full" or drifted or missing_outcomes or not self.incremental_refresh:
+            if X_history is None or y_history is None:
+                raise ValueError("A full retrain needs X_history and y_history")
+            reason = ('drift' if drifted else 'policy' if policy == 'full'
+                      else 'single-outcome week' if missing_outcomes else 'no incremental update')
+            logger.info(f"Full retrain of {self.model_type} model ({reason})")
+            X_all = pd.concat([X_history, X_new[X_history.columns]], ignore_index=True)
+            # Concatenating differing category sets falls back to object dtype
+            for col in set(X_new.select_dtypes('category').columns) | set(X_history.select_dtypes('category').columns):
+                X_all[col] = X_all[col].astype('category')
+            y_all = pd.concat([pd.Series(np.asarray(y_history)), pd.Series(np.asarray(y_new))],
+                              ignore_index=True)
+            # Start from the configured estimator, not one that earlier
+            # incremental refreshes grew
+            self.model = CFBModel(self.model_type, n_jobs=self.n_jobs, params=self.params).model
+            return dict(result, mode="full", **self.train(X_all, y_all))
+        
+        logger.info(f"Incremental refresh of {self.model_type} model on {len(X_new)} games")
+        y_new = np.asarray(y_new)
+        if self.model_type == "logistic_regression":
+            scaler, classifier = self.model[0], self.model[-1]
+            scaler.partial_fit(X_new)
+            classifier.partial_fit(scaler.transform(X_new), y_new)
+        else:
+            # Forests add trees fitted on the new games; boosting continues
+            # from its existing stages
+            if self.model_type == "hist_gradient_boosting":
+                # Early stopping may have kept fewer stages than max_iter
+                params = {"max_iter": self.model.n_iter_ + n_new_estimators}
+            else:
+                params = {"n_estimators": self.model.n_estimators + n_new_estimators}
+            self.model.set_params(warm_start=True, **params)
+            try:
+                self.model.fit(X_new, y_new)
+            finally:
+                self.model.set_params(warm_start=False)
+        # Fold models and out-of-fold predictions describe the old fit
+        self.fold_models = []
+        self.oof_proba = None
+        # The model now depends on the new games too (model versions and
+        # artifact manifests are keyed by this hash)
+        self.data_hash = hashlib.sha256(
+            f"{self.data_hash}:{artifact.data_hash(X_new, y_new)}".encode()).hexdigest()
+        return dict(result, mode="incremental")
+    
+    def missing_outcomes(self, y_new) -> bool:
+        """
+        Whether new games lack one of the outcomes the model was trained on
+        
+        refresh() retrains such weeks in full: new trees trained on a single
+        outcome would skew the ensemble. Logistic regression's partial_fit
+        steps are unaffected.
+        """
+        return (self.model_type != "logistic_regression"
+                and set(np.unique(y_new)) != set(self.model.classes_))
+    
+    def check_features(self, X: pd.DataFrame):
+        """
+        Fail fast if X's columns differ from the features the model was trained on
+        
+        Raises:
+            ValueError: Naming the missing and unexpected columns
+        """
+        expected = getattr(self.model, 'feature_names_in_', None)
+        if expected is not None and isinstance(X, pd.DataFrame):
+            artifact.check_features(expected, X.columns)
+    
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """
         Make predictions
@@ -120,6 +402,7 @@ class CFBModel:
         Returns:
             Array of predictions
         """
+        self.check_features(X)
         return self.model.predict(X)
     
     def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
@@ -132,8 +415,31 @@ class CFBModel:
         Returns:
             Array of prediction probabilities
         """
+        self.check_features(X)
         return self.model.predict_proba(X)
     
+    def predict_with_confidence(self, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Predict labels, probabilities and confidence from a single pass
+        
+        predict() and predict_proba() each evaluate every tree; this calls
+        predict_proba() once and derives the rest from it.
+        
+        Args:
+            X: Feature matrix
+            
+        Returns:
+            Tuple of (predictions, probabilities, confidence): the predicted
+            class, the class probabilities (columns ordered as model.classes_)
+            and the probability of the predicted class
+        """
+        self.check_features(X)
+        probabilities = self.model.predict_proba(X)
+        best = np.argmax(probabilities, axis=1)
+        predictions = self.model.classes_[best]
+        confidence = probabilities[np.arange(len(best)), best]
+        return predictions, probabilities, confidence
+    
     def save(self, filepath: str):
         """
         Save model to file
@@ -155,24 +461,58 @@ class CFBModel:
             logger.error(f"Error saving model: {e}")
             raise IOError(f"Failed to save model to {filepath}: {e}")
     
-    def load(self, filepath: str):
+    def save_artifact(self, path: str) -> str:
+        """
+        Save the trained model as a memory-mappable artifact directory
+        
+        Records the feature names, training data hash and training metrics
+        in the artifact's manifest (see artifact.py).
+        
+        Args:
+            path: Artifact directory
+            
+        Returns:
+            The artifact path
+        """
+        return artifact.save_artifact(self.model, path, metrics=self.metrics,
+                                      training_hash=self.data_hash, model_type=self.model_type)
+    
+    def load(self, filepath: str, feature_names: Optional[list] = None):
         """
-        Load model from file
+        Load model from a pickle file or an artifact directory
+        
+        Artifacts are memory-mapped and can only be used for prediction.
         
         Args:
             filepath: Path to load the model from
+            feature_names: Features the caller will predict with; a mismatch
+                with an artifact's recorded features fails before loading
             
         Raises:
             FileNotFoundError: If model file doesn't exist
             IOError: If unable to load the model
+            ValueError: If feature_names doesn't match the artifact
         """
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Model file not found: {filepath}")
         
+        if artifact.is_artifact(filepath):
+            loaded = artifact.load_artifact(filepath, feature_names=feature_names)
+            self.model = loaded.ensemble
+            self.model_type = loaded.manifest.get('model_type') or self.model_type
+            self.metrics = loaded.metrics
+            self.data_hash = loaded.manifest.get('training_data_hash')
+            return
+        
         try:
             with open(filepath, 'rb') as f:
                 self.model = pickle.load(f)
+            self.model_type = _model_type_of(self.model) or self.model_type
             logger.info(f"Model loaded successfully from {filepath}")
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise IOError(f"Failed to load model from {filepath}: {e}")
+        
+        expected = getattr(self.model, 'feature_names_in_', None)
+        if feature_names is not None and expected is not None:
+            artifact.check_features(expected, feature_names)
@@ -7,10 +7,32 @@ import numpy as np
 import logging
 from typing import Tuple
 
+from rolling_features import (ROLLING_DIFF_COLUMNS, ROLLING_FEATURE_COLUMNS,
+                              TeamAccumulators, build_rolling_features,
+                              update_rolling_features)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-team feature name -> CFBD season stat name
+STAT_FEATURE_MAP = {
+    'off_total_yards': 'totalYards',
+    'off_passing_yards': 'netPassingYards',
+    'off_rushing_yards': 'rushingYards',
+    'off_points': 'points',  # Will be 0 as points not in stats
+}
+
+TEAM_FEATURE_COLUMNS = list(STAT_FEATURE_MAP) + ['talent']
+
+# Categorical features for create_training_data(categorical=True), with the
+# source column names they may arrive under
+CATEGORICAL_FEATURE_COLUMNS = {
+    'home_conference': ('home_conference', 'homeConference'),
+    'away_conference': ('away_conference', 'awayConference'),
+    'week': ('week',),
+}
+
 
 class CFBPreprocessor:
     """Preprocessor for college football data"""
@@ -42,91 +64,193 @@ class CFBPreprocessor:
         
         logger.info(f"Preparing features for {len(games_df)} games")
         
+        # Build one row of team features per team, then join it onto the
+        # games for both sides of the matchup
+        team_features = self.build_team_features(team_stats_df, talent_df)
+        return self.join_team_features(games_df, team_features)
+    
+    def join_team_features(self, games_df: pd.DataFrame,
+                           team_features: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add home/away team features and their differences to games
+        
+        Args:
+            games_df: DataFrame with game information
+            team_features: build_team_features output (can be reused across
+                calls, e.g. by a long-running prediction service)
+            
+        Returns:
+            Copy of games_df with the engineered feature columns
+        """
         # Create a copy to avoid modifying original
         features = games_df.copy()
         
-        # Convert team stats to dict for easy lookup
+        # Handle both snake_case and camelCase column names
+        home_teams = self._team_column(games_df, 'homeTeam', 'home_team')
+        away_teams = self._team_column(games_df, 'awayTeam', 'away_team')
+        
+        # reindex only fills teams that are missing from the lookup, so stat
+        # values that are genuinely NaN are preserved
+        home = team_features.reindex(home_teams, fill_value=0)
+        away = team_features.reindex(away_teams, fill_value=0)
+        
+        for col in TEAM_FEATURE_COLUMNS:
+            features[f'home_{col}'] = home[col].to_numpy()
+        for col in TEAM_FEATURE_COLUMNS:
+            features[f'away_{col}'] = away[col].to_numpy()
+        
+        # Calculate differential features
+        features['talent_diff'] = features['home_talent'] - features['away_talent']
+        features['yards_diff'] = features['home_off_total_yards'] - features['away_off_total_yards']
+        features['points_diff'] = features['home_off_points'] - features['away_off_points']
+        
+        return features
+    
+    def prepare_lake_features(self, lake, seasons, weeks=None) -> pd.DataFrame:
+        """
+        Prepare game features for several seasons stored in a DataLake
+        
+        Each season is joined against its own team statistics, and only the
+        columns and stats the feature builder uses are read from disk.
+        
+        Args:
+            lake: storage.DataLake with games, team_stats and talent ingested
+            seasons: Season years to load
+            weeks: Weeks of games to load (default: all)
+            
+        Returns:
+            DataFrame with engineered features for all requested seasons
+        """
+        season_features = []
+        for season in seasons:
+            games, team_stats, talent = lake.load_feature_inputs(season, weeks=weeks)
+            if games.empty or team_stats.empty:
+                logger.warning(f"Skipping season {season}: no games or team stats in the data lake")
+                continue
+            season_features.append(self.prepare_game_features(games, team_stats, talent))
+        
+        if not season_features:
+            raise ValueError("No seasons with both games and team stats found in the data lake")
+        return pd.concat(season_features, ignore_index=True)
+    
+    def prepare_rolling_features(self, games_df: pd.DataFrame,
+                                 game_stats_df: pd.DataFrame = None,
+                                 advanced_game_stats_df: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Prepare point-in-time features from the games played so far
+        
+        Unlike prepare_game_features, which joins full-season aggregates,
+        each game only sees results from earlier weeks of its season.
+        
+        Args:
+            games_df: DataFrame with game information (one or more seasons)
+            game_stats_df: Per-team box score stats (game_stats format, optional)
+            advanced_game_stats_df: Per-team advanced stats (advanced_game_stats
+                format, optional)
+            
+        Returns:
+            DataFrame with rolling home_/away_ features and differentials
+        """
+        if games_df.empty:
+            raise ValueError("games_df cannot be empty")
+        
+        logger.info(f"Preparing rolling features for {len(games_df)} games")
+        return build_rolling_features(games_df, game_stats_df, advanced_game_stats_df)
+    
+    def update_rolling_features(self, state: TeamAccumulators, games_df: pd.DataFrame,
+                                game_stats_df: pd.DataFrame = None,
+                                advanced_game_stats_df: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Prepare rolling features for new games against a persisted season state
+        
+        Only games after state.last_processed_week are processed; completed
+        ones are folded into the state, so a weekly run costs O(new games).
+        Save the state afterwards (state.save) to carry it to the next run.
+        
+        Args:
+            state: rolling_features.TeamAccumulators for the season (see
+                rolling_features.load_state)
+            games_df: Newly completed and upcoming games of the season
+            game_stats_df: Per-team box score stats for the new games (optional)
+            advanced_game_stats_df: Per-team advanced stats for the new games
+                (optional)
+            
+        Returns:
+            The new games with rolling home_/away_ features and differentials
+        """
+        logger.info(f"Updating rolling features with {len(games_df)} games "
+                    f"after week {state.last_processed_week}")
+        return update_rolling_features(state, games_df, game_stats_df, advanced_game_stats_df)
+    
+    def build_team_features(self, team_stats_df: pd.DataFrame,
+                            talent_df: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Build a per-team feature table from team statistics and talent
+        
+        Args:
+            team_stats_df: DataFrame with team statistics (long or wide format)
+            talent_df: DataFrame with team talent ratings (optional)
+            
+        Returns:
+            DataFrame indexed by team with one column per team feature
+        """
         # Stats come in long format (statName, statValue), need to pivot
-        stats_dict = {}
         if 'statName' in team_stats_df.columns and 'statValue' in team_stats_df.columns:
-            # Pivot the stats data
             logger.info("Pivoting team statistics from long to wide format")
-            for team_name in team_stats_df['team'].unique():
-                team_data = team_stats_df[team_stats_df['team'] == team_name]
-                stats_dict[team_name] = dict(zip(team_data['statName'], team_data['statValue']))
-            logger.info(f"Processed stats for {len(stats_dict)} teams")
+            long_stats = team_stats_df.drop_duplicates(['team', 'statName'], keep='last')
+            wide_stats = long_stats.set_index(['team', 'statName'])['statValue'].unstack(fill_value=0)
         else:
             # Legacy format - stats are already in wide format
             logger.info("Processing team statistics in wide format")
-            for _, row in team_stats_df.iterrows():
-                team = row.get('team', row.get('school', ''))
-                if team:
-                    stats_dict[team] = row.to_dict()
+            team_col = 'team' if 'team' in team_stats_df.columns else 'school'
+            wide_stats = team_stats_df
+            if team_col in team_stats_df.columns:
+                wide_stats = wide_stats[wide_stats[team_col].notna() & (wide_stats[team_col] != '')]
+                wide_stats = wide_stats.drop_duplicates(team_col, keep='last').set_index(team_col)
+            else:
+                wide_stats = wide_stats.iloc[0:0]
+        logger.info(f"Processed stats for {len(wide_stats)} teams")
+        
+        team_features = pd.DataFrame(index=wide_stats.index)
+        for col, stat_name in STAT_FEATURE_MAP.items():
+            if stat_name in wide_stats.columns:
+                team_features[col] = wide_stats[stat_name]
+            else:
+                team_features[col] = 0
         
         # Create talent lookup if available
-        talent_dict = {}
-        if talent_df is not None and not talent_df.empty:
+        if talent_df is not None and not talent_df.empty and 'school' in talent_df.columns:
             logger.info(f"Processing talent ratings for {len(talent_df)} teams")
-            for _, row in talent_df.iterrows():
-                team = row.get('school', '')
-                if team:
-                    talent_dict[team] = row.get('talent', 0)
+            talent = talent_df[talent_df['school'].notna() & (talent_df['school'] != '')]
+            talent = talent.drop_duplicates('school', keep='last').set_index('school')
+            talent = talent['talent'] if 'talent' in talent.columns else pd.Series(0, index=talent.index)
+            team_features = team_features.reindex(team_features.index.union(talent.index), fill_value=0)
+            team_features['talent'] = talent.reindex(team_features.index, fill_value=0)
         else:
             logger.info("No talent ratings provided")
+            team_features['talent'] = 0
         
-        # Add features for home and away teams
-        home_features = []
-        away_features = []
-        
-        for _, game in features.iterrows():
-            # Handle both snake_case and camelCase column names
-            home_team = game.get('homeTeam', game.get('home_team', ''))
-            away_team = game.get('awayTeam', game.get('away_team', ''))
-            
-            # Get stats for home team
-            home_stats = stats_dict.get(home_team, {})
-            away_stats = stats_dict.get(away_team, {})
-            
-            # Extract key statistics
-            home_dict = {
-                'home_off_total_yards': home_stats.get('totalYards', 0),
-                'home_off_passing_yards': home_stats.get('netPassingYards', 0),
-                'home_off_rushing_yards': home_stats.get('rushingYards', 0),
-                'home_off_points': home_stats.get('points', 0),  # Will be 0 as points not in stats
-                'home_talent': talent_dict.get(home_team, 0)
-            }
-            
-            away_dict = {
-                'away_off_total_yards': away_stats.get('totalYards', 0),
-                'away_off_passing_yards': away_stats.get('netPassingYards', 0),
-                'away_off_rushing_yards': away_stats.get('rushingYards', 0),
-                'away_off_points': away_stats.get('points', 0),  # Will be 0 as points not in stats
-                'away_talent': talent_dict.get(away_team, 0)
-            }
-            
-            home_features.append(home_dict)
-            away_features.append(away_dict)
-        
-        # Add features to dataframe
-        for key in home_features[0].keys():
-            features[key] = [f[key] for f in home_features]
-        
-        for key in away_features[0].keys():
-            features[key] = [f[key] for f in away_features]
-        
-        # Calculate differential features
-        features['talent_diff'] = features['home_talent'] - features['away_talent']
-        features['yards_diff'] = features['home_off_total_yards'] - features['away_off_total_yards']
-        features['points_diff'] = features['home_off_points'] - features['away_off_points']
-        
-        return features
+        return team_features[TEAM_FEATURE_COLUMNS]
     
-    def create_training_data(self, features_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    @staticmethod
+    def _team_column(games_df: pd.DataFrame, camel: str, snake: str) -> pd.Series:
+        """Return the team name column for either game schema"""
+        if camel in games_df.columns:
+            return games_df[camel]
+        if snake in games_df.columns:
+            return games_df[snake]
+        return pd.Series([''] * len(games_df), index=games_df.index)
+    
+    def create_training_data(self, features_df: pd.DataFrame,
+                             categorical: bool = False) -> Tuple[pd.DataFrame, pd.Series]:
         """
         Create training data from features DataFrame
         
         Args:
             features_df: DataFrame with game features
+            categorical: Also include conferences and week as pandas category
+                columns (for model_type="hist_gradient_boosting", which
+                splits on them natively instead of one-hot encoding)
             
         Returns:
             Tuple of (X, y) where X is features and y is target
@@ -139,12 +263,22 @@ class CFBPreprocessor:
             'away_off_points', 'away_talent',
             'talent_diff', 'yards_diff', 'points_diff'
         ]
+        # Point-in-time features from prepare_rolling_features
+        feature_cols += [f'{side}_{col}' for side in ('home', 'away') for col in ROLLING_FEATURE_COLUMNS]
+        feature_cols += ROLLING_DIFF_COLUMNS
         
         # Filter to only include columns that exist
         available_cols = [col for col in feature_cols if col in features_df.columns]
         
         X = features_df[available_cols].fillna(0)
         
+        if categorical:
+            for name, candidates in CATEGORICAL_FEATURE_COLUMNS.items():
+                source = next((col for col in candidates if col in features_df.columns), None)
+                if source is not None:
+                    # Missing values stay missing; the model treats them as their own bin
+                    X[name] = features_df[source].astype('category')
+        
         # Create target variable (home team win = 1, loss = 0)
         # Handle both snake_case and camelCase column names
         home_points_col = 'homePoints' if 'homePoints' in features_df.columns else 'home_points'
@@ -0,0 +1,156 @@
+"""
+Client-side token-bucket rate limiter for the College Football Data API
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Lower values are served first
+PRIORITY_CURRENT = 0   # in-progress season, e.g. this week's games
+PRIORITY_BACKFILL = 1  # completed seasons
+
+
+class TokenBucketRateLimiter:
+    """Thread-safe token bucket with per-endpoint weights and priority ordering"""
+
+    def __init__(self, rate: float = config.API_RATE_LIMIT_PER_SECOND,
+                 burst: float = config.API_RATE_LIMIT_BURST,
+                 endpoint_weights: Optional[Dict[str, float]] = None):
+        """
+        Initialize the rate limiter
+
+        Args:
+            rate: Tokens added to the bucket per second
+            burst: Bucket capacity, i.e. the largest allowed burst of requests
+            endpoint_weights: Tokens consumed per request by endpoint (default: 1)
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive. Got {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1. Got {burst}")
+
+        self.rate = rate
+        self.burst = burst
+        self.endpoint_weights = dict(config.API_ENDPOINT_WEIGHTS if endpoint_weights is None
+                                     else endpoint_weights)
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+        self._metrics = {
+            "requests": 0,
+            "throttled_requests": 0,
+            "throttle_wait_seconds": 0.0,
+            "max_throttle_wait_seconds": 0.0,
+            "http_429": 0,
+            "requests_by_priority": {},
+        }
+
+    def weight(self, endpoint: str) -> float:
+        """Tokens consumed by one request to an endpoint"""
+        return min(self.endpoint_weights.get(endpoint, 1), self.burst)
+
+    def acquire(self, endpoint: str, priority: int = PRIORITY_BACKFILL) -> float:
+        """
+        Block until a request to the endpoint may be sent
+
+        Waiting requests are served strictly in priority order, so a
+        current-week request queued behind a backfill pre-empts it.
+
+        Args:
+            endpoint: API path, e.g. "/games"
+            priority: PRIORITY_CURRENT or PRIORITY_BACKFILL
+
+        Returns:
+            Seconds spent waiting for the bucket
+        """
+        weight = self.weight(endpoint)
+        start = time.monotonic()
+
+        with self._condition:
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    is_next = self._waiters[0] == entry
+                    if is_next and now >= self._blocked_until and self._tokens >= weight:
+                        self._tokens -= weight
+                        heapq.heappop(self._waiters)
+                        break
+
+                    if is_next:
+                        timeout = max((weight - self._tokens) / self.rate,
+                                      self._blocked_until - now, 0.0)
+                    else:
+                        # Woken up when the request ahead of us is served
+                        timeout = None
+                    self._condition.wait(timeout)
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                raise
+            finally:
+                self._condition.notify_all()
+
+            waited = time.monotonic() - start
+            self._record(priority, waited)
+
+        if waited > 0.001:
+            logger.debug(f"Throttled {endpoint} for {waited:.3f}s")
+        return waited
+
+    def record_throttled(self, retry_after: Optional[float] = None):
+        """
+        Record a 429 response and pause all requests
+
+        Args:
+            retry_after: Seconds the server asked us to wait (default: one
+                full bucket refill)
+        """
+        pause = retry_after if retry_after is not None else self.burst / self.rate
+        with self._condition:
+            self._metrics["http_429"] += 1
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+            self._condition.notify_all()
+        logger.warning(f"API rate limit hit; pausing requests for {pause:.1f}s")
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of request, throttle-wait and 429 counters"""
+        with self._condition:
+            snapshot = dict(self._metrics)
+            snapshot["requests_by_priority"] = dict(self._metrics["requests_by_priority"])
+        return snapshot
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def _record(self, priority: int, waited: float):
+        metrics = self._metrics
+        metrics["requests"] += 1
+        by_priority = metrics["requests_by_priority"]
+        by_priority[priority] = by_priority.get(priority, 0) + 1
+        if waited > 0.001:
+            metrics["throttled_requests"] += 1
+            metrics["throttle_wait_seconds"] += waited
+            metrics["max_throttle_wait_seconds"] = max(metrics["max_throttle_wait_seconds"], waited)
@@ -0,0 +1,355 @@
+"""
+Local model registry
+
+Every trained model gets a version: a hash of the training code and config,
+the hyperparameters and the training data. The registry keeps each version's
+artifact, pickled estimator and metadata, plus the feature matrix it was
+trained on, keyed by a hash of the raw inputs and feature code:
+
+    .cfb_registry/
+        features/<feature key>/   X.npy, y.npy, features.json (category
+                                  columns are stored as codes, their
+                                  categories in features.json)
+        models/<version>/         manifest.json + .npy blobs (see artifact.py),
+                                  model.pkl, entry.json
+
+Training through the registry with unchanged inputs is a cache hit: the
+cached feature matrix replaces feature engineering, and the stored model
+replaces fitting.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import artifact
+import config
+import model as model_module
+import preprocessor
+import rolling_features
+from model import CFBModel
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Modules whose source determines the features and the fitted model
+FEATURE_MODULES = (preprocessor, rolling_features)
+MODEL_MODULES = (model_module, artifact)
+# Config values that change training results
+CONFIG_KEYS = ('RANDOM_STATE', 'TEST_SIZE', 'CV_FOLDS')
+
+
+def _digest(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _source_hash(modules) -> str:
+    """Hash of the source files of the given modules"""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _frame_hash(df: Optional[pd.DataFrame]) -> Optional[str]:
+    """data_hash() that also copes with nested API values (lists, dicts)"""
+    if df is None:
+        return None
+    try:
+        return artifact.data_hash(df)
+    except TypeError:
+        return hashlib.sha256(df.to_json(orient='split', default_handler=str).encode()).hexdigest()
+
+
+def _encode_features(X: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, list]]:
+    """
+    Feature matrix as float64, with category columns stored as their codes
+
+    Returns:
+        Tuple of (values, categories of each category column)
+    """
+    categories, columns = {}, {}
+    for col in X.columns:
+        if isinstance(X[col].dtype, pd.CategoricalDtype):
+            codes = X[col].cat.codes
+            categories[str(col)] = X[col].cat.categories.tolist()
+            columns[col] = codes.where(codes >= 0).astype(np.float64)
+        else:
+            columns[col] = X[col]
+    return pd.DataFrame(columns, index=X.index).to_numpy(dtype=np.float64), categories
+
+
+def _decode_features(values: np.ndarray, columns, categories: Dict[str, list]) -> pd.DataFrame:
+    """Inverse of _encode_features"""
+    X = pd.DataFrame(values, columns=columns)
+    for col, cats in categories.items():
+        codes = X[col].fillna(-1).astype(int).to_numpy()
+        X[col] = pd.Categorical.from_codes(codes, categories=cats)
+    return X
+
+
+def _replace_dir(tmp_path: str, path: str):
+    """Move a finished directory into place unless another writer got there first"""
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # The same content was written concurrently; keep the existing copy
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+class ModelRegistry:
+    """Versioned models and cached training feature matrices on local disk"""
+
+    def __init__(self, root: str = config.REGISTRY_DIR):
+        """
+        Initialize the registry
+
+        Args:
+            root: Registry directory (created on first write)
+        """
+        self.root = root
+        self.features_dir = os.path.join(root, 'features')
+        self.models_dir = os.path.join(root, 'models')
+
+    # Feature matrices
+
+    def feature_key(self, inputs: Dict[str, Optional[pd.DataFrame]],
+                    feature_params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Key of the feature matrix built from raw inputs
+
+        Args:
+            inputs: Raw input frames by name (e.g. games, team_stats, talent)
+            feature_params: Anything else that changes the features (e.g.
+                {"rolling": True})
+
+        Returns:
+            Hex key
+        """
+        return _digest({
+            'inputs': {name: _frame_hash(df) for name, df in inputs.items()},
+            'params': feature_params or {},
+            'code': _source_hash(FEATURE_MODULES),
+        })[:16]
+
+    def load_features(self, key: str) -> Optional[Tuple[pd.DataFrame, pd.Series]]:
+        """Cached (X, y) for a feature key, or None"""
+        path = os.path.join(self.features_dir, key)
+        if not os.path.exists(os.path.join(path, 'features.json')):
+            return None
+        with open(os.path.join(path, 'features.json')) as f:
+            meta = json.load(f)
+        X = _decode_features(np.load(os.path.join(path, 'X.npy')), meta['columns'],
+                             meta.get('categories', {}))
+        y = pd.Series(np.load(os.path.join(path, 'y.npy')), name=meta.get('target'))
+        logger.info(f"Loaded cached feature matrix {key} ({X.shape[0]}x{X.shape[1]})")
+        return X, y
+
+    def save_features(self, key: str, X: pd.DataFrame, y: pd.Series,
+                      inputs: Optional[Dict[str, Optional[pd.DataFrame]]] = None) -> str:
+        """
+        Store a training feature matrix under its key
+
+        Returns:
+            The feature directory
+        """
+        path = os.path.join(self.features_dir, key)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        values, categories = _encode_features(X)
+        np.save(os.path.join(tmp_path, 'X.npy'), values)
+        np.save(os.path.join(tmp_path, 'y.npy'), np.asarray(y))
+        meta = {
+            'columns': [str(c) for c in X.columns],
+            'categories': categories,
+            'target': y.name,
+            'rows': len(X),
+            'inputs': {name: (0 if df is None else len(df)) for name, df in (inputs or {}).items()},
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        with open(os.path.join(tmp_path, 'features.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        _replace_dir(tmp_path, path)
+        return path
+
+    # Models
+
+    def model_version(self, X: pd.DataFrame, y: pd.Series, model_type: str,
+                      train_params: Optional[Dict[str, Any]] = None,
+                      params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Version of the model trained on X, y with the given settings
+
+        Args:
+            X: Training features
+            y: Training target
+            model_type: CFBModel model type
+            train_params: Keyword arguments passed to CFBModel.train
+            params: CFBModel hyperparameter overrides (e.g. a tuning profile)
+
+        Returns:
+            Hex version
+        """
+        hyperparameters = CFBModel(model_type=model_type, params=params).model.get_params()
+        # Parallelism doesn't change the fitted model
+        hyperparameters.pop('n_jobs', None)
+        return _digest({
+            'data': artifact.data_hash(X, y),
+            'model_type': model_type,
+            'hyperparameters': hyperparameters,
+            'train': {k: v for k, v in (train_params or {}).items() if k != 'n_jobs'},
+            'config': {key: getattr(config, key) for key in CONFIG_KEYS},
+            'code': _source_hash(MODEL_MODULES),
+        })[:16]
+
+    def has_version(self, version: str) -> bool:
+        return os.path.exists(os.path.join(self.models_dir, version, 'entry.json'))
+
+    def entry(self, version: str) -> Dict[str, Any]:
+        """Metadata recorded for a version"""
+        path = os.path.join(self.models_dir, version, 'entry.json')
+        if not os.path.exists(path):
+            raise KeyError(f"Unknown model version: {version}")
+        with open(path) as f:
+            return json.load(f)
+
+    def register(self, model: CFBModel, version: str, feature_key: Optional[str] = None,
+                 train_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Store a trained model under its version
+
+        Args:
+            model: Trained CFBModel
+            version: Output of model_version() for its training inputs
+            feature_key: Key of the cached feature matrix it was trained on
+            train_params: Keyword arguments that were passed to CFBModel.train
+
+        Returns:
+            The version's entry
+        """
+        path = os.path.join(self.models_dir, version)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+
+        try:
+            model.save_artifact(tmp_path)
+        except ValueError as e:
+            # Non-tree models are kept as pickles only
+            logger.info(f"No artifact for {model.model_type} model: {e}")
+            os.makedirs(tmp_path)
+        with open(os.path.join(tmp_path, 'model.pkl'), 'wb') as f:
+            pickle.dump(model.model, f)
+        entry = {
+            'version': version,
+            'model_type': model.model_type,
+            'params': model.params,
+            'feature_key': feature_key,
+            'training_data_hash': model.data_hash,
+            'train_params': train_params or {},
+            'metrics': json.loads(json.dumps(model.metrics, default=str)),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        with open(os.path.join(tmp_path, 'entry.json'), 'w') as f:
+            json.dump(entry, f, indent=2)
+        _replace_dir(tmp_path, path)
+        logger.info(f"Registered {model.model_type} model version {version}")
+        return entry
+
+    def load(self, version: str, mmap: bool = True) -> CFBModel:
+        """
+        Load a registered model
+
+        Args:
+            version: Model version
+            mmap: Memory-map the artifact (prediction only); False, or a
+                model without an artifact, unpickles the full estimator
+
+        Returns:
+            CFBModel
+        """
+        entry = self.entry(version)
+        model = CFBModel(model_type=entry['model_type'], params=entry.get('params'))
+        path = os.path.join(self.models_dir, version)
+        if mmap and artifact.is_artifact(path):
+            model.load(path)
+        else:
+            model.load(os.path.join(path, 'model.pkl'))
+            model.metrics = entry['metrics']
+            model.data_hash = entry['training_data_hash']
+        return model
+
+    def entries(self) -> pd.DataFrame:
+        """All registered versions, newest first"""
+        rows = []
+        if os.path.isdir(self.models_dir):
+            for version in os.listdir(self.models_dir):
+                if self.has_version(version):
+                    entry = self.entry(version)
+                    rows.append({
+                        'version': version,
+                        'model_type': entry['model_type'],
+                        'created': entry['created'],
+                        'feature_key': entry['feature_key'],
+                        'test_accuracy': entry['metrics'].get('test_accuracy'),
+                        'cv_mean': entry['metrics'].get('cv_mean'),
+                    })
+        columns = ['version', 'model_type', 'created', 'feature_key', 'test_accuracy', 'cv_mean']
+        return pd.DataFrame(rows, columns=columns).sort_values('created', ascending=False,
+                                                               ignore_index=True)
+
+    def train(self, inputs: Dict[str, Optional[pd.DataFrame]],
+              build_features: Callable[[], Tuple[pd.DataFrame, pd.Series]],
+              model_type: str = "random_forest",
+              feature_params: Optional[Dict[str, Any]] = None,
+              params: Optional[Dict[str, Any]] = None,
+              **train_params) -> Tuple[CFBModel, Dict[str, Any]]:
+        """
+        Train a model through the registry, reusing cached work
+
+        Args:
+            inputs: Raw input frames that build_features uses
+            build_features: Returns (X, y); only called on a feature cache miss
+            model_type: CFBModel model type
+            feature_params: Extra settings that change the features
+            params: CFBModel hyperparameter overrides (e.g. a tuning profile)
+            **train_params: Passed to CFBModel.train
+
+        Returns:
+            Tuple of (model, entry); entry["features_cached"] and
+            entry["model_cached"] tell which steps were skipped
+        """
+        key = self.feature_key(inputs, feature_params)
+        cached = self.load_features(key)
+        if cached is None:
+            X, y = build_features()
+            self.save_features(key, X, y, inputs)
+            # Train on exactly what a later cache hit will load
+            values, categories = _encode_features(X)
+            X = _decode_features(values, [str(c) for c in X.columns], categories)
+        else:
+            X, y = cached
+
+        version = self.model_version(X, y, model_type, train_params, params)
+        model_cached = self.has_version(version)
+        if model_cached:
+            logger.info(f"Model version {version} already registered; skipping training")
+            model = self.load(version, mmap=False)
+            entry = self.entry(version)
+        else:
+            model = CFBModel(model_type=model_type, params=params)
+            model.train(X, y, **train_params)
+            entry = self.register(model, version, feature_key=key, train_params=train_params)
+
+        return model, dict(entry, features_cached=cached is not None, model_cached=model_cached)
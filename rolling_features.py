@@ -0,0 +1,441 @@
+"""
+Point-in-time rolling team features
+
+Games are walked in chronological order, one week at a time, while running
+per-team totals are kept in flat numpy arrays. Every game is given the
+averages of the games its teams played *before* its week, so no result from
+the game itself (or anything later) leaks into its features. Each game is
+read once and updates its two teams once, so a season costs O(games).
+
+The accumulators for a season can be saved to disk and advanced with just
+the newly completed week, so weekly runs cost O(new games).
+"""
+
+import logging
+import os
+import tempfile
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Running metric -> source column, grouped by the frame it comes from
+SCORE_METRICS = {
+    'points_for': 'points_for',
+    'points_against': 'points_against',
+}
+GAME_STAT_METRICS = {
+    'total_yards': 'totalYards',
+    'passing_yards': 'netPassingYards',
+    'rushing_yards': 'rushingYards',
+}
+ADVANCED_METRICS = {
+    'off_ppa': 'offense_ppa',
+    'off_success_rate': 'offense_successRate',
+    'def_ppa': 'defense_ppa',
+    'def_success_rate': 'defense_successRate',
+}
+# Opponent's total yards in the same game
+ALLOWED_METRICS = {
+    'yards_allowed': 'totalYards',
+}
+
+ROLLING_METRICS = (list(SCORE_METRICS) + list(GAME_STAT_METRICS)
+                   + list(ALLOWED_METRICS) + list(ADVANCED_METRICS))
+
+# Per-team columns emitted for both sides of each game
+ROLLING_FEATURE_COLUMNS = ['games_played'] + [f'avg_{m}' for m in ROLLING_METRICS]
+ROLLING_DIFF_COLUMNS = ['avg_points_diff', 'avg_yards_diff', 'avg_ppa_diff']
+
+# Postseason weeks restart at 1 in the API, so they are ordered after the
+# regular season by offsetting them
+POSTSEASON_WEEK_OFFSET = 100
+
+
+def _column(df: Optional[pd.DataFrame], *names: str) -> Optional[str]:
+    """First of several alternative column names present in a frame"""
+    if df is None:
+        return None
+    for name in names:
+        if name in df.columns:
+            return name
+    return None
+
+
+def game_rounds(games_df: pd.DataFrame) -> np.ndarray:
+    """
+    Chronological round number of each game
+
+    This is the week for regular-season games and POSTSEASON_WEEK_OFFSET +
+    week for postseason games.
+    """
+    rounds = games_df['week'].to_numpy(dtype=np.int64)
+    season_type = _column(games_df, 'seasonType', 'season_type')
+    if season_type is not None:
+        postseason = (games_df[season_type].astype(str) == 'postseason').to_numpy()
+        rounds = np.where(postseason, rounds + POSTSEASON_WEEK_OFFSET, rounds)
+    return rounds
+
+
+class TeamAccumulators:
+    """Running per-team sums and counts for one season"""
+
+    def __init__(self, season: Optional[int] = None):
+        self.season = season
+        self.teams: Dict[str, int] = {}
+        self.sums = np.zeros((0, len(ROLLING_METRICS)))
+        self.counts = np.zeros((0, len(ROLLING_METRICS)), dtype=np.int64)
+        self.games_played = np.zeros(0, dtype=np.int64)
+        # Last round (see game_rounds) whose results have been folded in
+        self.last_processed_week = 0
+
+    def save(self, path: str):
+        """Atomically write the accumulators to an .npz file"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, teams=np.array(list(self.teams), dtype=str),
+                         metrics=np.array(ROLLING_METRICS, dtype=str),
+                         sums=self.sums, counts=self.counts, games_played=self.games_played,
+                         season=np.array(-1 if self.season is None else self.season),
+                         last_processed_week=np.array(self.last_processed_week))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "TeamAccumulators":
+        """
+        Read accumulators written by save()
+
+        Raises:
+            ValueError: If the file was written for a different set of metrics
+        """
+        with np.load(path) as data:
+            if list(data["metrics"]) != ROLLING_METRICS:
+                raise ValueError(f"Feature state {path} was built for different metrics; rebuild it")
+            season = int(data["season"])
+            state = cls(None if season == -1 else season)
+            state.teams = {str(team): i for i, team in enumerate(data["teams"])}
+            state.sums = data["sums"]
+            state.counts = data["counts"]
+            state.games_played = data["games_played"]
+            state.last_processed_week = int(data["last_processed_week"])
+        return state
+
+    def team_index(self, names: Iterable[str]) -> np.ndarray:
+        """Row of each team, adding unseen teams with empty totals"""
+        index = np.fromiter((self.teams.setdefault(str(name), len(self.teams)) for name in names),
+                            dtype=np.int64)
+        grow = len(self.teams) - len(self.games_played)
+        if grow > 0:
+            self.sums = np.vstack([self.sums, np.zeros((grow, self.sums.shape[1]))])
+            self.counts = np.vstack([self.counts, np.zeros((grow, self.counts.shape[1]), dtype=np.int64)])
+            self.games_played = np.concatenate([self.games_played, np.zeros(grow, dtype=np.int64)])
+        return index
+
+    def lookup(self, index: np.ndarray) -> np.ndarray:
+        """
+        Current features for a set of team rows
+
+        Returns:
+            Array of shape (len(index), len(ROLLING_FEATURE_COLUMNS)); averages
+            are NaN for teams with no games yet
+        """
+        counts = self.counts[index]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, self.sums[index] / np.maximum(counts, 1), np.nan)
+        return np.column_stack([self.games_played[index], means])
+
+    def update(self, index: np.ndarray, values: np.ndarray):
+        """
+        Add one row of game results per team row
+
+        Args:
+            index: Team rows, one per team-game
+            values: Array of shape (len(index), len(ROLLING_METRICS)); NaN
+                marks a metric that is missing for that game
+        """
+        present = ~np.isnan(values)
+        np.add.at(self.sums, index, np.where(present, values, 0.0))
+        np.add.at(self.counts, index, present.astype(np.int64))
+        np.add.at(self.games_played, index, 1)
+
+
+def _team_game_results(games: pd.DataFrame, game_stats_df: Optional[pd.DataFrame],
+                       advanced_game_stats_df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    One row per (game, team) with that team's results in ROLLING_METRICS order
+
+    The first half of the rows are the home teams, the second half the away
+    teams, both in the order of games.
+    """
+    ids = games['_game_id'].to_numpy()
+    home, away = games['_home'].to_numpy(), games['_away'].to_numpy()
+    home_pts, away_pts = games['_home_points'].to_numpy(), games['_away_points'].to_numpy()
+    results = pd.DataFrame({
+        '_game_id': np.concatenate([ids, ids]),
+        'team': np.concatenate([home, away]),
+        'opponent': np.concatenate([away, home]),
+        'points_for': np.concatenate([home_pts, away_pts]),
+        'points_against': np.concatenate([away_pts, home_pts]),
+    })
+
+    gs_id = _column(game_stats_df, 'game_id', 'gameId')
+    if gs_id is not None and 'team' in game_stats_df.columns:
+        cols = [c for c in GAME_STAT_METRICS.values() if c in game_stats_df.columns]
+        stats = (game_stats_df[[gs_id, 'team'] + cols]
+                 .rename(columns={gs_id: '_game_id'})
+                 .astype({'team': str})
+                 .drop_duplicates(['_game_id', 'team'], keep='last'))
+        results = results.merge(stats, on=['_game_id', 'team'], how='left')
+        allowed = stats[['_game_id', 'team'] + [c for c in ALLOWED_METRICS.values() if c in cols]]
+        allowed = allowed.rename(columns={'team': 'opponent',
+                                          **{v: k for k, v in ALLOWED_METRICS.items()}})
+        results = results.merge(allowed, on=['_game_id', 'opponent'], how='left')
+
+    adv_id = _column(advanced_game_stats_df, 'gameId', 'game_id')
+    if adv_id is not None and 'team' in advanced_game_stats_df.columns:
+        cols = [c for c in ADVANCED_METRICS.values() if c in advanced_game_stats_df.columns]
+        adv = (advanced_game_stats_df[[adv_id, 'team'] + cols]
+               .rename(columns={adv_id: '_game_id'})
+               .astype({'team': str})
+               .drop_duplicates(['_game_id', 'team'], keep='last'))
+        results = results.merge(adv, on=['_game_id', 'team'], how='left')
+
+    sources = {**SCORE_METRICS, **GAME_STAT_METRICS, **ADVANCED_METRICS,
+               **{k: k for k in ALLOWED_METRICS}}
+    for metric in ROLLING_METRICS:
+        source = sources[metric]
+        results[metric] = (pd.to_numeric(results[source], errors='coerce')
+                           if source in results.columns else np.nan)
+    return results[['team'] + ROLLING_METRICS]
+
+
+def _normalize_games(games_df: pd.DataFrame) -> pd.DataFrame:
+    """Games with the id, team and score columns under fixed names"""
+    home = _column(games_df, 'homeTeam', 'home_team')
+    away = _column(games_df, 'awayTeam', 'away_team')
+    if home is None or away is None or 'week' not in games_df.columns:
+        raise ValueError("games_df needs week and home/away team columns")
+    game_id = _column(games_df, 'id', 'game_id', 'gameId')
+    home_pts = _column(games_df, 'homePoints', 'home_points')
+    away_pts = _column(games_df, 'awayPoints', 'away_points')
+
+    return pd.DataFrame({
+        '_game_id': games_df[game_id].to_numpy() if game_id else np.arange(len(games_df)),
+        '_home': games_df[home].astype(str).to_numpy(),
+        '_away': games_df[away].astype(str).to_numpy(),
+        '_home_points': pd.to_numeric(games_df[home_pts], errors='coerce').to_numpy()
+                        if home_pts else np.nan,
+        '_away_points': pd.to_numeric(games_df[away_pts], errors='coerce').to_numpy()
+                        if away_pts else np.nan,
+        '_round': game_rounds(games_df),
+    }, index=games_df.index)
+
+
+def advance(state: TeamAccumulators, games_df: pd.DataFrame,
+            game_stats_df: Optional[pd.DataFrame] = None,
+            advanced_game_stats_df: Optional[pd.DataFrame] = None) -> np.ndarray:
+    """
+    Emit pre-game features for a batch of games, then fold in their results
+
+    Games are processed round by round in chronological order. Within a
+    round every game is featurized before any of that round's results are
+    added, and only completed games (both scores present) update the totals.
+    A round is folded in once all its games are complete or a later round
+    has results (its missing games were cancelled); a partially played
+    latest round waits, so its remaining results are not lost to the
+    incremental state.
+
+    Args:
+        state: Accumulators for the games' season, updated in place
+        games_df: Games of one season
+        game_stats_df: Per-team box score stats (game_stats format)
+        advanced_game_stats_df: Per-team advanced stats (advanced_game_stats format)
+
+    Returns:
+        Array of shape (len(games_df), 2 * len(ROLLING_FEATURE_COLUMNS)) with the
+        home team's features followed by the away team's, in games_df order
+    """
+    games = _normalize_games(games_df)
+    n_games = len(games)
+    n_features = len(ROLLING_FEATURE_COLUMNS)
+    out = np.empty((n_games, 2 * n_features))
+    if n_games == 0:
+        return out
+
+    results = _team_game_results(games, game_stats_df, advanced_game_stats_df)
+    values = results[ROLLING_METRICS].to_numpy(dtype=np.float64)
+    team_rows = state.team_index(results['team'])
+    completed = np.tile(~(np.isnan(games['_home_points'].to_numpy())
+                          | np.isnan(games['_away_points'].to_numpy())), 2)
+
+    rounds = games['_round'].to_numpy()
+    played_rounds = rounds[completed[:n_games]]
+    last_played = played_rounds.max() if len(played_rounds) else None
+    order = np.argsort(rounds, kind='stable')
+    boundaries = np.flatnonzero(np.diff(rounds[order])) + 1
+    for batch in np.split(order, boundaries):
+        home_rows, away_rows = team_rows[batch], team_rows[batch + n_games]
+        out[batch, :n_features] = state.lookup(home_rows)
+        out[batch, n_features:] = state.lookup(away_rows)
+
+        current = rounds[batch[0]]
+        if last_played is None or current > last_played:
+            continue
+        if current == last_played and not completed[batch].all():
+            continue
+        rows = np.concatenate([batch, batch + n_games])
+        rows = rows[completed[rows]]
+        state.update(team_rows[rows], values[rows])
+        state.last_processed_week = int(current)
+    return out
+
+
+def rolling_feature_frame(games_df: pd.DataFrame, values: np.ndarray) -> pd.DataFrame:
+    """Attach the output of advance() to the games as named columns"""
+    features = games_df.copy()
+    n_features = len(ROLLING_FEATURE_COLUMNS)
+    for i, col in enumerate(ROLLING_FEATURE_COLUMNS):
+        features[f'home_{col}'] = values[:, i]
+        features[f'away_{col}'] = values[:, n_features + i]
+
+    features['avg_points_diff'] = features['home_avg_points_for'] - features['away_avg_points_for']
+    features['avg_yards_diff'] = features['home_avg_total_yards'] - features['away_avg_total_yards']
+    features['avg_ppa_diff'] = features['home_avg_off_ppa'] - features['away_avg_off_ppa']
+    return features
+
+
+def build_rolling_features(games_df: pd.DataFrame,
+                           game_stats_df: Optional[pd.DataFrame] = None,
+                           advanced_game_stats_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Point-in-time team features for every game, in one pass per season
+
+    Args:
+        games_df: Games, possibly spanning several seasons
+        game_stats_df: Per-team box score stats (game_stats format)
+        advanced_game_stats_df: Per-team advanced stats (advanced_game_stats format)
+
+    Returns:
+        games_df with home_/away_ ROLLING_FEATURE_COLUMNS and ROLLING_DIFF_COLUMNS
+        added. Averages are NaN for teams that have not played yet.
+    """
+    if games_df.empty:
+        raise ValueError("games_df cannot be empty")
+
+    values = np.empty((len(games_df), 2 * len(ROLLING_FEATURE_COLUMNS)))
+    if 'season' in games_df.columns:
+        seasons = games_df.groupby('season', sort=True).indices.items()
+    else:
+        seasons = [(None, np.arange(len(games_df)))]
+
+    for season, positions in seasons:
+        logger.info(f"Building rolling features for {len(positions)} games"
+                    + (f" in {season}" if season is not None else ""))
+        values[positions] = advance(TeamAccumulators(season), games_df.iloc[positions],
+                                    game_stats_df, advanced_game_stats_df)
+    return rolling_feature_frame(games_df, values)
+
+
+def state_path(season: int, state_dir: str = config.FEATURE_STATE_DIR) -> str:
+    """File holding a season's persisted accumulators"""
+    return os.path.join(state_dir, f"rolling_{season}.npz")
+
+
+def load_state(season: int, state_dir: str = config.FEATURE_STATE_DIR) -> TeamAccumulators:
+    """
+    Persisted accumulators for a season, or empty ones if none are saved
+
+    Args:
+        season: Season year
+        state_dir: Directory holding the state files
+
+    Returns:
+        TeamAccumulators for the season
+    """
+    path = state_path(season, state_dir)
+    if not os.path.exists(path):
+        logger.info(f"No feature state for {season}; starting from week 0")
+        return TeamAccumulators(season)
+    state = TeamAccumulators.load(path)
+    logger.info(f"Loaded feature state for {season} through week {state.last_processed_week}")
+    return state
+
+
+def update_rolling_features(state: TeamAccumulators, games_df: pd.DataFrame,
+                            game_stats_df: Optional[pd.DataFrame] = None,
+                            advanced_game_stats_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Advance persisted accumulators with new games only
+
+    Games from rounds the state has already folded in are dropped, so a
+    weekly run can pass just the newly completed week plus the upcoming
+    games and pay only for those.
+
+    Args:
+        state: Accumulators for the games' season, updated in place
+        games_df: Games of that season after state.last_processed_week
+        game_stats_df: Per-team box score stats for those games
+        advanced_game_stats_df: Per-team advanced stats for those games
+
+    Returns:
+        The new games with rolling features attached
+    """
+    new = games_df[game_rounds(games_df) > state.last_processed_week]
+    if len(new) < len(games_df):
+        logger.info(f"Skipping {len(games_df) - len(new)} games already in the feature state "
+                    f"(through week {state.last_processed_week})")
+    values = advance(state, new, game_stats_df, advanced_game_stats_df)
+    return rolling_feature_frame(new, values)
+
+
+def verify_state(state: TeamAccumulators, games_df: pd.DataFrame,
+                 game_stats_df: Optional[pd.DataFrame] = None,
+                 advanced_game_stats_df: Optional[pd.DataFrame] = None,
+                 rtol: float = 1e-9) -> bool:
+    """
+    Check incremental accumulators against a full rebuild of the season
+
+    Args:
+        state: Accumulators to check
+        games_df: All games of the state's season
+        game_stats_df: Per-team box score stats for the season
+        advanced_game_stats_df: Per-team advanced stats for the season
+        rtol: Relative tolerance for the running sums
+
+    Returns:
+        True if every team's totals match the rebuild
+    """
+    rebuilt = TeamAccumulators(state.season)
+    games = games_df[game_rounds(games_df) <= state.last_processed_week]
+    advance(rebuilt, games, game_stats_df, advanced_game_stats_df)
+
+    ok = rebuilt.last_processed_week == state.last_processed_week
+    if not ok:
+        logger.warning(f"Feature state is through week {state.last_processed_week} but a rebuild "
+                       f"reaches week {rebuilt.last_processed_week}")
+    for team in set(state.teams) | set(rebuilt.teams):
+        mine = state.teams.get(team)
+        theirs = rebuilt.teams.get(team)
+        played = state.games_played[mine] if mine is not None else 0
+        expected = rebuilt.games_played[theirs] if theirs is not None else 0
+        if played != expected:
+            logger.warning(f"{team}: {played} games in feature state, {expected} in rebuild")
+            ok = False
+        elif played and not (np.array_equal(state.counts[mine], rebuilt.counts[theirs])
+                             and np.allclose(state.sums[mine], rebuilt.sums[theirs], rtol=rtol)):
+            logger.warning(f"{team}: running totals differ from a full rebuild")
+            ok = False
+    return ok
@@ -11,47 +11,10 @@ from datetime import datetime
 from data_fetcher import CFBDataFetcher
 from preprocessor import CFBPreprocessor
 from model import CFBModel
-
-
-def get_current_week(year, start_date=None):
-    """
-    Calculate the current CFB week based on the current date
-    
-    Args:
-        year: Season year
-        start_date: Optional start date of the season
-        
-    Returns:
-        Current week number (0-15 for regular season, where 0 is "Week 0")
-    """
-    from datetime import datetime, timedelta
-    
-    if start_date is None:
-        # CFB season typically starts the Saturday after Labor Day
-        first_day = datetime(year, 9, 1)
-        days_until_monday = (7 - first_day.weekday()) % 7
-        labor_day = first_day + timedelta(days=days_until_monday)
-        season_start = labor_day + timedelta(days=5)
-        
-        # However, some years have Week 0 games the Saturday before Labor Day
-        week_zero_start = datetime(year, 8, 24)
-        while week_zero_start.weekday() != 5:  # 5 = Saturday
-            week_zero_start += timedelta(days=1)
-        
-        # Use week 0 start as actual season start
-        season_start = week_zero_start
-    else:
-        season_start = start_date
-    
-    # Calculate weeks since season start
-    current_date = datetime.now()
-    days_since_start = (current_date - season_start).days
-    current_week = (days_since_start // 7) + 1
-    
-    # Clamp to valid week range (0-15 for regular season)
-    current_week = max(0, min(current_week, 15))
-    
-    return current_week
+from cache import ResponseCache
+from batch_predict import prediction_records
+import config
+from weeks import get_current_week
 
 
 def save_predictions_json(predictions_data, output_file):
@@ -95,7 +58,28 @@ def main():
     parser.add_argument(
         "--model-path",
         default="cfb_model.pkl",
-        help="Path to trained model file"
+        help="Path to trained model file or model artifact directory"
+    )
+    parser.add_argument(
+        "--artifact-dir",
+        help="After training, also save the model as a memory-mapped artifact here"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get("CFB_CACHE_DIR", config.CACHE_DIR),
+        help="Directory for cached API responses"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the API response cache"
+    )
+    parser.add_argument(
+        "--model-type",
+        default=config.MODEL_TYPE,
+        choices=["random_forest", "gradient_boosting", "hist_gradient_boosting", "logistic_regression",
+                 "stacked_ensemble"],
+        help="Model to train with --train"
     )
     parser.add_argument(
         "--train",
@@ -139,9 +123,10 @@ def main():
     print(f"{'='*70}\n")
     
     # Initialize components
-    fetcher = CFBDataFetcher(args.api_key)
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    fetcher = CFBDataFetcher(args.api_key, cache=cache)
     preprocessor = CFBPreprocessor()
-    model = CFBModel(model_type="random_forest")
+    model = CFBModel(model_type=args.model_type)
     
     # Train model if requested
     if args.train:
@@ -167,7 +152,7 @@ def main():
             # Prepare and train
             print("\nPreparing features...")
             features = preprocessor.prepare_game_features(games, team_stats, talent)
-            X, y = preprocessor.create_training_data(features)
+            X, y = preprocessor.create_training_data(features, categorical=model.categorical_features)
             
             print(f"  ✓ Training data shape: {X.shape}")
             print(f"  ✓ Target distribution: {y.sum()} home wins, {len(y) - y.sum()} away wins")
@@ -183,6 +168,9 @@ def main():
             # Save model
             model.save(args.model_path)
             print(f"\n✓ Model saved to {args.model_path}")
+            if args.artifact_dir:
+                model.save_artifact(args.artifact_dir)
+                print(f"✓ Model artifact saved to {args.artifact_dir}")
             
         except Exception as e:
             print(f"\n✗ Error during training: {e}")
@@ -251,64 +239,35 @@ def main():
         # Prepare features
         print("\nPreparing features for prediction...")
         features = preprocessor.prepare_game_features(games, team_stats, talent)
-        X, _ = preprocessor.create_training_data(features)
+        X, _ = preprocessor.create_training_data(features, categorical=model.categorical_features)
         print(f"  ✓ Feature matrix shape: {X.shape}")
         
         # Make predictions
         print("\nGenerating predictions...\n")
-        predictions = model.predict(X)
-        probabilities = model.predict_proba(X)
+        predictions, probabilities, confidence = model.predict_with_confidence(X)
         
         # Build structured output
-        predictions_list = []
+        predictions_list = prediction_records(games, predictions, probabilities, confidence)
         
         print(f"{'='*70}")
         print(f"PREDICTIONS FOR WEEK {week} - {args.year} SEASON")
         print(f"{'='*70}\n")
         
-        for i, (_, game) in enumerate(games.iterrows()):
-            # Handle different column name formats
-            home = game.get('home_team', game.get('homeTeam', 'Unknown'))
-            away = game.get('away_team', game.get('awayTeam', 'Unknown'))
-            
-            # Get start date if available
-            start_date = game.get('start_date', game.get('startDate', ''))
-            
-            # Prediction details
-            pred = predictions[i]
-            prob = probabilities[i]
-            
-            if pred == 1:
-                winner = home
-                winner_prob = prob[1]
-            else:
-                winner = away
-                winner_prob = prob[0]
-            
-            # Build prediction entry
-            prediction_entry = {
-                "game_number": i + 1,
-                "home_team": home,
-                "away_team": away,
-                "start_date": start_date,
-                "predicted_winner": winner,
-                "confidence": round(winner_prob * 100, 2),
-                "home_win_probability": round(prob[1] * 100, 2),
-                "away_win_probability": round(prob[0] * 100, 2)
-            }
-            predictions_list.append(prediction_entry)
+        for entry in predictions_list:
+            winner_prob = entry["confidence"] / 100
             
             # Confidence bar
             bar_width = int(winner_prob * 30)
             confidence_bar = '█' * bar_width + '░' * (30 - bar_width)
             
             # Display matchup
-            print(f"Game {i+1}: {away} @ {home}")
-            if start_date:
-                print(f"  Date: {start_date}")
-            print(f"  Predicted Winner: {winner}")
+            print(f"Game {entry['game_number']}: {entry['away_team']} @ {entry['home_team']}")
+            if entry["start_date"]:
+                print(f"  Date: {entry['start_date']}")
+            print(f"  Predicted Winner: {entry['predicted_winner']}")
             print(f"  Confidence: {confidence_bar} {winner_prob:.1%}")
-            print(f"  Probability: Home {prob[1]:.1%} | Away {prob[0]:.1%}")
+            print(f"  Probability: Home {entry['home_win_probability'] / 100:.1%} | "
+                  f"Away {entry['away_win_probability'] / 100:.1%}")
             print()
         
         print(f"{'='*70}")
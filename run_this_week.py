@@ -39,8 +39,15 @@ print()
 current_year = datetime.now().year
 train_year = current_year - 1
 
+# Train once, then refresh the saved model with each newly completed week
+model_path = "cfb_model.pkl"
+refresh = os.path.exists(model_path)
+
 print(f"Current season: {current_year}")
-print(f"Will train on: {train_year} season data")
+if refresh:
+    print(f"Will refresh {model_path} with this season's completed weeks")
+else:
+    print(f"Will train on: {train_year} season data")
 print()
 print("Starting prediction process...")
 print()
@@ -50,7 +57,8 @@ sys.argv = [
     'run_this_week.py',
     '--api-key', api_key,
     '--year', str(current_year),
-    '--train',
+    '--model-path', model_path,
+    '--refresh' if refresh else '--train',
     '--train-year', str(train_year)
 ]
 
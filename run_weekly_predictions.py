@@ -4,56 +4,164 @@ Run predictions for the current week's college football games
 """
 
 import argparse
+import json
 import os
 import sys
-from datetime import datetime, timedelta
-from data_fetcher import CFBDataFetcher
-from preprocessor import CFBPreprocessor
-from model import CFBModel
+from datetime import datetime
+import config
+from weeks import get_current_week
 
 
-def get_current_week(year, start_date=None):
+def fetch_rolling_inputs(fetcher, year, weeks, include_games=True):
     """
-    Calculate the current CFB week based on the current date
+    Fetch games and per-game team stats for the given weeks of a season
     
     Args:
+        fetcher: CFBDataFetcher instance
         year: Season year
-        start_date: Optional start date of the season (defaults to Saturday after Labor Day)
+        weeks: Week numbers to fetch
+        include_games: Also fetch the games themselves
         
     Returns:
-        Current week number (1-15 for regular season)
+        Tuple of (games, game_stats, advanced_game_stats) DataFrames
     """
-    if start_date is None:
-        # CFB season typically starts the Saturday after Labor Day
-        # Labor Day is first Monday in September
-        # Find the first Monday in September
-        first_day = datetime(year, 9, 1)
-        days_until_monday = (7 - first_day.weekday()) % 7
-        labor_day = first_day + timedelta(days=days_until_monday)
-        
-        # Season starts the Saturday after Labor Day
-        season_start = labor_day + timedelta(days=5)
+    import pandas as pd
+    
+    games, game_stats, advanced = [], [], []
+    for week in weeks:
+        if include_games:
+            games.append(fetcher.get_games(year, week=week, season_type="regular"))
+        game_stats.append(fetcher.get_game_stats(year, week=week))
+        advanced.append(fetcher.get_advanced_game_stats(year, week=week))
+    
+    def combine(frames):
+        frames = [f for f in frames if not f.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
+    return combine(games), combine(game_stats), combine(advanced)
+
+
+def fetch_season_inputs(fetcher, preprocessor, year, rolling_features, weeks=None):
+    """
+    Fetch a season's games and the data its features are built from
+    
+    Args:
+        fetcher: CFBDataFetcher instance
+        preprocessor: CFBPreprocessor instance
+        year: Season year
+        rolling_features: Build point-in-time rolling features
+        weeks: Only keep games from these weeks (default: all)
         
-        # However, some years have Week 0 games the Saturday before Labor Day
-        # For simplicity, we'll use last Saturday of August as potential Week 0
-        week_zero_start = datetime(year, 8, 24)
-        while week_zero_start.weekday() != 5:  # 5 = Saturday
-            week_zero_start += timedelta(days=1)
+    Returns:
+        Tuple of (inputs, prepare_features): the raw input DataFrames by name
+        and a function that builds the game features from them
+    """
+    games = fetcher.get_games(year, season_type="regular")
+    if weeks is not None:
+        games = games[games['week'].isin(list(weeks))].reset_index(drop=True)
+    print(f"  ✓ Fetched {len(games)} games")
+    
+    if rolling_features:
+        season_weeks = sorted(w for w in games['week'].unique() if w >= 1)
+        _, game_stats, advanced = fetch_rolling_inputs(fetcher, year, season_weeks,
+                                                       include_games=False)
+        print(f"  ✓ Fetched game stats for {len(game_stats)} team games")
         
-        # Use week 0 start as actual season start
-        season_start = week_zero_start
-    else:
-        season_start = start_date
+        inputs = {'games': games, 'game_stats': game_stats, 'advanced_game_stats': advanced}
+        return inputs, lambda: preprocessor.prepare_rolling_features(games, game_stats, advanced)
     
-    # Calculate weeks since season start
-    current_date = datetime.now()
-    days_since_start = (current_date - season_start).days
-    current_week = (days_since_start // 7) + 1
+    team_stats = fetcher.get_team_stats(year)
+    print(f"  ✓ Fetched stats for {len(team_stats)} teams")
     
-    # Clamp to valid week range (0-15 for regular season)
-    current_week = max(0, min(current_week, 15))
+    try:
+        talent = fetcher.get_team_talent(year)
+        print(f"  ✓ Fetched talent ratings for {len(talent)} teams")
+    except Exception as e:
+        print(f"  ⚠ Could not fetch talent data: {e}")
+        talent = None
     
-    return current_week
+    inputs = {'games': games, 'team_stats': team_stats, 'talent': talent}
+    return inputs, lambda: preprocessor.prepare_game_features(games, team_stats, talent)
+
+
+def refresh_log_path(model_path):
+    """File recording which weeks a saved model has been refreshed with"""
+    return f"{model_path.rstrip(os.sep)}.refresh.json"
+
+
+def write_refresh_log(model_path, year, week, baseline_accuracy):
+    """Record that the model has seen the given season through week"""
+    with open(refresh_log_path(model_path), 'w') as f:
+        json.dump({'year': year, 'week': week, 'baseline_accuracy': baseline_accuracy}, f, indent=2)
+
+
+def refresh_model(args, fetcher, preprocessor, model, week):
+    """
+    Fold the weeks completed since the last run into a loaded model
+    
+    The model is refreshed incrementally (see CFBModel.refresh) unless
+    --refresh-policy full is given, its accuracy on the new games has
+    drifted, the new games have a single outcome or the model has no
+    incremental update. It is then retrained on the training season plus
+    every completed week of this season.
+    
+    Returns:
+        The refresh result, or None if the model was already up to date
+    """
+    import pandas as pd
+    
+    log = {}
+    if os.path.exists(refresh_log_path(args.model_path)):
+        with open(refresh_log_path(args.model_path)) as f:
+            log = json.load(f)
+    last_week = log.get('week', 0) if log.get('year') == args.year else 0
+    new_weeks = list(range(max(last_week + 1, 1), week))
+    if not new_weeks:
+        print(f"✓ Model already includes games through week {last_week}\n")
+        return None
+    if log.get('baseline_accuracy') is not None:
+        model.metrics.setdefault('test_accuracy', log['baseline_accuracy'])
+    
+    print(f"\n=== Refreshing Model with Weeks {new_weeks[0]}-{new_weeks[-1]} of {args.year} ===\n")
+    _, prepare_features = fetch_season_inputs(fetcher, preprocessor, args.year,
+                                              args.rolling_features, weeks=range(1, week))
+    features = prepare_features()
+    home_points = 'homePoints' if 'homePoints' in features.columns else 'home_points'
+    away_points = 'awayPoints' if 'awayPoints' in features.columns else 'away_points'
+    features = features[features[home_points].notna() & features[away_points].notna()]
+    X_season, y_season = preprocessor.create_training_data(
+        features, categorical=model.categorical_features)
+    is_new = features['week'].isin(new_weeks).to_numpy()
+    X_new, y_new = X_season[is_new], y_season[is_new]
+    print(f"  ✓ {len(X_new)} completed games to add")
+    if X_new.empty:
+        return None
+    
+    X_history = y_history = None
+    drifted, _ = model.check_drift(X_new, y_new)
+    if (args.refresh_policy == "full" or drifted or model.missing_outcomes(y_new)
+            or not model.incremental_refresh):
+        train_year = args.train_year or (args.year - 1)
+        print(f"\nFetching {train_year} training data for a full retrain...")
+        train_inputs, prepare_training = fetch_season_inputs(fetcher, preprocessor, train_year,
+                                                             args.rolling_features)
+        X_train, y_train = preprocessor.create_training_data(
+            prepare_training(), categorical=model.categorical_features)
+        X_history = pd.concat([X_train, X_season[~is_new]], ignore_index=True)
+        y_history = pd.concat([y_train, y_season[~is_new]], ignore_index=True)
+    
+    result = model.refresh(X_new, y_new, X_history, y_history, policy=args.refresh_policy)
+    print(f"  ✓ {result['mode'].capitalize()} refresh "
+          f"(accuracy on new games before refresh: {result['new_accuracy']:.2%})")
+    
+    model.save(args.model_path)
+    write_refresh_log(args.model_path, args.year, new_weeks[-1],
+                      model.metrics.get('test_accuracy', log.get('baseline_accuracy')))
+    print(f"✓ Refreshed model saved to {args.model_path}")
+    if args.artifact_dir:
+        model.save_artifact(args.artifact_dir)
+        print(f"✓ Model artifact saved to {args.artifact_dir}")
+    return result
 
 
 def main():
@@ -80,13 +188,76 @@ def main():
     parser.add_argument(
         "--model-path",
         default="cfb_model.pkl",
-        help="Path to trained model file"
+        help="Path to trained model file or model artifact directory"
+    )
+    parser.add_argument(
+        "--artifact-dir",
+        help="After training, also save the model as a memory-mapped artifact here"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get("CFB_CACHE_DIR", config.CACHE_DIR),
+        help="Directory for cached API responses"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the API response cache"
+    )
+    parser.add_argument(
+        "--rolling-features",
+        action="store_true",
+        help="Use point-in-time rolling features, updated incrementally each week"
+    )
+    parser.add_argument(
+        "--feature-state-dir",
+        default=config.FEATURE_STATE_DIR,
+        help="Directory for the persisted rolling feature state"
+    )
+    parser.add_argument(
+        "--verify-features",
+        action="store_true",
+        help="Check the incremental feature state against a full season rebuild"
+    )
+    parser.add_argument(
+        "--model-type",
+        default=config.MODEL_TYPE,
+        choices=["random_forest", "gradient_boosting", "hist_gradient_boosting", "logistic_regression",
+                 "stacked_ensemble"],
+        help="Model to train with --train"
+    )
+    parser.add_argument(
+        "--profile",
+        help="Tuning profile (see tuning.py) whose model type and hyperparameters "
+             "--train uses instead of --model-type and the config defaults"
     )
     parser.add_argument(
         "--train",
         action="store_true",
         help="Train a new model before making predictions"
     )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Update the saved model with weeks completed since the last run instead of retraining"
+    )
+    parser.add_argument(
+        "--refresh-policy",
+        choices=["incremental", "full"],
+        default=config.REFRESH_POLICY,
+        help="Warm-start the model on new weeks or retrain it from scratch "
+             "(drift always forces a full retrain)"
+    )
+    parser.add_argument(
+        "--registry",
+        action="store_true",
+        help="Train through the local model registry, reusing cached features and models"
+    )
+    parser.add_argument(
+        "--registry-dir",
+        default=config.REGISTRY_DIR,
+        help="Directory of the local model registry"
+    )
     parser.add_argument(
         "--train-year",
         type=int,
@@ -112,11 +283,26 @@ def main():
     print(f"\n{'='*70}")
     print(f"CFB Model - Week {week} Predictions for {args.year} Season")
     print(f"{'='*70}\n")
-    
+
+    # Heavy imports wait until the arguments parse (see main.py)
+    from data_fetcher import CFBDataFetcher
+    from preprocessor import CFBPreprocessor
+    from model import CFBModel
+    from cache import ResponseCache
+    from registry import ModelRegistry
+    from rolling_features import TeamAccumulators, load_state, state_path, verify_state
+    from tuning import load_profile
+
     # Initialize components
-    fetcher = CFBDataFetcher(args.api_key)
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    fetcher = CFBDataFetcher(args.api_key, cache=cache)
     preprocessor = CFBPreprocessor()
-    model = CFBModel(model_type="random_forest")
+    if args.profile:
+        model_type, params = load_profile(args.profile)
+        print(f"Using tuned {model_type} hyperparameters from {args.profile}")
+    else:
+        model_type, params = args.model_type, None
+    model = CFBModel(model_type=model_type, params=params)
     
     # Train model if requested
     if args.train:
@@ -126,29 +312,33 @@ def main():
         try:
             # Fetch training data
             print("Fetching training data...")
-            games = fetcher.get_games(train_year, season_type="regular")
-            print(f"  ✓ Fetched {len(games)} games")
-            
-            team_stats = fetcher.get_team_stats(train_year)
-            print(f"  ✓ Fetched stats for {len(team_stats)} teams")
+            inputs, prepare_features = fetch_season_inputs(fetcher, preprocessor, train_year,
+                                                           args.rolling_features)
             
-            try:
-                talent = fetcher.get_team_talent(train_year)
-                print(f"  ✓ Fetched talent ratings for {len(talent)} teams")
-            except Exception as e:
-                print(f"  ⚠ Could not fetch talent data: {e}")
-                talent = None
+            def build_training_data():
+                print("\nPreparing features...")
+                X, y = preprocessor.create_training_data(
+                    prepare_features(), categorical=model.categorical_features)
+                print(f"  ✓ Training data shape: {X.shape}")
+                print(f"  ✓ Target distribution: {y.sum()} home wins, {len(y) - y.sum()} away wins")
+                return X, y
             
-            # Prepare and train
-            print("\nPreparing features...")
-            features = preprocessor.prepare_game_features(games, team_stats, talent)
-            X, y = preprocessor.create_training_data(features)
-            
-            print(f"  ✓ Training data shape: {X.shape}")
-            print(f"  ✓ Target distribution: {y.sum()} home wins, {len(y) - y.sum()} away wins")
-            
-            print("\nTraining model...")
-            metrics = model.train(X, y)
+            if args.registry:
+                # Unchanged inputs reuse the cached feature matrix and model
+                print("\nTraining model through the registry...")
+                registry = ModelRegistry(args.registry_dir)
+                model, entry = registry.train(inputs, build_training_data, model_type=model.model_type,
+                                              params=model.params,
+                                              feature_params={'rolling': args.rolling_features,
+                                                              'categorical': model.categorical_features})
+                metrics = entry['metrics']
+                print(f"  ✓ Model version {entry['version']}"
+                      f" (features {'cached' if entry['features_cached'] else 'built'},"
+                      f" model {'cached' if entry['model_cached'] else 'trained'})")
+            else:
+                X, y = build_training_data()
+                print("\nTraining model...")
+                metrics = model.train(X, y)
             
             print("\n=== Training Results ===")
             print(f"Training Accuracy: {metrics['train_accuracy']:.2%}")
@@ -157,7 +347,11 @@ def main():
             
             # Save model
             model.save(args.model_path)
+            write_refresh_log(args.model_path, args.year, 0, metrics['test_accuracy'])
             print(f"\n✓ Model saved to {args.model_path}")
+            if args.artifact_dir:
+                model.save_artifact(args.artifact_dir)
+                print(f"✓ Model artifact saved to {args.artifact_dir}")
             
         except Exception as e:
             print(f"\n✗ Error during training: {e}")
@@ -173,6 +367,13 @@ def main():
             print(f"✗ Error loading model: {e}")
             print("\nTip: Train a model first using --train flag")
             sys.exit(1)
+        
+        if args.refresh:
+            try:
+                refresh_model(args, fetcher, preprocessor, model, week)
+            except Exception as e:
+                print(f"\n✗ Error refreshing model: {e}")
+                sys.exit(1)
     else:
         print(f"✗ Model file not found: {args.model_path}")
         print("\nTip: Train a model first using --train flag")
@@ -194,28 +395,59 @@ def main():
         
         print(f"✓ Found {len(games)} games for week {week}\n")
         
-        # Fetch team stats for current season
-        print("Fetching team statistics...")
-        team_stats = fetcher.get_team_stats(args.year)
-        print(f"  ✓ Fetched stats for {len(team_stats)} teams")
+        if args.rolling_features:
+            # Only the weeks completed since the last run are fetched and folded in
+            state = load_state(args.year, args.feature_state_dir)
+            persist = week > state.last_processed_week
+            if not persist:
+                print(f"  ⚠ Feature state is already past week {week}; rebuilding without saving")
+                state = TeamAccumulators(args.year)
+            new_weeks = [w for w in range(state.last_processed_week + 1, week) if w >= 1]
+            
+            print(f"Fetching results for weeks {new_weeks or 'none'}...")
+            completed, game_stats, advanced = fetch_rolling_inputs(fetcher, args.year, new_weeks)
+            if not completed.empty:
+                preprocessor.update_rolling_features(state, completed, game_stats, advanced)
+            print(f"  ✓ Feature state now covers through week {state.last_processed_week}")
+            
+            print("\nPreparing rolling features for prediction...")
+            features = preprocessor.update_rolling_features(state, games)
+            if persist:
+                state.save(state_path(args.year, args.feature_state_dir))
+            
+            if args.verify_features:
+                print("\nVerifying feature state against a full rebuild...")
+                all_weeks = list(range(1, state.last_processed_week + 1))
+                season_games, season_stats, season_advanced = fetch_rolling_inputs(
+                    fetcher, args.year, all_weeks)
+                if verify_state(state, season_games, season_stats, season_advanced):
+                    print("  ✓ Incremental features match a full rebuild")
+                else:
+                    print("  ✗ Incremental features differ from a full rebuild; "
+                          f"delete {state_path(args.year, args.feature_state_dir)} to rebuild")
+                    sys.exit(1)
+        else:
+            # Fetch team stats for current season
+            print("Fetching team statistics...")
+            team_stats = fetcher.get_team_stats(args.year)
+            print(f"  ✓ Fetched stats for {len(team_stats)} teams")
         
-        try:
-            talent = fetcher.get_team_talent(args.year)
-            print(f"  ✓ Fetched talent ratings for {len(talent)} teams")
-        except:
-            talent = None
-            print(f"  ⚠ Talent data not available for {args.year}")
+            try:
+                talent = fetcher.get_team_talent(args.year)
+                print(f"  ✓ Fetched talent ratings for {len(talent)} teams")
+            except:
+                talent = None
+                print(f"  ⚠ Talent data not available for {args.year}")
         
-        # Prepare features
-        print("\nPreparing features for prediction...")
-        features = preprocessor.prepare_game_features(games, team_stats, talent)
-        X, _ = preprocessor.create_training_data(features)
+            # Prepare features
+            print("\nPreparing features for prediction...")
+            features = preprocessor.prepare_game_features(games, team_stats, talent)
+        X, _ = preprocessor.create_training_data(features, categorical=model.categorical_features)
         print(f"  ✓ Feature matrix shape: {X.shape}")
         
         # Make predictions
         print("\nGenerating predictions...\n")
-        predictions = model.predict(X)
-        probabilities = model.predict_proba(X)
+        predictions, probabilities, confidence = model.predict_with_confidence(X)
         
         # Display predictions
         print(f"{'='*70}")
@@ -234,12 +466,8 @@ def main():
             pred = predictions[i]
             prob = probabilities[i]
             
-            if pred == 1:
-                winner = home
-                winner_prob = prob[1]
-            else:
-                winner = away
-                winner_prob = prob[0]
+            winner = home if pred == 1 else away
+            winner_prob = confidence[i]
             
             # Confidence bar
             bar_width = int(winner_prob * 30)
@@ -0,0 +1,414 @@
+"""
+Compact dtype schemas for the bundled CSVs and API-shaped frames
+
+Every known column (see headers.md and info_sheet_data.md) gets the
+narrowest dtype that holds its values: float32 for rates and metrics,
+int16/int32 for counts, category for team/conference names and bool for
+flags. Loaders apply these at read time via read_csv() / apply_schema().
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+CATEGORY = "category"
+STRING = "string"
+
+# Metrics in the advanced stats files, stored once per side of the ball
+_ADVANCED_GAME_METRICS = (
+    "passingPlays_explosiveness", "passingPlays_successRate", "passingPlays_totalPPA",
+    "passingPlays_ppa", "rushingPlays_explosiveness", "rushingPlays_successRate",
+    "rushingPlays_totalPPA", "rushingPlays_ppa", "passingDowns_explosiveness",
+    "passingDowns_successRate", "passingDowns_ppa", "standardDowns_explosiveness",
+    "standardDowns_successRate", "standardDowns_ppa", "openFieldYardsTotal",
+    "openFieldYards", "secondLevelYardsTotal", "secondLevelYards", "lineYardsTotal",
+    "lineYards", "stuffRate", "powerSuccess", "explosiveness", "successRate",
+    "totalPPA", "ppa", "drives", "plays",
+)
+
+_ADVANCED_SEASON_METRICS = (
+    "passingPlays_explosiveness", "passingPlays_successRate", "passingPlays_totalPPA",
+    "passingPlays_ppa", "passingPlays_rate", "rushingPlays_explosiveness",
+    "rushingPlays_successRate", "rushingPlays_totalPPA", "rushingPlays_ppa",
+    "rushingPlays_rate", "passingDowns_explosiveness", "passingDowns_successRate",
+    "passingDowns_totalPPA", "passingDowns_ppa", "passingDowns_rate",
+    "standardDowns_explosiveness", "standardDowns_successRate", "standardDowns_ppa",
+    "standardDowns_rate", "havoc_db", "havoc_frontSeven", "havoc_total",
+    "fieldPosition_averagePredictedPoints", "fieldPosition_averageStart",
+    "pointsPerOpportunity", "totalOpportunies", "openFieldYardsTotal", "openFieldYards",
+    "secondLevelYardsTotal", "secondLevelYards", "lineYardsTotal", "lineYards",
+    "stuffRate", "powerSuccess", "explosiveness", "successRate", "totalPPA", "ppa",
+    "drives", "plays",
+)
+
+_SEASON_STATS = (
+    "firstDowns", "fourthDownConversions", "fourthDowns", "fumblesLost",
+    "fumblesRecovered", "games", "interceptionTDs", "interceptionYards", "interceptions",
+    "kickReturnTDs", "kickReturnYards", "kickReturns", "netPassingYards", "passAttempts",
+    "passCompletions", "passesIntercepted", "passingTDs", "penalties", "penaltyYards",
+    "possessionTime", "puntReturnTDs", "puntReturnYards", "puntReturns",
+    "rushingAttempts", "rushingTDs", "rushingYards", "sacks", "tacklesForLoss",
+    "thirdDownConversions", "thirdDowns", "totalYards", "turnovers",
+)
+
+# Per-team metrics in training_data.csv, prefixed with home_ / away_
+_TRAINING_TEAM_METRICS = (
+    "talent",
+    "adjusted_epa", "adjusted_epa_allowed",
+    "adjusted_rushing_epa", "adjusted_rushing_epa_allowed",
+    "adjusted_passing_epa", "adjusted_passing_epa_allowed",
+    "adjusted_success", "adjusted_success_allowed",
+    "adjusted_standard_down_success", "adjusted_standard_down_success_allowed",
+    "adjusted_passing_down_success", "adjusted_passing_down_success_allowed",
+    "adjusted_line_yards", "adjusted_line_yards_allowed",
+    "adjusted_second_level_yards", "adjusted_second_level_yards_allowed",
+    "adjusted_open_field_yards", "adjusted_open_field_yards_allowed",
+    "adjusted_explosiveness", "adjusted_explosiveness_allowed",
+    "adjusted_rush_explosiveness", "adjusted_rush_explosiveness_allowed",
+    "adjusted_pass_explosiveness", "adjusted_pass_explosiveness_allowed",
+    "total_havoc_offense", "front_seven_havoc_offense", "db_havoc_offense",
+    "total_havoc_defense", "front_seven_havoc_defense", "db_havoc_defense",
+    "points_per_opportunity_offense", "points_per_opportunity_defense",
+    "avg_start_offense", "avg_start_defense",
+)
+
+
+def _sides(metrics: Iterable[str], dtype: str, prefixes=("offense_", "defense_")) -> Dict[str, str]:
+    return {f"{prefix}{metric}": dtype for prefix in prefixes for metric in metrics}
+
+
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    # model_pack/training_data.csv
+    "training_data": {
+        "id": "int64",
+        "start_date": STRING,
+        "season": "int16",
+        "season_type": CATEGORY,
+        "week": "int16",
+        "neutral_site": "bool",
+        "home_team": CATEGORY,
+        "home_conference": CATEGORY,
+        "home_elo": "int16",
+        "home_points": "int16",
+        "away_team": CATEGORY,
+        "away_conference": CATEGORY,
+        "away_elo": "int16",
+        "away_points": "int16",
+        "margin": "int16",
+        "spread": "float32",
+        **_sides(_TRAINING_TEAM_METRICS, "float32", prefixes=("home_", "away_")),
+    },
+    # season_stats/<year>.csv
+    "season_stats": {
+        "season": "int16",
+        "team": CATEGORY,
+        "conference": CATEGORY,
+        **{stat: "int32" for stat in _SEASON_STATS},
+        **{f"{stat}Opponent": "int32" for stat in _SEASON_STATS if stat != "games"},
+    },
+    # advanced_season_stats/<year>.csv
+    "advanced_season_stats": {
+        "season": "int16",
+        "team": CATEGORY,
+        "conference": CATEGORY,
+        **_sides(_ADVANCED_SEASON_METRICS, "float32"),
+    },
+    # advanced_game_stats/<year>.csv
+    "advanced_game_stats": {
+        "gameId": "int64",
+        "season": "int16",
+        "week": "int16",
+        "team": CATEGORY,
+        "opponent": CATEGORY,
+        **_sides(_ADVANCED_GAME_METRICS, "float32"),
+    },
+    # game_stats/<year>.csv
+    "game_stats": {
+        "game_id": "int64",
+        "season": "int16",
+        "week": "int16",
+        "season_type": CATEGORY,
+        "home_away": CATEGORY,
+        "team_id": "int32",
+        "team": CATEGORY,
+        "conference": CATEGORY,
+        "opponent_id": "int32",
+        "opponent": CATEGORY,
+        "opponent_conference": CATEGORY,
+        "completionAttempts": STRING,
+        "fourthDownEff": STRING,
+        "thirdDownEff": STRING,
+        "totalPenaltiesYards": STRING,
+        "possessionTime": STRING,
+        **{stat: "float32" for stat in (
+            "defensiveTDs", "firstDowns", "fumblesLost", "fumblesRecovered",
+            "interceptionTDs", "interceptionYards", "interceptions", "kickReturnTDs",
+            "kickReturnYards", "kickReturns", "kickingPoints", "netPassingYards",
+            "passesDeflected", "passesIntercepted", "passingTDs", "puntReturnTDs",
+            "puntReturnYards", "puntReturns", "qbHurries", "rushingAttempts", "rushingTDs",
+            "rushingYards", "sacks", "tackles", "tacklesForLoss", "totalFumbles",
+            "totalYards", "turnovers", "yardsPerPass", "yardsPerRushAttempt",
+        )},
+    },
+    # games.csv
+    "games_csv": {
+        "id": "int64",
+        "season": "int16",
+        "season_type": CATEGORY,
+        "week": "int16",
+        "start_date": STRING,
+        "start_time_tbd": "bool",
+        "neutral_site": "bool",
+        "conference_game": "bool",
+        "attendance": "float32",
+        "venue_id": "float32",
+        "notes": STRING,
+        "status": CATEGORY,
+        "excitement": "float32",
+        "home_team_id": "int32",
+        "home_team": CATEGORY,
+        "home_conference_id": "float32",
+        "home_conference": CATEGORY,
+        "home_classification": CATEGORY,
+        "home_points": "float32",
+        "home_line_scores": STRING,
+        "home_postgame_win_prob": "float32",
+        "home_start_elo": "float32",
+        "home_end_elo": "float32",
+        "away_team_id": "int32",
+        "away_team": CATEGORY,
+        "away_conference_id": "float32",
+        "away_conference": CATEGORY,
+        "away_classification": CATEGORY,
+        "away_points": "float32",
+        "away_line_scores": STRING,
+        "away_postgame_win_prob": "float32",
+        "away_start_elo": "float32",
+        "away_end_elo": "float32",
+    },
+    # teams.csv
+    "teams": {
+        "id": "int32",
+        "school": CATEGORY,
+        "abbreviation": CATEGORY,
+        "nickname": CATEGORY,
+        "mascot": CATEGORY,
+        "full_name": CATEGORY,
+        "classification": CATEGORY,
+        "conference_id": "float32",
+        "conference": CATEGORY,
+        "conference_division": CATEGORY,
+        "home_venue_id": "float32",
+        "home_venue": CATEGORY,
+        "venue_capacity": "float32",
+        "grass": "bool",
+        "city": CATEGORY,
+        "state": CATEGORY,
+        "zip": STRING,
+        "country_code": CATEGORY,
+        "location": STRING,
+        "elevation": "float32",
+        "timezone": CATEGORY,
+    },
+    # conferences.csv
+    "conferences": {
+        "name": CATEGORY,
+        "abbreviation": CATEGORY,
+        "division": CATEGORY,
+    },
+    # drives/<year>.csv
+    "drives": {
+        "offense": CATEGORY,
+        "offenseConference": CATEGORY,
+        "defense": CATEGORY,
+        "defenseConference": CATEGORY,
+        "gameId": "int64",
+        "id": "int64",
+        "driveNumber": "int16",
+        "scoring": "bool",
+        "startPeriod": "int8",
+        "startYardline": "int16",
+        "startYardsToGoal": "int16",
+        "startTime": STRING,
+        "endPeriod": "int8",
+        "endYardline": "int16",
+        "endYardsToGoal": "int16",
+        "endTime": STRING,
+        "plays": "int16",
+        "yards": "int16",
+        "driveResult": CATEGORY,
+        "isHomeOffense": "bool",
+        "startOffenseScore": "int16",
+        "startDefenseScore": "int16",
+        "endOffenseScore": "int16",
+        "endDefenseScore": "int16",
+    },
+    # plays/<year>/<type>_<week>_plays.csv
+    "plays": {
+        "id": "int64",
+        "driveId": "int64",
+        "gameId": "int64",
+        "driveNumber": "float32",
+        "playNumber": "float32",
+        "offense": CATEGORY,
+        "offenseConference": CATEGORY,
+        "offenseScore": "int16",
+        "defense": CATEGORY,
+        "home": CATEGORY,
+        "away": CATEGORY,
+        "defenseConference": CATEGORY,
+        "defenseScore": "int16",
+        "period": "int8",
+        "clock": STRING,
+        "offenseTimeouts": "float32",
+        "defenseTimeouts": "float32",
+        "yardline": "int16",
+        "yardsToGoal": "int16",
+        "down": "int8",
+        "distance": "int16",
+        "yardsGained": "int16",
+        "scoring": "bool",
+        "playType": CATEGORY,
+        "playText": STRING,
+        "ppa": "float32",
+        "wallclock": STRING,
+    },
+    # CFBDataFetcher.get_games (camelCase API response)
+    "games": {
+        "id": "int64",
+        "season": "int16",
+        "week": "int16",
+        "seasonType": CATEGORY,
+        "startDate": STRING,
+        "neutralSite": "bool",
+        "conferenceGame": "bool",
+        "attendance": "float32",
+        "venueId": "float32",
+        "homeId": "int32",
+        "homeTeam": CATEGORY,
+        "homeConference": CATEGORY,
+        "homeClassification": CATEGORY,
+        "homePoints": "float32",
+        "homePregameElo": "float32",
+        "homePostgameElo": "float32",
+        "homePostgameWinProbability": "float32",
+        "awayId": "int32",
+        "awayTeam": CATEGORY,
+        "awayConference": CATEGORY,
+        "awayClassification": CATEGORY,
+        "awayPoints": "float32",
+        "awayPregameElo": "float32",
+        "awayPostgameElo": "float32",
+        "awayPostgameWinProbability": "float32",
+        "excitementIndex": "float32",
+    },
+    # CFBDataFetcher.get_team_stats
+    "team_stats": {
+        "season": "int16",
+        "team": CATEGORY,
+        "conference": CATEGORY,
+        "statName": CATEGORY,
+        "statValue": "float64",
+    },
+    # CFBDataFetcher.get_team_talent
+    "talent": {
+        "year": "int16",
+        "school": CATEGORY,
+        "talent": "float32",
+    },
+    # CFBDataFetcher.get_team_records
+    "records": {
+        "year": "int16",
+        "teamId": "int32",
+        "team": CATEGORY,
+        "conference": CATEGORY,
+        "division": CATEGORY,
+    },
+    # CFBDataFetcher.get_betting_lines
+    "lines": {
+        "id": "int64",
+        "season": "int16",
+        "week": "int16",
+        "seasonType": CATEGORY,
+        "startDate": STRING,
+        "homeTeam": CATEGORY,
+        "homeConference": CATEGORY,
+        "homeScore": "float32",
+        "awayTeam": CATEGORY,
+        "awayConference": CATEGORY,
+        "awayScore": "float32",
+    },
+}
+
+# Nullable counterparts used when an integer or bool column has missing values
+_NULLABLE = {
+    "int8": "Int8", "int16": "Int16", "int32": "Int32", "int64": "Int64", "bool": "boolean",
+}
+
+
+def dtypes_for(table: str) -> Dict[str, str]:
+    """
+    Declared dtypes for a table
+
+    Args:
+        table: Schema name, e.g. "training_data" or "season_stats"
+
+    Returns:
+        Mapping of column name to dtype
+
+    Raises:
+        KeyError: If the table has no schema
+    """
+    if table not in SCHEMAS:
+        raise KeyError(f"No schema for table: {table}. Known tables: {sorted(SCHEMAS)}")
+    return SCHEMAS[table]
+
+
+def apply_schema(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    Cast the known columns of a frame to the table's compact dtypes
+
+    Integer and bool columns that contain missing values are cast to the
+    matching pandas nullable dtype instead. Unknown columns are left as is.
+
+    Args:
+        df: DataFrame to convert
+        table: Schema name
+
+    Returns:
+        DataFrame with compact dtypes (a new frame; the input is not modified)
+    """
+    casts = {}
+    for col, dtype in dtypes_for(table).items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        if dtype in _NULLABLE and df[col].isna().any():
+            dtype = _NULLABLE[dtype]
+        casts[col] = dtype
+    return df.astype(casts) if casts else df
+
+
+def read_csv(filepath_or_buffer, table: str, usecols: Optional[Iterable[str]] = None,
+             **kwargs) -> pd.DataFrame:
+    """
+    pandas.read_csv with a table's schema applied while parsing
+
+    Floats, strings and categories are parsed straight into their compact
+    dtypes; integer and bool columns are narrowed afterwards so that files
+    with missing values still load.
+
+    Args:
+        filepath_or_buffer: Path or file object
+        table: Schema name
+        usecols: Columns to parse (default: all)
+        **kwargs: Extra arguments for pandas.read_csv
+
+    Returns:
+        DataFrame with compact dtypes
+    """
+    parse_dtypes = {col: dtype for col, dtype in dtypes_for(table).items()
+                    if dtype in (CATEGORY, STRING) or np.dtype(dtype).kind == "f"}
+    df = pd.read_csv(filepath_or_buffer, usecols=list(usecols) if usecols is not None else None,
+                     dtype=parse_dtypes, **kwargs)
+    return apply_schema(df, table)
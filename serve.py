@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Local prediction service
+
+A long-running HTTP/JSON server that keeps the model, the team feature
+table and the preprocessor in memory, so answering a prediction doesn't pay
+for imports, unpickling or API calls:
+
+    POST /predict  {"games": [{"home_team": "Texas", "away_team": "Michigan"}, ...]}
+                   or {"features": [{<feature column>: value, ...}, ...]}
+    POST /reload   reload the model (and team features file) now
+    GET  /health   model type, load time and batching counters
+
+Concurrent requests are coalesced into micro-batches: the first request
+waits up to SERVE_MAX_WAIT_MS for others, and each batch of up to
+SERVE_MAX_BATCH_SIZE games is scored with one predict_proba call.
+
+The model file is polled for changes. A new model is loaded next to the
+current one and swapped in with a single reference assignment. Batches in
+flight finish on the model they started with, so a reload never drops or
+fails a request. Memory-mapped artifacts (see artifact.py) load almost
+instantly, and save_artifact switches to a new version by atomically
+replacing the artifact's manifest, which is the file polled here.
+
+pandas, numpy and the model modules are imported when the service starts,
+so `serve.py --help` stays fast.
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesce concurrent prediction calls into batched ones"""
+
+    def __init__(self, predict: Callable[["pd.DataFrame"], Any],
+                 max_batch_size: int = config.SERVE_MAX_BATCH_SIZE,
+                 max_wait_ms: float = config.SERVE_MAX_WAIT_MS):
+        """
+        Args:
+            predict: Called with the concatenated rows of a batch; returns a
+                sequence (or tuple of sequences) aligned with those rows
+            max_batch_size: Rows per batch (a single larger request is
+                still scored in one call)
+            max_wait_ms: How long the first request of a batch waits for
+                others to join
+        """
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.requests = 0
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: "pd.DataFrame") -> Future:
+        """Queue rows for prediction; the future resolves to their slice of the output"""
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first) -> List[tuple]:
+        batch, size = [first], len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        import pandas as pd
+
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            try:
+                frames = [rows for rows, _ in batch]
+                output = self.predict(pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            start = 0
+            for rows, future in batch:
+                stop = start + len(rows)
+                if isinstance(output, tuple):
+                    future.set_result(tuple(part[start:stop] for part in output))
+                else:
+                    future.set_result(output[start:stop])
+                start = stop
+
+
+class PredictionService:
+    """Warm model, team features and preprocessor with hot reload"""
+
+    def __init__(self, model_path: str, team_features: Optional["pd.DataFrame"] = None,
+                 team_features_path: Optional[str] = None,
+                 max_batch_size: int = config.SERVE_MAX_BATCH_SIZE,
+                 max_wait_ms: float = config.SERVE_MAX_WAIT_MS):
+        """
+        Args:
+            model_path: Pickled model or artifact directory
+            team_features: CFBPreprocessor.build_team_features output used
+                for {"games": ...} requests
+            team_features_path: CSV of team features (team index column),
+                reloaded together with the model
+            max_batch_size: Rows per micro-batch
+            max_wait_ms: Micro-batch collection window
+        """
+        import pandas as pd
+        from preprocessor import CFBPreprocessor
+
+        self.model_path = model_path
+        self.team_features_path = team_features_path
+        self.preprocessor = CFBPreprocessor()
+        self.model = self._load_model()
+        self.team_features = team_features
+        if team_features_path:
+            self.team_features = pd.read_csv(team_features_path, index_col=0)
+        self.loaded_at = time.time()
+        self.reloads = 0
+        self._model_stamp = self._stamp()
+        self._reload_lock = threading.Lock()
+        self.batcher = MicroBatcher(self._predict_batch, max_batch_size, max_wait_ms)
+
+    def _stamp(self):
+        """Modification marker of the model file (an artifact's manifest)"""
+        import artifact
+
+        path = self.model_path
+        if artifact.is_artifact(path):
+            path = os.path.join(path, artifact.MANIFEST_NAME)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _load_model(self) -> "CFBModel":
+        from model import CFBModel
+
+        model = CFBModel()
+        model.load(self.model_path)
+        logger.info(f"Loaded {model.model_type} model from {self.model_path}")
+        return model
+
+    def reload(self) -> bool:
+        """
+        Load the model (and team features file) again and swap it in
+
+        The current model keeps serving until the new one is ready.
+        Returns False, keeping the current model, if loading fails.
+        """
+        import pandas as pd
+
+        with self._reload_lock:
+            stamp = self._stamp()
+            try:
+                model = self._load_model()
+                team_features = self.team_features
+                if self.team_features_path:
+                    team_features = pd.read_csv(self.team_features_path, index_col=0)
+            except Exception as e:
+                logger.error(f"Reload failed, keeping the current model: {e}")
+                return False
+            self.model, self.team_features = model, team_features
+            self._model_stamp = stamp
+            self.loaded_at = time.time()
+            self.reloads += 1
+            return True
+
+    def maybe_reload(self) -> bool:
+        """Reload if the model file changed since it was loaded"""
+        stamp = self._stamp()
+        if stamp is None or stamp == self._model_stamp:
+            return False
+        logger.info(f"Model file {self.model_path} changed; reloading")
+        return self.reload()
+
+    def watch(self, interval: float = config.SERVE_RELOAD_INTERVAL) -> threading.Thread:
+        """Poll the model file for changes in a background thread"""
+        def poll():
+            while True:
+                time.sleep(interval)
+                self.maybe_reload()
+        thread = threading.Thread(target=poll, name="model-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def _predict_batch(self, X: "pd.DataFrame") -> "np.ndarray":
+        """P(home win) for a batch; one reference read, so the whole batch uses one model"""
+        import numpy as np
+
+        model = self.model
+        probabilities = model.predict_proba(X)
+        classes = list(model.model.classes_)
+        return probabilities[:, classes.index(1)] if 1 in classes else np.zeros(len(X))
+
+    def features(self, payload: Dict[str, Any]) -> tuple:
+        """Feature matrix and games frame for a request payload"""
+        import pandas as pd
+
+        if 'features' in payload:
+            X = pd.DataFrame(payload['features'])
+            return X, X
+        if 'games' not in payload:
+            raise ValueError('Request needs "games" or "features"')
+        if self.team_features is None:
+            raise ValueError('No team features loaded; send "features" instead of "games"')
+        games = pd.DataFrame(payload['games'])
+        if games.empty:
+            raise ValueError('"games" cannot be empty')
+        features = self.preprocessor.join_team_features(games, self.team_features)
+        X, _ = self.preprocessor.create_training_data(features, categorical=self.model.categorical_features)
+        return X, games
+
+    def predict(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Score a request through the micro-batcher"""
+        X, games = self.features(payload)
+        # Reject bad rows here so they can't fail the other requests in a batch
+        self.model.check_features(X)
+        # sklearn also needs the training column order, which JSON keys don't keep
+        expected = getattr(self.model.model, 'feature_names_in_', None)
+        if expected is not None:
+            X = X[list(expected)]
+        p_home = self.batcher.submit(X).result()
+
+        results = []
+        for i, p in enumerate(p_home):
+            game = games.iloc[i]
+            home = game.get('home_team', game.get('homeTeam'))
+            away = game.get('away_team', game.get('awayTeam'))
+            result = {'home_win_probability': float(p), 'confidence': float(max(p, 1 - p))}
+            if home is not None and away is not None:
+                result.update(home_team=home, away_team=away, predicted_winner=home if p > 0.5 else away)
+            results.append(result)
+        return results
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            'status': 'ok',
+            'model_type': self.model.model_type,
+            'model_path': self.model_path,
+            'training_data_hash': self.model.data_hash,
+            'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.loaded_at)),
+            'reloads': self.reloads,
+            'teams': 0 if self.team_features is None else len(self.team_features),
+            'batches': self.batcher.batches,
+            'requests': self.batcher.requests,
+        }
+
+    def close(self):
+        self.batcher.close()
+
+
+def make_handler(service: PredictionService):
+    """Request handler class bound to a service"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, service.health())
+            else:
+                self._send(404, {'error': f"Unknown path: {self.path}"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length) if length else b"{}"
+            if self.path == "/reload":
+                reloaded = service.reload()
+                self._send(200 if reloaded else 500, {'reloaded': reloaded, **service.health()})
+                return
+            if self.path != "/predict":
+                self._send(404, {'error': f"Unknown path: {self.path}"})
+                return
+            try:
+                payload = json.loads(body)
+                self._send(200, {'predictions': service.predict(payload)})
+            except (ValueError, KeyError) as e:
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                logger.exception("Prediction failed")
+                self._send(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return Handler
+
+
+def make_server(service: PredictionService, host: str = config.SERVE_HOST,
+                port: int = config.SERVE_PORT) -> ThreadingHTTPServer:
+    """HTTP server for a service (port 0 picks a free port)"""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    """Run the prediction service"""
+    parser = argparse.ArgumentParser(description="Local CFB prediction service")
+    parser.add_argument("--model-path", default="cfb_model.pkl", help="Pickled model or artifact directory")
+    parser.add_argument("--host", default=config.SERVE_HOST, help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=config.SERVE_PORT, help="Port to listen on")
+    parser.add_argument("--team-features", help="CSV of team features (written by --save-team-features)")
+    parser.add_argument("--year", type=int, help="Fetch this season's team stats and talent at startup")
+    parser.add_argument("--api-key", default=os.environ.get("CFB_API_KEY"),
+                        help="College Football Data API key for --year (or CFB_API_KEY)")
+    parser.add_argument("--save-team-features", help="Write the fetched team features to this CSV file")
+    parser.add_argument("--reload-interval", type=float, default=config.SERVE_RELOAD_INTERVAL,
+                        help="Seconds between checks for a new model file (0 disables)")
+    args = parser.parse_args()
+
+    team_features = None
+    if args.year and not args.team_features:
+        if not args.api_key:
+            parser.error("--year needs an API key. Set CFB_API_KEY or use --api-key")
+        from data_fetcher import CFBDataFetcher
+        from preprocessor import CFBPreprocessor
+        fetcher = CFBDataFetcher(args.api_key)
+        try:
+            talent = fetcher.get_team_talent(args.year)
+        except Exception as e:
+            logger.warning(f"Could not fetch talent data: {e}")
+            talent = None
+        team_features = CFBPreprocessor().build_team_features(fetcher.get_team_stats(args.year), talent)
+        if args.save_team_features:
+            team_features.to_csv(args.save_team_features)
+
+    service = PredictionService(args.model_path, team_features=team_features,
+                                team_features_path=args.team_features)
+    if args.reload_interval > 0:
+        service.watch(args.reload_interval)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving {service.model.model_type} model on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
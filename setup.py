@@ -12,7 +12,8 @@ requirements = [
     "requests>=2.31.0",
     "pandas>=2.0.0",
     "numpy>=1.24.0",
-    "scikit-learn>=1.3.0",
+    "scikit-learn>=1.4.0",
+    "scipy>=1.10.0",
     "urllib3>=2.0.0",
     "pytest>=7.4.0",
 ]
@@ -25,7 +26,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/zachringnight/cfbmodel",
-    py_modules=['__init__', 'main', 'model', 'preprocessor', 'data_fetcher', 'config'],
+    py_modules=['__init__', 'main', 'model', 'preprocessor', 'data_fetcher', 'config', 'cache', 'async_fetcher', 'rate_limiter', 'storage', 'archives', 'schema', 'rolling_features', 'srs', 'backtest', 'tree_compiler', 'artifact', 'registry', 'tuning', 'stacking', 'simulator', 'matchups', 'serve', 'weeks', 'batch_predict'],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -42,9 +43,14 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=requirements,
+    extras_require={
+        "lake": ["pyarrow>=12.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "cfbmodel=main:main",
+            "cfbmodel-serve=serve:main",
+            "cfbmodel-batch=batch_predict:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo season simulator
+
+Simulates the rest of a season many times from per-game home-win
+probabilities (e.g. CFBModel.predict_proba) and reports each team's
+projected win total, conference title odds and playoff odds.
+
+Each batch of simulated seasons is one NumPy draw matrix of shape
+(simulations, remaining games). Team win totals come from one sparse
+product of that matrix with the schedule's home/away incidence. There
+are no per-simulation or per-game Python loops. Completed games keep their
+actual results.
+
+Optionally, ratings are updated between weeks. Each simulated season
+carries a logit-scale rating per team. After every week, a team's rating
+moves by rating_k times its results minus its expected wins, and later
+games are shifted by the rating difference. Hot and cold streaks then
+carry forward within a simulated season, which widens the win
+distributions the way real in-season uncertainty does.
+
+Title and playoff rules are approximations:
+- The conference champion is the team with the best simulated conference
+  record, with overall wins and then a random draw as tie-breakers.
+- The playoff takes the PLAYOFF_AUTO_BIDS best conference champions plus
+  the best remaining teams up to PLAYOFF_TEAMS, ranked by simulated wins.
+"""
+
+import argparse
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import config
+from rolling_features import _column, game_rounds
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def home_win_probabilities(model, X: pd.DataFrame) -> np.ndarray:
+    """
+    P(home win) for each game from a trained CFBModel (or sklearn classifier)
+
+    Returns:
+        1-d array aligned with X's rows
+    """
+    proba = model.predict_proba(X)
+    classes = list(model.model.classes_ if hasattr(model, 'model') else model.classes_)
+    if 1 not in classes:
+        return np.zeros(len(X))
+    return proba[:, classes.index(1)]
+
+
+def _schedule(games: pd.DataFrame) -> pd.DataFrame:
+    """Games with teams, conferences, results and round under fixed names"""
+    home = _column(games, 'homeTeam', 'home_team')
+    away = _column(games, 'awayTeam', 'away_team')
+    if home is None or away is None or 'week' not in games.columns:
+        raise ValueError("games needs week and home/away team columns")
+    home_conf = _column(games, 'homeConference', 'home_conference')
+    away_conf = _column(games, 'awayConference', 'away_conference')
+    home_pts = _column(games, 'homePoints', 'home_points')
+    away_pts = _column(games, 'awayPoints', 'away_points')
+    conf_game = _column(games, 'conferenceGame', 'conference_game')
+
+    def values(name, default):
+        if name is None:
+            return np.full(len(games), default, dtype=object)
+        return games[name].astype(object).where(games[name].notna(), default).to_numpy()
+
+    schedule = pd.DataFrame({
+        'home': games[home].astype(str).to_numpy(),
+        'away': games[away].astype(str).to_numpy(),
+        'home_conference': values(home_conf, None),
+        'away_conference': values(away_conf, None),
+        'home_points': pd.to_numeric(games[home_pts], errors='coerce').to_numpy() if home_pts else np.nan,
+        'away_points': pd.to_numeric(games[away_pts], errors='coerce').to_numpy() if away_pts else np.nan,
+        'round': game_rounds(games),
+    })
+    schedule['completed'] = schedule['home_points'].notna() & schedule['away_points'].notna()
+    same_conference = (schedule['home_conference'] == schedule['away_conference']) \
+        & schedule['home_conference'].notna()
+    if conf_game is not None:
+        schedule['conference_game'] = games[conf_game].fillna(False).astype(bool).to_numpy()
+    else:
+        schedule['conference_game'] = same_conference.to_numpy()
+    return schedule
+
+
+class SeasonSimulator:
+    """Vectorized simulation of a season's remaining games"""
+
+    def __init__(self, games: pd.DataFrame, home_win_proba: np.ndarray,
+                 rating_k: float = config.SIM_RATING_K):
+        """
+        Initialize the simulator
+
+        Args:
+            games: The season's games (CFBDataFetcher.get_games schema or the
+                model pack's snake_case one); games with both scores are
+                treated as completed
+            home_win_proba: P(home win) for every game in games (values for
+                completed games are ignored)
+            rating_k: Logit-scale rating change per win above expectation
+                between weeks (0 disables rating updates)
+        """
+        home_win_proba = np.asarray(home_win_proba, dtype=np.float64)
+        if len(home_win_proba) != len(games):
+            raise ValueError(f"home_win_proba must have one value per game. "
+                             f"Got {len(home_win_proba)} for {len(games)} games")
+        if np.any((home_win_proba < 0) | (home_win_proba > 1)):
+            raise ValueError("home_win_proba must be between 0 and 1")
+
+        schedule = _schedule(games)
+        self.rating_k = rating_k
+        self.teams = np.unique(np.concatenate([schedule['home'], schedule['away']]))
+        n_teams = len(self.teams)
+        home = np.searchsorted(self.teams, schedule['home'].to_numpy())
+        away = np.searchsorted(self.teams, schedule['away'].to_numpy())
+
+        # Each team's conference (from any game that lists it)
+        conference = pd.concat([
+            pd.Series(schedule['home_conference'].to_numpy(), index=home),
+            pd.Series(schedule['away_conference'].to_numpy(), index=away),
+        ]).dropna()
+        conference = conference[~conference.index.duplicated()]
+        self.conference = np.full(n_teams, None, dtype=object)
+        self.conference[conference.index.to_numpy()] = conference.to_numpy()
+        # Title races only exist in real conferences
+        self.conferences = sorted(c for c in set(conference) if 'independent' not in str(c).lower())
+
+        # Results already played
+        completed = schedule['completed'].to_numpy()
+        home_won = (schedule['home_points'] > schedule['away_points']).to_numpy() & completed
+        winner = np.where(home_won, home, away)[completed]
+        conf_completed = completed & schedule['conference_game'].to_numpy()
+        conf_winner = np.where(home_won, home, away)[conf_completed]
+        self.current_wins = np.bincount(winner, minlength=n_teams)
+        self.current_conference_wins = np.bincount(conf_winner, minlength=n_teams)
+        self.games_played = np.bincount(np.concatenate([home[completed], away[completed]]),
+                                        minlength=n_teams)
+
+        # Remaining games, in chronological order
+        remaining = np.flatnonzero(~completed)
+        remaining = remaining[np.argsort(schedule['round'].to_numpy()[remaining], kind='stable')]
+        self.n_remaining = len(remaining)
+        self.proba = home_win_proba[remaining].astype(np.float32)
+        self.home, self.away = home[remaining], away[remaining]
+        self.rounds = schedule['round'].to_numpy()[remaining]
+        self.remaining_conference = schedule['conference_game'].to_numpy()[remaining]
+
+        # Home-minus-away incidence: wins = away-game count + draws @ incidence
+        rows = np.arange(self.n_remaining)
+        ones = np.ones(self.n_remaining, dtype=np.float32)
+        self.incidence = sparse.csr_matrix(
+            (np.concatenate([ones, -ones]), (np.concatenate([rows, rows]),
+                                             np.concatenate([self.home, self.away]))),
+            shape=(self.n_remaining, n_teams))
+        self.away_games = np.bincount(self.away, minlength=n_teams)
+        conf_rows = self.remaining_conference.astype(np.float32)
+        self.conference_incidence = sparse.diags(conf_rows) @ self.incidence
+        self.away_conference_games = np.bincount(self.away[self.remaining_conference],
+                                                 minlength=n_teams)
+
+    def _draw(self, rng: np.random.Generator, n_sims: int) -> np.ndarray:
+        """(n_sims, remaining games) matrix of home wins as float32 0/1"""
+        draws = rng.random((n_sims, self.n_remaining), dtype=np.float32)
+        if not self.rating_k:
+            return (draws < self.proba).astype(np.float32)
+
+        logit = np.log(self.proba) - np.log1p(-self.proba)
+        ratings = np.zeros((n_sims, len(self.teams)), dtype=np.float32)
+        home_wins = np.empty_like(draws)
+        for start, stop in zip(*self._round_bounds()):
+            home, away = self.home[start:stop], self.away[start:stop]
+            p = 1 / (1 + np.exp(-(logit[start:stop] + ratings[:, home] - ratings[:, away])))
+            home_wins[:, start:stop] = draws[:, start:stop] < p
+            surprise = self.rating_k * (home_wins[:, start:stop] - p)
+            ratings += (self.incidence[start:stop].T @ surprise.T).T
+        return home_wins
+
+    def _round_bounds(self):
+        """Start and stop positions of each round in the remaining games"""
+        change = np.flatnonzero(np.diff(self.rounds)) + 1
+        return np.r_[0, change], np.r_[change, self.n_remaining]
+
+    def _wins(self, home_wins: np.ndarray, incidence, away_games, current) -> np.ndarray:
+        """Season win totals per simulation: played + simulated"""
+        simulated = np.asarray(incidence.T @ home_wins.T).T
+        return (current + away_games + simulated).astype(np.int16)
+
+    def _titles(self, rng: np.random.Generator, wins: np.ndarray,
+                conference_wins: np.ndarray) -> np.ndarray:
+        """Conference champion flags, shape (n_sims, n_teams)"""
+        # Conference record first, then overall wins, then a coin flip
+        key = conference_wins * 1000.0 + wins + rng.random(wins.shape, dtype=np.float32)
+        champion = np.zeros(wins.shape, dtype=bool)
+        rows = np.arange(len(wins))
+        for name in self.conferences:
+            members = np.flatnonzero(self.conference == name)
+            champion[rows, members[np.argmax(key[:, members], axis=1)]] = True
+        return champion
+
+    def _playoff(self, rng: np.random.Generator, wins: np.ndarray, champion: np.ndarray,
+                 playoff_teams: int, auto_bids: int) -> np.ndarray:
+        """Playoff field flags, shape (n_sims, n_teams)"""
+        n_teams = wins.shape[1]
+        playoff_teams = min(playoff_teams, n_teams)
+        rank_key = wins + rng.random(wins.shape, dtype=np.float32)
+        field = np.zeros(wins.shape, dtype=bool)
+        rows = np.arange(len(wins))[:, None]
+
+        auto_bids = min(auto_bids, len(self.conferences), playoff_teams)
+        if auto_bids:
+            champion_key = np.where(champion, rank_key, -np.inf)
+            field[rows, np.argpartition(-champion_key, auto_bids - 1, axis=1)[:, :auto_bids]] = True
+        at_large = playoff_teams - auto_bids
+        if at_large:
+            rest_key = np.where(field, -np.inf, rank_key)
+            field[rows, np.argpartition(-rest_key, at_large - 1, axis=1)[:, :at_large]] = True
+        return field
+
+    def simulate(self, n_sims: int = config.SIM_N_SIMULATIONS,
+                 seed: Optional[int] = config.RANDOM_STATE,
+                 chunk_size: int = config.SIM_CHUNK_SIZE,
+                 playoff_teams: int = config.PLAYOFF_TEAMS,
+                 auto_bids: int = config.PLAYOFF_AUTO_BIDS) -> pd.DataFrame:
+        """
+        Simulate the remaining schedule n_sims times
+
+        Args:
+            n_sims: Number of simulated seasons
+            seed: Seed; the same seed and chunk_size give identical results
+            chunk_size: Simulations drawn per batch (bounds memory use)
+            playoff_teams: Size of the playoff field
+            auto_bids: Playoff spots reserved for conference champions
+
+        Returns:
+            DataFrame with one row per team: team, conference, current wins,
+            games, mean/std/p10/p90 of projected wins, conference title odds
+            and playoff odds, sorted by projected wins
+        """
+        if n_sims < 1:
+            raise ValueError(f"n_sims must be positive. Got {n_sims}")
+        rng = np.random.default_rng(seed)
+        n_teams = len(self.teams)
+        n_games = self.games_played + np.bincount(np.concatenate([self.home, self.away]),
+                                                  minlength=n_teams)
+        max_wins = int(n_games.max()) if n_teams else 0
+        win_counts = np.zeros((n_teams, max_wins + 1), dtype=np.int64)
+        titles = np.zeros(n_teams, dtype=np.int64)
+        playoffs = np.zeros(n_teams, dtype=np.int64)
+        start = time.time()
+
+        for offset in range(0, n_sims, chunk_size):
+            n = min(chunk_size, n_sims - offset)
+            home_wins = self._draw(rng, n)
+            wins = self._wins(home_wins, self.incidence, self.away_games, self.current_wins)
+            conference_wins = self._wins(home_wins, self.conference_incidence,
+                                         self.away_conference_games, self.current_conference_wins)
+            champion = self._titles(rng, wins, conference_wins)
+            field = self._playoff(rng, wins, champion, playoff_teams, auto_bids)
+
+            cells = wins.astype(np.int64) + np.arange(n_teams) * (max_wins + 1)
+            win_counts += np.bincount(cells.ravel(), minlength=win_counts.size).reshape(win_counts.shape)
+            titles += champion.sum(axis=0)
+            playoffs += field.sum(axis=0)
+        logger.info(f"Simulated {n_sims} seasons of {self.n_remaining} remaining games "
+                    f"in {time.time() - start:.2f}s")
+
+        distribution = win_counts / n_sims
+        support = np.arange(max_wins + 1)
+        mean = distribution @ support
+        cdf = np.cumsum(distribution, axis=1)
+        return pd.DataFrame({
+            'team': self.teams,
+            'conference': self.conference,
+            'wins': self.current_wins,
+            'games': n_games,
+            'projected_wins': mean,
+            'wins_std': np.sqrt(np.maximum(distribution @ support ** 2 - mean ** 2, 0)),
+            'wins_p10': np.argmax(cdf >= 0.1, axis=1),
+            'wins_p90': np.argmax(cdf >= 0.9, axis=1),
+            'conference_title': titles / n_sims,
+            'playoff': playoffs / n_sims,
+        }).sort_values(['projected_wins', 'team'], ascending=[False, True], ignore_index=True)
+
+
+def simulate_season(games: pd.DataFrame, home_win_proba: np.ndarray,
+                    n_sims: int = config.SIM_N_SIMULATIONS,
+                    seed: Optional[int] = config.RANDOM_STATE,
+                    rating_k: float = config.SIM_RATING_K, **kwargs) -> pd.DataFrame:
+    """
+    Project a season: SeasonSimulator(games, home_win_proba).simulate()
+
+    Args:
+        games: The season's games; completed games keep their results
+        home_win_proba: P(home win) for every game
+        n_sims: Number of simulated seasons
+        seed: Random seed
+        rating_k: Between-week rating update strength (0 = off)
+        **kwargs: Passed to SeasonSimulator.simulate
+
+    Returns:
+        Per-team projections (see SeasonSimulator.simulate)
+    """
+    return SeasonSimulator(games, home_win_proba, rating_k=rating_k).simulate(n_sims, seed, **kwargs)
+
+
+def project_season(fetcher, preprocessor, model, year: int, **kwargs) -> pd.DataFrame:
+    """
+    Fetch a season's schedule and statistics, score every game with a
+    trained model and simulate the rest of the season
+
+    Args:
+        fetcher: CFBDataFetcher instance
+        preprocessor: CFBPreprocessor instance
+        model: Trained CFBModel
+        year: Season year
+        **kwargs: Passed to simulate_season
+
+    Returns:
+        Per-team projections (see SeasonSimulator.simulate)
+    """
+    games = fetcher.get_games(year, season_type="regular")
+    if games.empty:
+        raise ValueError(f"No games found for the {year} season")
+    team_stats = fetcher.get_team_stats(year)
+    try:
+        talent = fetcher.get_team_talent(year)
+    except Exception as e:
+        logger.warning(f"Could not fetch talent data: {e}")
+        talent = None
+
+    features = preprocessor.prepare_game_features(games, team_stats, talent)
+    X, _ = preprocessor.create_training_data(features, categorical=model.categorical_features)
+    return simulate_season(games, home_win_probabilities(model, X), **kwargs)
+
+
+def main():
+    """Simulate the rest of a season from the command line"""
+    import os
+
+    from data_fetcher import CFBDataFetcher
+    from model import CFBModel
+    from preprocessor import CFBPreprocessor
+
+    parser = argparse.ArgumentParser(description="Monte Carlo projection of the rest of a season")
+    parser.add_argument("--api-key", default=os.environ.get("CFB_API_KEY"),
+                        help="College Football Data API key (or CFB_API_KEY)")
+    parser.add_argument("--year", type=int, required=True, help="Season year")
+    parser.add_argument("--model-path", default="cfb_model.pkl", help="Trained model or artifact directory")
+    parser.add_argument("--sims", type=int, default=config.SIM_N_SIMULATIONS, help="Simulated seasons")
+    parser.add_argument("--seed", type=int, default=config.RANDOM_STATE, help="Random seed")
+    parser.add_argument("--rating-k", type=float, default=config.SIM_RATING_K,
+                        help="Between-week rating update strength (0 = off)")
+    parser.add_argument("--output", help="Write the projections to this CSV file")
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("API key required. Set CFB_API_KEY or use --api-key")
+
+    model = CFBModel()
+    model.load(args.model_path)
+    projections = project_season(CFBDataFetcher(args.api_key), CFBPreprocessor(), model, args.year,
+                                 n_sims=args.sims, seed=args.seed, rating_k=args.rating_k)
+    if args.output:
+        projections.to_csv(args.output, index=False)
+        print(f"Projections saved to {args.output}")
+    print(projections.head(25).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Opponent-adjusted (SRS-style) team ratings
+
+Every team-game is one observation of the offense's metric against a
+defense:
+
+    metric = season_mean + offense[team] + defense[opponent]
+
+The design matrix has one offense and one defense column per (season, team)
+and exactly two non-zeros per row, so it is built directly in scipy.sparse
+form. All metrics share the matrix and are solved together as one block
+least-squares problem, and the previous solution can seed the next solve
+(e.g. last week's ratings).
+"""
+
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def available_metrics(stats_df: pd.DataFrame) -> List[str]:
+    """Metric names with both offense_<name> and defense_<name> numeric columns"""
+    metrics = []
+    for col in stats_df.columns:
+        if col.startswith('offense_'):
+            name = col[len('offense_'):]
+            if (f'defense_{name}' in stats_df.columns
+                    and pd.api.types.is_numeric_dtype(stats_df[col])
+                    and pd.api.types.is_numeric_dtype(stats_df[f'defense_{name}'])):
+                metrics.append(name)
+    return metrics
+
+
+def build_observations(stats_df: pd.DataFrame, metrics: Iterable[str]
+                       ) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    One row per (game, offense) from advanced_game_stats-style rows
+
+    A row's offense_<metric> is the team's offense against the opponent's
+    defense, and its defense_<metric> is the opponent's offense against the
+    team. Both are used, so a game is covered even when only one side's
+    row is present; duplicates of the same (game, offense) are dropped.
+
+    Args:
+        stats_df: Rows with team, opponent, offense_* and defense_* columns
+            (plus gameId and season when available)
+        metrics: Metric names without the offense_/defense_ prefix
+
+    Returns:
+        Tuple of (keys, values): keys has season, offense and defense columns,
+        values is an (n_obs, n_metrics) float array with NaN for missing
+    """
+    metrics = list(metrics)
+    season = stats_df['season'].to_numpy() if 'season' in stats_df.columns else np.zeros(len(stats_df))
+    game = (stats_df['gameId'].to_numpy() if 'gameId' in stats_df.columns
+            else np.arange(len(stats_df)))
+    team = stats_df['team'].astype(str).to_numpy()
+    opponent = stats_df['opponent'].astype(str).to_numpy()
+
+    keys = pd.DataFrame({
+        'game': np.concatenate([game, game]),
+        'season': np.concatenate([season, season]),
+        'offense': np.concatenate([team, opponent]),
+        'defense': np.concatenate([opponent, team]),
+    })
+    values = np.vstack([
+        stats_df[[f'offense_{m}' for m in metrics]].to_numpy(dtype=np.float64),
+        stats_df[[f'defense_{m}' for m in metrics]].to_numpy(dtype=np.float64),
+    ])
+
+    keep = ~keys.duplicated(['game', 'offense', 'defense']).to_numpy()
+    return keys[keep].reset_index(drop=True), values[keep]
+
+
+def design_matrix(keys: pd.DataFrame) -> Tuple[sparse.csr_matrix, pd.MultiIndex]:
+    """
+    Sparse offense/defense indicator matrix for a set of observations
+
+    Returns:
+        Tuple of (X, teams): X has shape (n_obs, 2 * n_teams) with columns
+        [offense ratings..., defense ratings...]; teams is the (season, team)
+        index of each rating
+    """
+    n_obs = len(keys)
+    both = pd.MultiIndex.from_arrays([
+        np.concatenate([keys['season'].to_numpy(), keys['season'].to_numpy()]),
+        np.concatenate([keys['offense'].to_numpy(), keys['defense'].to_numpy()]),
+    ])
+    codes, teams = pd.factorize(both)
+    teams = teams.set_names(['season', 'team'])
+    n_teams = len(teams)
+
+    rows = np.tile(np.arange(n_obs), 2)
+    cols = np.concatenate([codes[:n_obs], n_teams + codes[n_obs:]])
+    X = sparse.csr_matrix((np.ones(2 * n_obs), (rows, cols)), shape=(n_obs, 2 * n_teams))
+    return X, teams
+
+
+def solve(X: sparse.spmatrix, Y: np.ndarray, damping: float = config.SRS_DAMPING,
+          x0: Optional[np.ndarray] = None, mask: Optional[np.ndarray] = None,
+          tol: float = config.SRS_TOLERANCE, max_iter: int = config.SRS_MAX_ITER
+          ) -> Tuple[np.ndarray, int]:
+    """
+    Damped least squares for many right-hand sides at once (block CGLS)
+
+    Minimizes ||mask * (X @ B - Y)||^2 + damping * ||B||^2 column by column,
+    but every iteration does one sparse product with X and one with X.T for
+    all columns together. X.T @ X is never formed.
+
+    Args:
+        X: Sparse design matrix, shape (n_obs, n_params)
+        Y: Targets, shape (n_obs, n_rhs); masked entries are ignored
+        damping: Ridge penalty (must be positive for a unique solution)
+        x0: Starting solution, shape (n_params, n_rhs) (default: zeros)
+        mask: 0/1 weights of the same shape as Y (default: all ones)
+        tol: Stop when every column's normal-equation residual has shrunk
+            by this factor
+        max_iter: Iteration limit
+
+    Returns:
+        Tuple of (B, iterations)
+    """
+    Y = np.where(mask > 0, Y, 0.0) if mask is not None else Y
+    B = np.zeros((X.shape[1], Y.shape[1])) if x0 is None else np.array(x0, dtype=np.float64)
+
+    def residual_of(R):
+        return R * mask if mask is not None else R
+
+    R = residual_of(Y - X @ B)
+    S = X.T @ R - damping * B
+    P = S.copy()
+    gamma = np.einsum('ij,ij->j', S, S)
+    # Scale by ||X.T Y|| so a warm start that is already converged stops at once
+    target = tol * np.maximum(np.linalg.norm(X.T @ Y, axis=0), np.finfo(float).tiny)
+
+    iterations = 0
+    active = np.sqrt(gamma) > target
+    while active.any() and iterations < max_iter:
+        Q = residual_of(X @ P)
+        delta = np.einsum('ij,ij->j', Q, Q) + damping * np.einsum('ij,ij->j', P, P)
+        alpha = np.where(active & (delta > 0), gamma / np.where(delta > 0, delta, 1.0), 0.0)
+        B += P * alpha
+        R -= Q * alpha
+        S = X.T @ R - damping * B
+        gamma_next = np.einsum('ij,ij->j', S, S)
+        beta = np.where(gamma > 0, gamma_next / np.where(gamma > 0, gamma, 1.0), 0.0)
+        P = S + P * beta
+        gamma = gamma_next
+        active = np.sqrt(gamma) > target
+        iterations += 1
+
+    if active.any():
+        logger.warning(f"SRS solve stopped after {max_iter} iterations with "
+                       f"{int(active.sum())} metric(s) not converged")
+    return B, iterations
+
+
+def opponent_adjust(stats_df: pd.DataFrame, metrics: Optional[Iterable[str]] = None,
+                    previous: Optional[pd.DataFrame] = None,
+                    damping: float = config.SRS_DAMPING,
+                    tol: float = config.SRS_TOLERANCE,
+                    max_iter: int = config.SRS_MAX_ITER) -> pd.DataFrame:
+    """
+    Opponent-adjust per-game metrics for every team and season in one solve
+
+    Args:
+        stats_df: advanced_game_stats-style rows (gameId, season, team,
+            opponent, offense_<metric>, defense_<metric>); any number of
+            seasons and teams (FBS and FCS alike)
+        metrics: Metric names without prefix, e.g. ["ppa", "successRate"]
+            (default: every metric with offense_ and defense_ columns)
+        previous: Output of an earlier call (e.g. last week) used as the
+            starting point; teams not in it start at the season mean
+        damping: Ridge penalty
+        tol: Solver tolerance
+        max_iter: Solver iteration limit
+
+    Returns:
+        DataFrame indexed by (season, team) with games plus adjusted
+        offense_<metric> (what the offense produces against an average
+        defense) and defense_<metric> (what the defense allows to an
+        average offense) columns
+    """
+    if stats_df.empty:
+        raise ValueError("stats_df cannot be empty")
+    metrics = available_metrics(stats_df) if metrics is None else list(metrics)
+    if not metrics:
+        raise ValueError("No offense_/defense_ metric columns found")
+
+    keys, Y = build_observations(stats_df, metrics)
+    X, teams = design_matrix(keys)
+    n_teams = len(teams)
+    mask = (~np.isnan(Y)).astype(np.float64)
+
+    # Center each metric on its own season's mean
+    season_codes, seasons = pd.factorize(keys['season'])
+    counts = np.zeros((len(seasons), len(metrics)))
+    sums = np.zeros((len(seasons), len(metrics)))
+    np.add.at(counts, season_codes, mask)
+    np.add.at(sums, season_codes, np.nan_to_num(Y))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        season_mean = np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+    Y = np.nan_to_num(Y - season_mean[season_codes])
+
+    team_mean = season_mean[pd.Index(seasons).get_indexer(teams.get_level_values('season'))]
+    x0 = None
+    if previous is not None:
+        offense = previous.reindex(teams)[[f'offense_{m}' for m in metrics]].to_numpy(dtype=np.float64)
+        defense = previous.reindex(teams)[[f'defense_{m}' for m in metrics]].to_numpy(dtype=np.float64)
+        x0 = np.nan_to_num(np.vstack([offense - team_mean, defense - team_mean]))
+
+    B, iterations = solve(X, Y, damping=damping, x0=x0, mask=mask, tol=tol, max_iter=max_iter)
+    logger.info(f"Opponent-adjusted {len(metrics)} metrics for {n_teams} team-seasons "
+                f"from {len(keys)} observations in {iterations} iterations")
+
+    games = np.asarray(X[:, :n_teams].sum(axis=0)).ravel()
+    result = pd.DataFrame(index=teams)
+    result['games'] = games.astype(np.int64)
+    for k, metric in enumerate(metrics):
+        result[f'offense_{metric}'] = team_mean[:, k] + B[:n_teams, k]
+    for k, metric in enumerate(metrics):
+        result[f'defense_{metric}'] = team_mean[:, k] + B[n_teams:, k]
+    return result.sort_index()
@@ -0,0 +1,172 @@
+"""
+Stacked ensemble of CFBModel backends
+
+Base models are fitted on K folds, and a logistic meta-learner is fitted on
+their out-of-fold probabilities. All fold x model fits are independent, so
+they run as one parallel batch. The fold models are kept and their
+probabilities averaged at prediction time, so the bases are never refitted
+on the full data.
+
+The out-of-fold probabilities and fold models are cached on disk, keyed by
+the training data, the base models' parameters and the folds. Refitting
+with only meta-learner settings changed (meta_C) reuses them and fits just
+the meta-learner:
+
+    .cfb_oof_cache/<key>/   oof.npy, fold_models.pkl
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+
+from artifact import data_hash
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _fit_fold(estimator, X, y: np.ndarray, train: np.ndarray):
+    """Fit one base model on one fold's training rows"""
+    rows = X.iloc[train] if isinstance(X, pd.DataFrame) else X[train]
+    return estimator.fit(rows, y[train])
+
+
+def _aligned_proba(estimator, X, classes: np.ndarray) -> np.ndarray:
+    """predict_proba with columns for every class (a fold may miss one)"""
+    proba = np.zeros((len(X), len(classes)))
+    proba[:, np.searchsorted(classes, estimator.classes_)] = estimator.predict_proba(X)
+    return proba
+
+
+class StackedEnsemble(ClassifierMixin, BaseEstimator):
+    """
+    Stacking classifier over named base estimators
+
+    Args:
+        estimators: (name, unfitted estimator) pairs
+        cv: Number of stratified folds for the out-of-fold predictions
+        meta_C: Inverse regularization strength of the logistic meta-learner
+        n_jobs: Parallel fold x model fits (-1 uses all cores)
+        cache_dir: Directory for cached out-of-fold predictions (None
+            disables the cache)
+        random_state: Seed for the folds
+    """
+
+    def __init__(self, estimators: Sequence[Tuple[str, BaseEstimator]] = (), cv: int = 5,
+                 meta_C: float = 1.0, n_jobs: Optional[int] = None,
+                 cache_dir: Optional[str] = None, random_state: Optional[int] = None):
+        self.estimators = estimators
+        self.cv = cv
+        self.meta_C = meta_C
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.random_state = random_state
+
+    def _cache_key(self, X, y: np.ndarray) -> str:
+        frame = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        params = []
+        for name, estimator in self.estimators:
+            estimator_params = estimator.get_params()
+            # Parallelism doesn't change the fitted models
+            estimator_params.pop('n_jobs', None)
+            params.append([name, type(estimator).__name__, estimator_params])
+        payload = json.dumps({'data': data_hash(frame, y), 'estimators': params,
+                              'cv': self.cv, 'random_state': self.random_state},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def _load_cached(self, key: str) -> Optional[Tuple[np.ndarray, List[List[BaseEstimator]]]]:
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.exists(os.path.join(path, 'fold_models.pkl')):
+            return None
+        with open(os.path.join(path, 'fold_models.pkl'), 'rb') as f:
+            fold_models = pickle.load(f)
+        logger.info(f"Reusing cached out-of-fold predictions {key}")
+        return np.load(os.path.join(path, 'oof.npy')), fold_models
+
+    def _save_cached(self, key: str, oof: np.ndarray, fold_models: List[List[BaseEstimator]]):
+        path = os.path.join(self.cache_dir, key)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'oof.npy'), oof)
+        with open(os.path.join(tmp_path, 'fold_models.pkl'), 'wb') as f:
+            pickle.dump(fold_models, f)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another fit cached the same key first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _stack(self, probas: Sequence[np.ndarray]) -> np.ndarray:
+        """Meta-learner features: each base's class probabilities (P(class 1) if binary)"""
+        return np.hstack([p[:, 1:] if p.shape[1] == 2 else p for p in probas])
+
+    def _fit_bases(self, X, y: np.ndarray) -> Tuple[np.ndarray, List[List[BaseEstimator]]]:
+        """Fit every fold x base pair in one batch; returns (oof probabilities, fold models)"""
+        folds = list(StratifiedKFold(n_splits=self.cv, shuffle=True,
+                                     random_state=self.random_state).split(X, y))
+        jobs = [(b, f) for b in range(len(self.estimators)) for f in range(len(folds))]
+        logger.info(f"Fitting {len(self.estimators)} base models on {len(folds)} folds "
+                    f"in parallel (n_jobs={self.n_jobs})")
+        # Tree fitting releases the GIL, so threads avoid copying X to processes
+        fitted = Parallel(n_jobs=self.n_jobs, prefer="threads")(
+            delayed(_fit_fold)(clone(self.estimators[b][1]), X, y, folds[f][0]) for b, f in jobs
+        )
+
+        fold_models = [[None] * len(folds) for _ in self.estimators]
+        base_oof = [np.zeros((len(y), len(self.classes_))) for _ in self.estimators]
+        for (b, f), estimator in zip(jobs, fitted):
+            fold_models[b][f] = estimator
+            test = folds[f][1]
+            rows = X.iloc[test] if isinstance(X, pd.DataFrame) else X[test]
+            base_oof[b][test] = _aligned_proba(estimator, rows, self.classes_)
+        return self._stack(base_oof), fold_models
+
+    def fit(self, X, y):
+        """
+        Fit the base models on every fold, then the meta-learner on their
+        out-of-fold probabilities
+        """
+        if not self.estimators:
+            raise ValueError("StackedEnsemble needs at least one base estimator")
+        y = np.asarray(y)
+        self.classes_ = np.unique(y)
+        self.n_features_in_ = X.shape[1]
+        if isinstance(X, pd.DataFrame):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+
+        key = self._cache_key(X, y) if self.cache_dir else None
+        cached = self._load_cached(key) if key else None
+        if cached is None:
+            self.oof_, self.fold_models_ = self._fit_bases(X, y)
+            if key:
+                self._save_cached(key, self.oof_, self.fold_models_)
+        else:
+            self.oof_, self.fold_models_ = cached
+
+        self.meta_ = LogisticRegression(C=self.meta_C, max_iter=1000).fit(self.oof_, y)
+        return self
+
+    def base_proba(self, X) -> List[np.ndarray]:
+        """Each base model's probabilities, averaged over its fold models"""
+        return [np.mean([_aligned_proba(estimator, X, self.classes_) for estimator in models], axis=0)
+                for models in self.fold_models_]
+
+    def predict_proba(self, X) -> np.ndarray:
+        return _aligned_proba(self.meta_, self._stack(self.base_proba(X)), self.classes_)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
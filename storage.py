@@ -0,0 +1,349 @@
+"""
+Columnar local data lake for College Football Data API responses
+
+Fetcher output is stored as compressed Parquet files partitioned by
+endpoint, season and (for weekly endpoints) week:
+
+    <root>/games/season=2023/week=5/part-regular.parquet
+    <root>/games/season=2023/week=1/part-postseason.parquet
+    <root>/team_stats/season=2023/part-0.parquet
+
+Weekly data with a seasonType column gets one file per season type, because
+the API numbers postseason weeks from 1 again.
+
+Requires the optional pyarrow dependency (pip install cfbmodel[lake]).
+"""
+
+import logging
+import os
+import shutil
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+import config
+import schema
+from preprocessor import STAT_FEATURE_MAP
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Endpoints whose responses carry a week and are partitioned by it
+WEEKLY_ENDPOINTS = {"games", "lines"}
+
+
+def _schemas() -> Dict[str, Dict[str, Any]]:
+    """Arrow types for the known columns of each endpoint"""
+    category = pa.dictionary(pa.int32(), pa.string())
+    return {
+        "games": {
+            "id": pa.int64(),
+            "seasonType": category,
+            "startDate": pa.string(),
+            "neutralSite": pa.bool_(),
+            "conferenceGame": pa.bool_(),
+            "attendance": pa.int32(),
+            "venueId": pa.int32(),
+            "homeId": pa.int32(),
+            "homeTeam": category,
+            "homeConference": category,
+            "homeClassification": category,
+            "homePoints": pa.int16(),
+            "homePregameElo": pa.int16(),
+            "homePostgameElo": pa.int16(),
+            "homePostgameWinProbability": pa.float32(),
+            "awayId": pa.int32(),
+            "awayTeam": category,
+            "awayConference": category,
+            "awayClassification": category,
+            "awayPoints": pa.int16(),
+            "awayPregameElo": pa.int16(),
+            "awayPostgameElo": pa.int16(),
+            "awayPostgameWinProbability": pa.float32(),
+            "excitementIndex": pa.float32(),
+        },
+        "team_stats": {
+            "team": category,
+            "conference": category,
+            "statName": category,
+            "statValue": pa.float64(),
+        },
+        "talent": {
+            "year": pa.int16(),
+            "school": category,
+            "talent": pa.float32(),
+        },
+        "records": {
+            "year": pa.int16(),
+            "teamId": pa.int32(),
+            "team": category,
+            "conference": category,
+            "division": category,
+        },
+        "lines": {
+            "id": pa.int64(),
+            "seasonType": category,
+            "startDate": pa.string(),
+            "homeTeam": category,
+            "homeConference": category,
+            "homeScore": pa.int16(),
+            "awayTeam": category,
+            "awayConference": category,
+            "awayScore": pa.int16(),
+        },
+    }
+
+
+# Endpoint name -> CFBDataFetcher method used by DataLake.ingest
+FETCHER_METHODS = {
+    "games": "get_games",
+    "team_stats": "get_team_stats",
+    "talent": "get_team_talent",
+    "records": "get_team_records",
+    "lines": "get_betting_lines",
+}
+
+_FILTER_OPS = {
+    "==": lambda f, v: f == v,
+    "=": lambda f, v: f == v,
+    "!=": lambda f, v: f != v,
+    "<": lambda f, v: f < v,
+    "<=": lambda f, v: f <= v,
+    ">": lambda f, v: f > v,
+    ">=": lambda f, v: f >= v,
+    "in": lambda f, v: f.isin(list(v)),
+    "not in": lambda f, v: ~f.isin(list(v)),
+}
+
+
+def _remove(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class DataLake:
+    """Partitioned Parquet store for fetcher output with pushdown reads"""
+
+    def __init__(self, root: str = config.DATA_LAKE_DIR,
+                 compression: str = config.DATA_LAKE_COMPRESSION):
+        """
+        Initialize the data lake
+
+        Args:
+            root: Root directory of the lake
+            compression: Parquet compression codec (e.g. "zstd", "snappy")
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        if pa is None:
+            raise ImportError("DataLake requires pyarrow. Install it with: pip install pyarrow")
+
+        self.root = root
+        self.compression = compression
+        self.schemas = _schemas()
+        os.makedirs(root, exist_ok=True)
+
+    def _partitioning(self, endpoint: str):
+        fields = [("season", pa.int16())]
+        if endpoint in WEEKLY_ENDPOINTS:
+            fields.append(("week", pa.int16()))
+        return ds.partitioning(pa.schema(fields), flavor="hive")
+
+    def _arrow_table(self, endpoint: str, df: pd.DataFrame) -> "pa.Table":
+        """Convert a DataFrame to Arrow using the endpoint's typed schema"""
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        for name, arrow_type in self.schemas.get(endpoint, {}).items():
+            index = schema.get_field_index(name)
+            if index != -1:
+                schema = schema.set(index, pa.field(name, arrow_type))
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+    def write(self, endpoint: str, df: pd.DataFrame, season: int,
+              week: Optional[int] = None) -> List[str]:
+        """
+        Persist fetcher output, replacing the partitions it covers
+
+        Weekly endpoints are split on their own week column, so a full
+        season of games lands in one partition per week. Within a week, only
+        the season types present in df are replaced.
+
+        Args:
+            endpoint: Endpoint name, e.g. "games" or "team_stats"
+            df: DataFrame returned by CFBDataFetcher
+            season: Season year
+            week: Week of the data, if it is not in a week column
+
+        Returns:
+            Paths of the Parquet files written
+        """
+        if df.empty:
+            logger.info(f"Nothing to write for {endpoint} season={season}")
+            return []
+
+        if endpoint in WEEKLY_ENDPOINTS:
+            if "week" in df.columns:
+                groups = [(int(w), part) for w, part in df.groupby("week", sort=True)]
+            elif week is not None:
+                groups = [(week, df)]
+            else:
+                raise ValueError(f"{endpoint} data needs a week column or an explicit week")
+        else:
+            groups = [(None, df)]
+
+        paths = []
+        for part_week, part in groups:
+            directory = os.path.join(self.root, endpoint, f"season={season}")
+            if part_week is not None:
+                directory = os.path.join(directory, f"week={part_week}")
+            # Partition values live in the directory names
+            part = part.drop(columns=[c for c in ("season", "week") if c in part.columns])
+
+            if part_week is not None and "seasonType" in part.columns:
+                # Postseason weeks are numbered from 1 again, so each season
+                # type of a week is its own file and only that file is replaced
+                os.makedirs(directory, exist_ok=True)
+                _remove(os.path.join(directory, "part-0.parquet"))
+                season_types = part["seasonType"].astype("string").fillna("unknown")
+                files = [(os.path.join(directory, f"part-{season_type}.parquet"), type_part)
+                         for season_type, type_part in part.groupby(season_types, sort=True)]
+            else:
+                if os.path.isdir(directory):
+                    shutil.rmtree(directory)
+                os.makedirs(directory)
+                files = [(os.path.join(directory, "part-0.parquet"), part)]
+
+            for path, file_part in files:
+                pq.write_table(self._arrow_table(endpoint, file_part), path, compression=self.compression)
+                paths.append(path)
+
+        logger.info(f"Wrote {len(df)} {endpoint} rows for season={season} to {len(paths)} partition(s)")
+        return paths
+
+    def read(self, endpoint: str, seasons: Optional[Iterable[int]] = None,
+             weeks: Optional[Iterable[int]] = None,
+             columns: Optional[Sequence[str]] = None,
+             filters: Optional[Sequence[Tuple[str, str, Any]]] = None) -> pd.DataFrame:
+        """
+        Read an endpoint with partition, predicate and column pushdown
+
+        Only the partitions matching seasons/weeks are opened and only the
+        requested columns are decoded.
+
+        Args:
+            endpoint: Endpoint name
+            seasons: Seasons to read (default: all)
+            weeks: Weeks to read, for weekly endpoints (default: all)
+            columns: Columns to return (default: all); missing columns are skipped
+            filters: Row predicates as (column, op, value) tuples, e.g.
+                ("statName", "in", ["totalYards"])
+
+        Returns:
+            DataFrame with the matching rows and columns, cast to the
+            endpoint's compact schema
+        """
+        directory = os.path.join(self.root, endpoint)
+        if not os.path.isdir(directory):
+            return pd.DataFrame(columns=list(columns) if columns else None)
+
+        dataset = ds.dataset(directory, format="parquet",
+                             partitioning=self._partitioning(endpoint))
+
+        expression = None
+        predicates = list(filters or [])
+        if seasons is not None:
+            predicates.append(("season", "in", list(seasons)))
+        if weeks is not None:
+            if endpoint not in WEEKLY_ENDPOINTS:
+                raise ValueError(f"{endpoint} is not partitioned by week")
+            predicates.append(("week", "in", list(weeks)))
+        for column, op, value in predicates:
+            if op not in _FILTER_OPS:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            term = _FILTER_OPS[op](ds.field(column), value)
+            expression = term if expression is None else expression & term
+
+        if columns is not None:
+            columns = [c for c in columns if c in dataset.schema.names]
+
+        df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+        return schema.apply_schema(df, endpoint) if endpoint in schema.SCHEMAS else df
+
+    def partitions(self, endpoint: str) -> List[Tuple[int, Optional[int]]]:
+        """
+        List the (season, week) partitions stored for an endpoint
+
+        Args:
+            endpoint: Endpoint name
+
+        Returns:
+            Sorted list of (season, week) with week None for season-level data
+        """
+        directory = os.path.join(self.root, endpoint)
+        if not os.path.isdir(directory):
+            return []
+
+        found = []
+        for season_dir in os.listdir(directory):
+            if not season_dir.startswith("season="):
+                continue
+            season = int(season_dir.split("=", 1)[1])
+            if endpoint in WEEKLY_ENDPOINTS:
+                for week_dir in os.listdir(os.path.join(directory, season_dir)):
+                    if week_dir.startswith("week="):
+                        found.append((season, int(week_dir.split("=", 1)[1])))
+            else:
+                found.append((season, None))
+        return sorted(found, key=lambda p: (p[0], -1 if p[1] is None else p[1]))
+
+    def ingest(self, fetcher, season: int,
+               endpoints: Iterable[str] = ("games", "team_stats", "talent")) -> Dict[str, int]:
+        """
+        Fetch endpoints for a season and persist them
+
+        Args:
+            fetcher: CFBDataFetcher (or anything with the same get_* methods)
+            season: Season year
+            endpoints: Endpoint names to ingest
+
+        Returns:
+            Number of rows written per endpoint
+        """
+        rows = {}
+        for endpoint in endpoints:
+            if endpoint not in FETCHER_METHODS:
+                raise ValueError(f"Unknown endpoint: {endpoint}")
+            df = getattr(fetcher, FETCHER_METHODS[endpoint])(season)
+            self.write(endpoint, df, season)
+            rows[endpoint] = len(df)
+        return rows
+
+    def load_feature_inputs(self, season: int, weeks: Optional[Iterable[int]] = None
+                            ) -> Tuple[pd.DataFrame, pd.DataFrame, Optional[pd.DataFrame]]:
+        """
+        Load only the columns and stats CFBPreprocessor needs for one season
+
+        Args:
+            season: Season year
+            weeks: Weeks of games to load (default: all)
+
+        Returns:
+            Tuple of (games, team_stats, talent) ready for prepare_game_features
+        """
+        games = self.read("games", seasons=[season], weeks=weeks, columns=[
+            "id", "season", "week", "homeTeam", "awayTeam", "homePoints", "awayPoints",
+            "home_team", "away_team", "home_points", "away_points",
+        ])
+        team_stats = self.read("team_stats", seasons=[season],
+                               columns=["team", "statName", "statValue"],
+                               filters=[("statName", "in", list(STAT_FEATURE_MAP.values()))])
+        talent = self.read("talent", seasons=[season], columns=["school", "talent"])
+        return games, team_stats, (talent if not talent.empty else None)
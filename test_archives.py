@@ -0,0 +1,118 @@
+"""
+Tests for reading the bundled zip archives in place
+Run with: python -m pytest test_archives.py
+"""
+
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import archives
+import schema
+from archives import BundledArchive, is_resource_fork
+
+
+@pytest.fixture
+def season_zip(tmp_path):
+    """Small archive laid out like season_stats.zip, resource forks included"""
+    path = tmp_path / "season_stats.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("season_stats/", "")
+        zf.writestr("__MACOSX/._season_stats", "junk")
+        for season in (2022, 2023):
+            zf.writestr(f"season_stats/{season}.csv",
+                        f"season,team,conference,totalYards\n{season},Alabama,SEC,5000\n"
+                        f"{season},Georgia,SEC,5100\n")
+            zf.writestr(f"__MACOSX/season_stats/._{season}.csv", "junk")
+    return str(path)
+
+
+class TestBundledArchive:
+    """Test cases for BundledArchive"""
+
+    def test_resource_forks_are_skipped(self, season_zip):
+        archive = BundledArchive(season_zip)
+        assert archive.members() == ["season_stats/2022.csv", "season_stats/2023.csv"]
+        assert archive.seasons() == [2022, 2023]
+        assert is_resource_fork("__MACOSX/season_stats/._2023.csv")
+        assert not is_resource_fork("season_stats/2023.csv")
+
+    def test_one_season_query_only_opens_that_member(self, season_zip, monkeypatch):
+        archive = BundledArchive(season_zip)
+        opened = []
+        original_open = archive._zip.open
+        monkeypatch.setattr(archive._zip, "open",
+                            lambda name, *a, **kw: opened.append(name) or original_open(name, *a, **kw))
+
+        df = archive.read_season(2023)
+        archive.read_season(2023)
+
+        assert opened == ["season_stats/2023.csv"]
+        assert df["season"].dtype == "int16"
+        assert df["team"].dtype == "category"
+        assert df["totalYards"].tolist() == [5000, 5100]
+
+    def test_cached_frames_are_not_shared(self, season_zip):
+        archive = BundledArchive(season_zip)
+        first = archive.read_season(2022)
+        first["totalYards"] = 0
+        assert archive.read_season(2022)["totalYards"].tolist() == [5000, 5100]
+
+    def test_missing_season_raises(self, season_zip):
+        with pytest.raises(KeyError):
+            BundledArchive(season_zip).read_season(1999)
+
+    def test_bundled_archives(self):
+        stats = archives.load_season_stats(2023, columns=["season", "team", "totalYards"])
+        assert list(stats.columns) == ["season", "team", "totalYards"]
+        assert (stats["season"] == 2023).all()
+
+        training = archives.load_training_data(seasons=[2024], columns=["home_team", "neutral_site"])
+        assert set(training["season"]) == {2024}
+        assert training["neutral_site"].dtype == bool
+
+
+class TestSchema:
+    """Test cases for the compact dtype schemas"""
+
+    def test_training_data_memory_is_halved(self):
+        with zipfile.ZipFile(archives.MODEL_PACK_ZIP) as zf:
+            with zf.open(archives.TRAINING_DATA_MEMBER) as f:
+                inferred = pd.read_csv(f)
+        compact = BundledArchive(archives.MODEL_PACK_ZIP).read_csv(archives.TRAINING_DATA_MEMBER)
+
+        assert compact.memory_usage(deep=True).sum() <= 0.5 * inferred.memory_usage(deep=True).sum()
+        assert compact["home_adjusted_epa"].dtype == "float32"
+        assert compact["home_team"].dtype == "category"
+        assert compact["home_elo"].dtype == "int16"
+        assert compact["neutral_site"].dtype == bool
+        assert (compact["margin"] == inferred["margin"]).all()
+        assert np.allclose(compact["spread"], inferred["spread"], atol=1e-5)
+
+    def test_every_known_column_is_declared(self):
+        season = BundledArchive(archives.SEASON_STATS_ZIP).read_season(2023)
+        advanced = BundledArchive(archives.ADVANCED_SEASON_STATS_ZIP).read_season(2023)
+        for table, df in (("season_stats", season), ("advanced_season_stats", advanced)):
+            assert set(df.columns) <= set(schema.dtypes_for(table))
+            assert not (df.dtypes == object).any()
+
+    def test_missing_values_use_nullable_dtypes(self):
+        df = pd.DataFrame({"season": [2023, 2023], "homePoints": [21.0, None],
+                           "homeId": [333, None], "neutralSite": [True, None],
+                           "unknown": [1.0, 2.0]})
+        compact = schema.apply_schema(df, "games")
+        assert compact["season"].dtype == "int16"
+        assert compact["homePoints"].dtype == "float32"
+        assert compact["homeId"].dtype == "Int32"
+        assert compact["neutralSite"].dtype == "boolean"
+        assert compact["unknown"].dtype == "float64"
+
+    def test_unknown_table_raises(self):
+        with pytest.raises(KeyError):
+            schema.dtypes_for("not_a_table")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,120 @@
+"""
+Tests for memory-mapped model artifacts
+Run with: python -m pytest test_artifact.py
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import artifact
+from model import CFBModel
+
+
+def _trained_model(model_type='random_forest'):
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame({
+        'talent_diff': rng.normal(0, 50, 300),
+        'yards_diff': rng.normal(0, 80, 300),
+        'points_diff': rng.normal(0, 10, 300),
+    })
+    y = pd.Series((X['talent_diff'] / 50 + rng.normal(0, 1, 300) > 0).astype(int))
+    model = CFBModel(model_type=model_type)
+    model.train(X, y)
+    return model, X, y
+
+
+class TestModelArtifact:
+    """Test cases for artifact save/load"""
+
+    @pytest.mark.parametrize('model_type', ['random_forest', 'gradient_boosting'])
+    def test_round_trip_matches_trained_model(self, tmp_path, model_type):
+        model, X, y = _trained_model(model_type)
+        path = model.save_artifact(str(tmp_path / 'cfb_model'))
+
+        loaded = CFBModel()
+        loaded.load(path)
+        assert loaded.model_type == model_type
+        np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X), atol=1e-9)
+        np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+    def test_manifest_records_features_hash_and_metrics(self, tmp_path):
+        model, X, y = _trained_model()
+        path = model.save_artifact(str(tmp_path / 'cfb_model'))
+
+        with open(os.path.join(path, artifact.MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        assert manifest['feature_names'] == list(X.columns)
+        assert manifest['training_data_hash'] == artifact.data_hash(X, y)
+        assert manifest['metrics']['test_accuracy'] == pytest.approx(model.metrics['test_accuracy'])
+        assert manifest['n_trees'] == 100
+
+    def test_blobs_are_memory_mapped(self, tmp_path):
+        model, X, _ = _trained_model()
+        loaded = artifact.load_artifact(model.save_artifact(str(tmp_path / 'cfb_model')))
+
+        for name in ('feature', 'threshold', 'children', 'value'):
+            array = getattr(loaded.ensemble, name)
+            # A read-only view of the mapped file, not a heap copy
+            assert not array.flags.owndata and not array.flags.writeable
+        assert loaded.verify()
+
+    def test_feature_mismatch_fails_fast(self, tmp_path):
+        model, X, _ = _trained_model()
+        path = model.save_artifact(str(tmp_path / 'cfb_model'))
+
+        with pytest.raises(ValueError, match='points_diff'):
+            artifact.load_artifact(path, feature_names=['talent_diff', 'yards_diff'])
+        with pytest.raises(ValueError, match='home_talent'):
+            CFBModel().load(path, feature_names=list(X.columns) + ['home_talent'])
+
+        loaded = CFBModel()
+        loaded.load(path)
+        with pytest.raises(ValueError, match='Feature mismatch'):
+            loaded.predict_with_confidence(X.drop(columns='yards_diff'))
+
+    def test_resave_replaces_artifact_and_verify_detects_tampering(self, tmp_path):
+        model, X, _ = _trained_model()
+        path = str(tmp_path / 'cfb_model')
+        model.save_artifact(path)
+        model.save_artifact(path)
+        assert sorted(os.listdir(tmp_path)) == ['cfb_model']
+
+        loaded = artifact.load_artifact(path, mmap=False)
+        threshold_path = os.path.join(path, loaded.manifest['arrays']['threshold']['file'])
+        threshold = np.load(threshold_path)
+        threshold[0] += 1
+        np.save(threshold_path, threshold)
+        assert not loaded.verify()
+
+    def test_resave_keeps_the_path_loadable_throughout(self, tmp_path):
+        model, X, y = _trained_model()
+        other, _, _ = _trained_model('gradient_boosting')
+        path = str(tmp_path / 'cfb_model')
+        model.save_artifact(path)
+        first = artifact.read_manifest(path)
+
+        # A reader that read the manifest just before the switch can still load its blobs
+        other.save_artifact(path)
+        for info in first['arrays'].values():
+            assert os.path.exists(os.path.join(path, info['file']))
+        second = artifact.read_manifest(path)
+        assert second['arrays'] != first['arrays']
+
+        # Only the current and previous versions are kept
+        model.save_artifact(path)
+        versions = [entry for entry in os.listdir(path) if entry.startswith(artifact.VERSION_PREFIX)]
+        assert len(versions) == 2 and sorted(os.listdir(path)) == sorted(versions + [artifact.MANIFEST_NAME])
+        np.testing.assert_allclose(artifact.load_artifact(path).ensemble.predict_proba(X),
+                                   model.predict_proba(X))
+
+    def test_missing_artifact_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            artifact.load_artifact(str(tmp_path / 'missing'))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+"""
+Tests for the walk-forward backtesting engine
+Run with: python -m pytest test_backtest.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+
+
+def _games(seasons=(2021, 2022, 2023), weeks=6, per_week=30, seed=0):
+    rng = np.random.RandomState(seed)
+    rows = []
+    for season in seasons:
+        for week in range(1, weeks + 1):
+            for _ in range(per_week):
+                edge = rng.normal(0, 1)
+                rows.append({'season': season, 'week': week, 'season_type': 'regular',
+                             'elo_diff': edge, 'noise': rng.normal(),
+                             'home_win': int(edge + rng.normal(0, 0.7) > 0)})
+        # One bowl game, which the API numbers as week 1 of the postseason
+        rows.append({'season': season, 'week': 1, 'season_type': 'postseason',
+                     'elo_diff': 0.5, 'noise': 0.0, 'home_win': 1})
+    # Shuffled so the engine has to order the games itself
+    return pd.DataFrame(rows).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+class TestWalkForward:
+    """Test cases for walk-forward folds"""
+
+    def test_training_rows_always_precede_the_scored_week(self):
+        df = backtest.sort_chronologically(_games())
+        folds = backtest.walk_forward_folds(df, [2022, 2023], min_train_games=0)
+
+        assert len(folds) == 2 * 7
+        for fold in folds:
+            train = df.iloc[:fold['train_stop']]
+            test = df.iloc[fold['test_start']:fold['test_stop']]
+            assert test['season'].nunique() == 1 and test['week'].nunique() == 1
+            assert test['season_type'].nunique() == 1
+            assert ((train['season'] < fold['season'])
+                    | (backtest.game_rounds(train) < fold['round'])).all()
+        # The bowl game is scored after the last regular-season week
+        last = [f for f in folds if f['season'] == 2023][-1]
+        assert df.iloc[last['test_start']]['season_type'] == 'postseason'
+
+    def test_min_train_games_skips_early_weeks(self):
+        df = backtest.sort_chronologically(_games())
+        folds = backtest.walk_forward_folds(df, [2021], min_train_games=60)
+        assert [f['week'] for f in folds] == [3, 4, 5, 6, 1]
+
+
+class TestBacktest:
+    """Test cases for backtest() and summarize()"""
+
+    def test_per_week_metrics(self, tmp_path):
+        df = _games()
+        results = backtest.backtest(df, ['elo_diff', 'noise'], df['home_win'], [2022, 2023],
+                                    max_workers=1, min_train_games=50, cache_dir=str(tmp_path))
+
+        assert list(results.columns) == ['season', 'week', 'n_train', 'n_games',
+                                         'accuracy', 'log_loss', 'brier']
+        assert len(results) == 14
+        assert results['n_games'].sum() == 2 * (6 * 30 + 1)
+        assert results['n_train'].is_monotonic_increasing
+        assert results['accuracy'].mean() > 0.6
+        assert ((results['brier'] >= 0) & (results['brier'] <= 1)).all()
+
+        summary = backtest.summarize(results)
+        assert summary.loc['all', 'games'] == results['n_games'].sum()
+        expected = (results['accuracy'] * results['n_games']).sum() / results['n_games'].sum()
+        assert summary.loc['all', 'accuracy'] == pytest.approx(expected)
+
+    def test_process_pool_matches_in_process_run(self, tmp_path):
+        df = _games(seasons=(2022, 2023), weeks=4)
+        kwargs = dict(seasons=[2023], min_train_games=50, cache_dir=str(tmp_path))
+        serial = backtest.backtest(df, ['elo_diff', 'noise'], df['home_win'], max_workers=1, **kwargs)
+        pooled = backtest.backtest(df, ['elo_diff', 'noise'], df['home_win'], max_workers=2, **kwargs)
+        pd.testing.assert_frame_equal(serial, pooled)
+
+    def test_feature_matrix_is_cached(self, tmp_path):
+        df = backtest.sort_chronologically(_games(seasons=(2023,), weeks=2))
+        X, y = df[['elo_diff', 'noise']], df['home_win']
+        x_path, y_path = backtest.cache_feature_matrix(X, y, str(tmp_path))
+        mtime = os.path.getmtime(x_path)
+
+        assert backtest.cache_feature_matrix(X, y, str(tmp_path)) == (x_path, y_path)
+        assert os.path.getmtime(x_path) == mtime
+        assert np.load(x_path).dtype == np.float32
+        assert backtest.cache_feature_matrix(X * 2, y, str(tmp_path))[0] != x_path
+
+    def test_model_pack_features_exclude_outcomes(self):
+        df, feature_cols, target = backtest.load_model_pack(seasons=[2024])
+        assert 'margin' not in feature_cols and 'home_points' not in feature_cols
+        assert 'home_elo' in feature_cols and 'spread' in feature_cols
+        assert (target == (df['home_points'] > df['away_points'])).all()
+        assert target.mean() > 0.5  # home teams win more often
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
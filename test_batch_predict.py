@@ -0,0 +1,140 @@
+"""
+Tests for the multi-season batch prediction runner
+Run with: python -m pytest test_batch_predict.py
+"""
+
+import json
+import os
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_predict import batch_predict, partition_dir, prediction_records
+from model import CFBModel
+from preprocessor import CFBPreprocessor
+from weeks import get_current_week, parse_range
+
+
+class FakeFetcher:
+    """Serves synthetic seasons and counts API calls"""
+
+    def __init__(self, seasons, n_teams=12, weeks=4, seed=0):
+        rng = np.random.RandomState(seed)
+        self.teams = [f"Team {i:02d}" for i in range(n_teams)]
+        self.calls = Counter()
+        self.games, self.stats = {}, {}
+        for season in seasons:
+            rows = []
+            for week in range(1, weeks + 1):
+                order = rng.permutation(self.teams)
+                rows += [{'season': season, 'week': week, 'homeTeam': home, 'awayTeam': away,
+                          'startDate': f"{season}-09-{week:02d}"}
+                         for home, away in zip(order[::2], order[1::2])]
+            self.games[season] = pd.DataFrame(rows)
+            self.stats[season] = pd.DataFrame({
+                'team': self.teams,
+                'totalYards': rng.randint(3000, 6000, n_teams),
+                'netPassingYards': rng.randint(1500, 3500, n_teams),
+                'rushingYards': rng.randint(1000, 2500, n_teams),
+            })
+
+    def get_games(self, year, week=None, season_type="regular"):
+        self.calls['games'] += 1
+        games = self.games[year]
+        return games if week is None else games[games['week'] == week].reset_index(drop=True)
+
+    def get_team_stats(self, year):
+        self.calls['team_stats'] += 1
+        return self.stats[year]
+
+    def get_team_talent(self, year):
+        self.calls['talent'] += 1
+        raise RuntimeError("talent not available")
+
+
+@pytest.fixture
+def fetcher():
+    return FakeFetcher([2023, 2024])
+
+
+@pytest.fixture
+def model_path(fetcher, tmp_path):
+    rng = np.random.RandomState(1)
+    preprocessor = CFBPreprocessor()
+    games = pd.DataFrame({'homeTeam': rng.choice(fetcher.teams, 300), 'awayTeam': rng.choice(fetcher.teams, 300)})
+    features = preprocessor.prepare_game_features(games, fetcher.stats[2023])
+    margin = features['yards_diff'] / 300 + rng.normal(0, 5, len(games))
+    features['homePoints'] = 28 + margin.clip(lower=0)
+    features['awayPoints'] = 28 - margin.clip(upper=0)
+    model = CFBModel(model_type='random_forest')
+    model.train(*preprocessor.create_training_data(features), cv=3, n_jobs=1)
+    return model.save_artifact(str(tmp_path / 'cfb_model'))
+
+
+def _single_week(fetcher, model_path, season, week):
+    """What run_predictions_with_outputs.py produces for one week"""
+    model = CFBModel()
+    model.load(model_path)
+    preprocessor = CFBPreprocessor()
+    games = fetcher.get_games(season, week=week)
+    features = preprocessor.prepare_game_features(games, fetcher.get_team_stats(season))
+    X, _ = preprocessor.create_training_data(features)
+    return prediction_records(games, *model.predict_with_confidence(X))
+
+
+class TestBatchPredict:
+    """Test cases for batch predictions"""
+
+    @pytest.mark.parametrize('max_workers', [1, 2])
+    def test_partitions_match_single_week_runs(self, fetcher, model_path, tmp_path, max_workers):
+        output_dir = str(tmp_path / 'predictions')
+        results = batch_predict(fetcher, model_path, [2023, 2024], weeks=[1, 2, 4],
+                                output_dir=output_dir, max_workers=max_workers)
+
+        assert list(zip(results['season'], results['week'])) == [(s, w) for s in (2023, 2024) for w in (1, 2, 4)]
+        assert (results['games'] == 6).all()
+        # One fetch of each input per season, not per week
+        assert fetcher.calls == {'games': 2, 'team_stats': 2, 'talent': 2}
+
+        directory = partition_dir(output_dir, 2024, 2)
+        with open(os.path.join(directory, 'predictions.json')) as f:
+            output = json.load(f)
+        assert output['metadata']['year'] == 2024 and output['metadata']['week'] == 2
+        assert output['predictions'] == _single_week(fetcher, model_path, 2024, 2)
+        csv = pd.read_csv(os.path.join(directory, 'predictions.csv'))
+        assert list(csv['home_team']) == [p['home_team'] for p in output['predictions']]
+
+    def test_all_weeks_by_default(self, fetcher, model_path, tmp_path):
+        results = batch_predict(fetcher, model_path, [2024], output_dir=str(tmp_path), max_workers=1)
+        assert list(results['week']) == [1, 2, 3, 4]
+        assert not batch_predict(fetcher, model_path, [2024], weeks=[9], output_dir=str(tmp_path)).size
+
+    def test_missing_model(self, fetcher, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            batch_predict(fetcher, str(tmp_path / 'missing.pkl'), [2024])
+
+
+class TestWeeks:
+    """Test cases for the shared season calendar helpers"""
+
+    def test_parse_range(self):
+        assert parse_range("2024") == [2024]
+        assert parse_range("2022-2024") == [2022, 2023, 2024]
+        assert parse_range("1-3, 8,2") == [1, 2, 3, 8]
+        for bad in ("", "5-1", "a-b"):
+            with pytest.raises(ValueError):
+                parse_range(bad)
+
+    def test_get_current_week_is_shared(self):
+        from run_weekly_predictions import get_current_week as weekly
+        assert weekly is get_current_week
+        year = datetime.now().year
+        assert get_current_week(year, start_date=datetime.now()) == 1
+        assert get_current_week(year - 1) == 15
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
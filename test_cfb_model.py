@@ -8,6 +8,8 @@ import pandas as pd
 import numpy as np
 from model import CFBModel
 from preprocessor import CFBPreprocessor
+from rolling_features import (ROLLING_FEATURE_COLUMNS, ROLLING_METRICS, TeamAccumulators,
+                              load_state, state_path, verify_state)
 
 
 class TestCFBModel:
@@ -36,7 +38,7 @@ class TestCFBModel:
         y = pd.Series(np.random.randint(0, 2, 100))
         
         model = CFBModel()
-        metrics = model.train(X, y, test_size=0.3)
+        metrics = model.train(X, y)
         
         assert 'train_accuracy' in metrics
         assert 'test_accuracy' in metrics
@@ -91,6 +93,376 @@ class TestCFBModel:
         assert probabilities.shape == (len(X), 2)
         assert all(0 <= p <= 1 for row in probabilities for p in row)
 
+    @pytest.mark.parametrize('model_type', ['random_forest', 'gradient_boosting'])
+    def test_predict_with_confidence_matches_separate_calls(self, model_type):
+        """Test single-pass prediction agrees with predict and predict_proba"""
+        rng = np.random.RandomState(1)
+        X = pd.DataFrame({
+            'home_off_total_yards': rng.randint(200, 500, 80),
+            'away_off_total_yards': rng.randint(200, 500, 80),
+        })
+        y = pd.Series(rng.randint(0, 2, 80))
+
+        model = CFBModel(model_type=model_type)
+        model.train(X, y)
+
+        calls = []
+        predict_proba = model.model.predict_proba
+        model.model.predict_proba = lambda X: calls.append(1) or predict_proba(X)
+        predictions, probabilities, confidence = model.predict_with_confidence(X)
+        del model.model.predict_proba
+
+        assert len(calls) == 1
+        np.testing.assert_array_equal(predictions, model.predict(X))
+        np.testing.assert_array_equal(probabilities, model.predict_proba(X))
+        np.testing.assert_array_equal(confidence, probabilities.max(axis=1))
+
+
+class TestParallelTraining:
+    """Single-batch training must reproduce the serial fit + cross_val_score path"""
+    
+    def _data(self):
+        rng = np.random.RandomState(7)
+        X = pd.DataFrame({
+            'home_off_total_yards': rng.randint(200, 500, 200),
+            'away_off_total_yards': rng.randint(200, 500, 200),
+            'talent_diff': rng.normal(0, 50, 200),
+        })
+        y = pd.Series((X['talent_diff'] + rng.normal(0, 40, 200) > 0).astype(int))
+        return X, y
+    
+    @pytest.mark.parametrize('model_type', ['random_forest', 'gradient_boosting'])
+    def test_metrics_match_serial_evaluation(self, model_type):
+        from sklearn.base import clone
+        from sklearn.model_selection import cross_val_predict, cross_val_score
+        
+        X, y = self._data()
+        model = CFBModel(model_type=model_type)
+        reference = clone(model.model)
+        metrics = model.train(X, y, n_jobs=2)
+        
+        # Holdout metrics come from the single CV pass
+        oof_pred = cross_val_predict(clone(reference), X, y, cv=5)
+        assert metrics['test_accuracy'] == pytest.approx((oof_pred == y).mean())
+        np.testing.assert_allclose(metrics['cv_scores'], cross_val_score(clone(reference), X, y, cv=5))
+        # and the trained model is one fit on all the data
+        reference.fit(X, y)
+        assert metrics['train_accuracy'] == reference.score(X, y)
+        np.testing.assert_allclose(model.predict_proba(X), reference.predict_proba(X))
+    
+    def test_fits_each_fold_and_the_final_model_once(self, monkeypatch):
+        import model as model_module
+        
+        calls = []
+        fit_and_predict = model_module._fit_and_predict
+        
+        def counting(estimator, X, y, train, test):
+            calls.append((len(train), estimator.get_params().get('n_jobs')))
+            return fit_and_predict(estimator, X, y, train, test)
+        monkeypatch.setattr(model_module, '_fit_and_predict', counting)
+        monkeypatch.setattr(model_module.os, 'cpu_count', lambda: 4)
+        
+        X, y = self._data()
+        model = CFBModel(n_jobs=-1)
+        model.train(X, y, cv=5, n_jobs=2)
+        assert sorted(size for size, _ in calls) == [160] * 5 + [200]
+        # Two parallel fits share the four cores, then predictions use them all again
+        assert {jobs for _, jobs in calls} == {2}
+        assert model.model.n_jobs == -1
+    
+    def test_out_of_fold_predictions_and_fold_models(self):
+        X, y = self._data()
+        model = CFBModel(n_jobs=2)
+        metrics = model.train(X, y, cv=4)
+        
+        assert len(model.fold_models) == 4
+        assert model.oof_proba.shape == (len(X), 2)
+        np.testing.assert_allclose(model.oof_proba.sum(axis=1), 1.0)
+        oof_accuracy = ((model.oof_proba[:, 1] > 0.5).astype(int) == y).mean()
+        assert metrics['oof_accuracy'] == pytest.approx(oof_accuracy)
+        assert model.model.n_jobs == 2
+
+
+class TestIncrementalRefresh:
+    """Warm-start refresh of a trained model with new weeks' games"""
+    
+    def _data(self, n, seed, flip=False):
+        rng = np.random.RandomState(seed)
+        X = pd.DataFrame({
+            'talent_diff': rng.normal(0, 50, n),
+            'yards_diff': rng.normal(0, 80, n),
+        })
+        signal = X['talent_diff'] + rng.normal(0, 20, n) > 0
+        y = pd.Series((~signal if flip else signal).astype(int))
+        return X, y
+    
+    def _trained(self, model_type):
+        X, y = self._data(300, 0)
+        model = CFBModel(model_type=model_type)
+        model.train(X, y, cv=3)
+        return model, X, y
+    
+    def test_random_forest_grows_trees_on_new_games(self):
+        model, X, y = self._trained('random_forest')
+        old_trees = list(model.model.estimators_)
+        X_new, y_new = self._data(60, 1)
+        
+        result = model.refresh(X_new, y_new, n_new_estimators=15)
+        
+        assert result['mode'] == 'incremental' and not result['drift']
+        assert len(model.model.estimators_) == 115
+        assert model.model.estimators_[:100] == old_trees
+        assert model.model.warm_start is False
+        assert model.predict_proba(X_new).shape == (60, 2)
+    
+    def test_gradient_boosting_continues_existing_stages(self):
+        model, X, y = self._trained('gradient_boosting')
+        before = model.model.decision_function(X)
+        X_new, y_new = self._data(60, 1)
+        
+        model.refresh(X_new, y_new, n_new_estimators=10)
+        
+        assert model.model.estimators_.shape[0] == 110
+        stage_100 = list(model.model.staged_decision_function(X))[99].ravel()
+        np.testing.assert_allclose(stage_100, before)
+    
+    def test_logistic_regression_partial_fit(self):
+        model, X, y = self._trained('logistic_regression')
+        coef = model.model[-1].coef_.copy()
+        X_new, y_new = self._data(60, 1)
+        
+        result = model.refresh(X_new, y_new)
+        
+        assert result['mode'] == 'incremental'
+        assert not np.allclose(coef, model.model[-1].coef_)
+        assert set(model.metrics['feature_importance']) == {'talent_diff', 'yards_diff'}
+    
+    def test_full_policy_and_drift_retrain_on_history(self):
+        model, X, y = self._trained('random_forest')
+        X_new, y_new = self._data(60, 1)
+        result = model.refresh(X_new, y_new, X, y, policy='full')
+        assert result['mode'] == 'full' and len(model.fold_models) == 5
+        
+        # Outcomes that no longer follow the features trip the drift check
+        model, X, y = self._trained('random_forest')
+        X_flip, y_flip = self._data(60, 2, flip=True)
+        result = model.refresh(X_flip, y_flip, X, y)
+        assert result['drift'] and result['mode'] == 'full'
+        assert result['new_accuracy'] < model.metrics['test_accuracy']
+    
+    def test_retrain_needs_history_and_valid_policy(self):
+        model, X, y = self._trained('random_forest')
+        X_flip, y_flip = self._data(60, 2, flip=True)
+        with pytest.raises(ValueError):
+            model.refresh(X_flip, y_flip)
+        with pytest.raises(ValueError):
+            model.refresh(X, y, policy='sometimes')
+        
+        # A week with a single outcome can't seed new trees
+        X_new, y_new = self._data(60, 1)
+        one_sided = y_new == 1
+        assert model.missing_outcomes(y_new[one_sided]) and not model.missing_outcomes(y_new)
+        result = model.refresh(X_new[one_sided], y_new[one_sided], X, y)
+        assert result['mode'] == 'full'
+    
+    @pytest.mark.parametrize('model_type', ['random_forest', 'hist_gradient_boosting'])
+    def test_full_retrain_starts_from_configured_estimator(self, model_type):
+        model, X, y = self._trained(model_type)
+        configured = CFBModel(model_type).model.get_params()
+        for seed in (1, 2, 3):
+            X_new, y_new = self._data(60, seed)
+            assert model.refresh(X_new, y_new, n_new_estimators=20, drift_tolerance=1.0)['mode'] == 'incremental'
+        assert model.model.get_params() != configured
+        
+        result = model.refresh(*self._data(60, 4), X, y, policy='full')
+        assert result['mode'] == 'full'
+        assert model.model.get_params() == configured
+    
+    def test_incremental_refresh_changes_data_hash(self):
+        model, X, y = self._trained('random_forest')
+        trained_hash = model.data_hash
+        X_new, y_new = self._data(60, 1)
+        model.refresh(X_new, y_new)
+        refreshed_hash = model.data_hash
+        assert refreshed_hash != trained_hash
+        
+        # Same updates from the same model give the same hash
+        other, _, _ = self._trained('random_forest')
+        other.refresh(X_new, y_new)
+        assert other.data_hash == refreshed_hash
+
+
+class TestHistGradientBoosting:
+    """Histogram boosting backend with native categorical features"""
+    
+    def _features(self, n=600, seed=0):
+        rng = np.random.RandomState(seed)
+        conferences = np.array(['SEC', 'Big Ten', 'ACC', 'Big 12', 'Pac-12', 'MAC'])
+        home_conf = rng.choice(conferences, n)
+        features = pd.DataFrame({
+            'homeTeam': ['Team %d' % i for i in range(n)],
+            'awayTeam': ['Team %d' % (i + n) for i in range(n)],
+            'homeConference': home_conf,
+            'away_conference': rng.choice(conferences, n),
+            'week': rng.randint(1, 15, n),
+            'talent_diff': rng.normal(0, 50, n),
+            'yards_diff': rng.normal(0, 80, n),
+        })
+        strength = np.where(np.isin(home_conf, ['SEC', 'Big Ten']), 40, -10)
+        margin = features['talent_diff'] / 5 + strength / 5 + rng.normal(0, 8, n)
+        features['homePoints'] = 28 + margin.clip(lower=0)
+        features['awayPoints'] = 28 - margin.clip(upper=0)
+        return features
+    
+    def test_categorical_training_data(self):
+        preprocessor = CFBPreprocessor()
+        X, y = preprocessor.create_training_data(self._features(), categorical=True)
+        for col in ('home_conference', 'away_conference', 'week'):
+            assert isinstance(X[col].dtype, pd.CategoricalDtype)
+        X_plain, _ = preprocessor.create_training_data(self._features())
+        assert 'home_conference' not in X_plain.columns
+    
+    def test_trains_with_native_categories_and_early_stopping(self):
+        X, y = CFBPreprocessor().create_training_data(self._features(), categorical=True)
+        model = CFBModel(model_type='hist_gradient_boosting')
+        metrics = model.train(X, y, cv=3)
+        
+        categorical = dict(zip(X.columns, model.model.is_categorical_))
+        assert categorical['home_conference'] and categorical['week']
+        assert not categorical['talent_diff']
+        assert model.model.n_iter_ < model.model.max_iter
+        assert metrics['test_accuracy'] > 0.6
+        predictions, probabilities, _ = model.predict_with_confidence(X.iloc[:10])
+        assert probabilities.shape == (10, 2)
+    
+    def test_pickled_model_type_is_restored(self, tmp_path):
+        X, y = CFBPreprocessor().create_training_data(self._features(), categorical=True)
+        model = CFBModel(model_type='hist_gradient_boosting')
+        model.train(X, y, cv=3)
+        model.save(str(tmp_path / 'model.pkl'))
+        
+        loaded = CFBModel()
+        loaded.load(str(tmp_path / 'model.pkl'))
+        assert loaded.model_type == 'hist_gradient_boosting' and loaded.categorical_features
+        np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+    
+    def test_incremental_refresh_adds_iterations(self):
+        preprocessor = CFBPreprocessor()
+        X, y = preprocessor.create_training_data(self._features())
+        model = CFBModel(model_type='hist_gradient_boosting')
+        model.train(X, y, cv=3)
+        n_iter = model.model.n_iter_
+        assert model.incremental_refresh
+        
+        X_new, y_new = preprocessor.create_training_data(self._features(200, seed=1))
+        result = model.refresh(X_new, y_new, n_new_estimators=5)
+        assert result['mode'] == 'incremental'
+        assert n_iter < model.model.n_iter_ <= n_iter + 5
+    
+    def _conference_games(self, n, seed, home_conferences=None, week=None):
+        """Games decided by the two conferences' strength"""
+        rng = np.random.RandomState(seed)
+        strength = {'SEC': 20, 'Big Ten': 10, 'ACC': 0, 'Big 12': -10, 'Pac-12': -20}
+        home_conf = rng.choice(home_conferences or list(strength), n)
+        away_conf = rng.choice(list(strength), n)
+        features = pd.DataFrame({
+            'homeTeam': ['Team %d' % i for i in range(n)],
+            'awayTeam': ['Team %d' % (i + n) for i in range(n)],
+            'homeConference': home_conf,
+            'away_conference': away_conf,
+            'week': week if week is not None else rng.randint(1, 15, n),
+            'talent_diff': rng.normal(0, 50, n),
+            'yards_diff': rng.normal(0, 80, n),
+        })
+        margin = np.array([strength[h] - strength[a] for h, a in zip(home_conf, away_conf)])
+        margin = margin + rng.normal(0, 6, n)
+        features['homePoints'] = 28 + margin.clip(min=0)
+        features['awayPoints'] = 28 - margin.clip(max=0)
+        return features
+    
+    def test_categorical_refresh_on_one_conference_keeps_accuracy(self):
+        preprocessor = CFBPreprocessor()
+        X, y = preprocessor.create_training_data(self._conference_games(600, 0), categorical=True)
+        X_holdout, y_holdout = preprocessor.create_training_data(self._conference_games(400, 2),
+                                                                 categorical=True)
+        model = CFBModel(model_type='hist_gradient_boosting')
+        model.train(X, y, cv=3)
+        before = (model.predict(X_holdout) == y_holdout).mean()
+        assert not model.incremental_refresh
+        
+        # One week of one conference's home games: a warm start would rebuild
+        # the category encoding from just these rows
+        X_new, y_new = preprocessor.create_training_data(
+            self._conference_games(80, 1, home_conferences=['SEC'], week=6), categorical=True)
+        with pytest.raises(ValueError, match='full retrain'):
+            model.refresh(X_new, y_new, drift_tolerance=1.0)
+        result = model.refresh(X_new, y_new, X, y, drift_tolerance=1.0)
+        
+        assert result['mode'] == 'full'
+        assert (model.predict(X_holdout) == y_holdout).mean() >= before - 0.02
+    
+    
+class TestStackedEnsemble:
+    """Stacked ensemble backend with parallel out-of-fold base fits"""
+
+    def _data(self, n=400, seed=0):
+        rng = np.random.RandomState(seed)
+        X = pd.DataFrame({
+            'talent_diff': rng.normal(0, 50, n),
+            'yards_diff': rng.normal(0, 80, n),
+            'ppa_diff': rng.normal(0, 0.2, n),
+        })
+        y = pd.Series((X['talent_diff'] / 50 + X['ppa_diff'] * 5 + rng.normal(0, 1, n) > 0).astype(int))
+        return X, y
+
+    def _model(self, tmp_path, **params):
+        return CFBModel(model_type='stacked_ensemble',
+                        params=dict({'cv': 3, 'cache_dir': str(tmp_path / 'oof')}, **params))
+
+    def test_fold_models_are_averaged_at_prediction_time(self, tmp_path):
+        X, y = self._data()
+        model = self._model(tmp_path)
+        metrics = model.train(X, y, cv=3, n_jobs=1)
+
+        ensemble = model.model
+        assert [len(models) for models in ensemble.fold_models_] == [3, 3, 3]
+        assert ensemble.oof_.shape == (len(X), 3)
+        base = ensemble.base_proba(X.iloc[:20])
+        expected = np.mean([m.predict_proba(X.iloc[:20]) for m in ensemble.fold_models_[1]], axis=0)
+        np.testing.assert_allclose(base[1], expected)
+        np.testing.assert_allclose(model.predict_proba(X.iloc[:20]),
+                                   ensemble.meta_.predict_proba(np.column_stack([p[:, 1] for p in base])))
+        assert metrics['test_accuracy'] > 0.6
+
+    def test_meta_learner_refit_reuses_cached_base_predictions(self, tmp_path, monkeypatch):
+        X, y = self._data()
+        ensemble = self._model(tmp_path).model.fit(X, y)
+        oof = ensemble.oof_.copy()
+
+        def no_refit(*args):
+            raise AssertionError("base models were refitted")
+        monkeypatch.setattr(type(ensemble), '_fit_bases', no_refit)
+        refit = self._model(tmp_path, meta_C=0.01).model.fit(X, y)
+        np.testing.assert_array_equal(refit.oof_, oof)
+        assert not np.allclose(refit.meta_.coef_, ensemble.meta_.coef_)
+        with pytest.raises(AssertionError, match='refitted'):
+            self._model(tmp_path).model.fit(X.iloc[:300], y.iloc[:300])
+
+    def test_pickle_round_trip_and_full_refresh(self, tmp_path):
+        X, y = self._data()
+        model = self._model(tmp_path)
+        model.train(X, y, cv=3, n_jobs=1)
+        model.save(str(tmp_path / 'model.pkl'))
+
+        loaded = CFBModel()
+        loaded.load(str(tmp_path / 'model.pkl'))
+        assert loaded.model_type == 'stacked_ensemble'
+        np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+        X_new, y_new = self._data(100, seed=1)
+        result = model.refresh(X_new, y_new, X_history=X, y_history=y)
+        assert result['mode'] == 'full'
+
 
 class TestCFBPreprocessor:
     """Test cases for CFB Preprocessor"""
@@ -119,5 +491,277 @@ class TestCFBPreprocessor:
             preprocessor.prepare_game_features(games_df, stats_df)
 
 
+def _reference_game_features(games_df, team_stats_df, talent_df=None):
+    """Row-wise feature builder the vectorized preprocessor replaced"""
+    features = games_df.copy()
+    stats_dict = {}
+    if 'statName' in team_stats_df.columns and 'statValue' in team_stats_df.columns:
+        for team_name in team_stats_df['team'].unique():
+            team_data = team_stats_df[team_stats_df['team'] == team_name]
+            stats_dict[team_name] = dict(zip(team_data['statName'], team_data['statValue']))
+    else:
+        for _, row in team_stats_df.iterrows():
+            team = row.get('team', row.get('school', ''))
+            if team:
+                stats_dict[team] = row.to_dict()
+    
+    talent_dict = {}
+    if talent_df is not None and not talent_df.empty:
+        for _, row in talent_df.iterrows():
+            team = row.get('school', '')
+            if team:
+                talent_dict[team] = row.get('talent', 0)
+    
+    rows = []
+    for _, game in features.iterrows():
+        home_team = game.get('homeTeam', game.get('home_team', ''))
+        away_team = game.get('awayTeam', game.get('away_team', ''))
+        home_stats = stats_dict.get(home_team, {})
+        away_stats = stats_dict.get(away_team, {})
+        rows.append({
+            'home_off_total_yards': home_stats.get('totalYards', 0),
+            'home_off_passing_yards': home_stats.get('netPassingYards', 0),
+            'home_off_rushing_yards': home_stats.get('rushingYards', 0),
+            'home_off_points': home_stats.get('points', 0),
+            'home_talent': talent_dict.get(home_team, 0),
+            'away_off_total_yards': away_stats.get('totalYards', 0),
+            'away_off_passing_yards': away_stats.get('netPassingYards', 0),
+            'away_off_rushing_yards': away_stats.get('rushingYards', 0),
+            'away_off_points': away_stats.get('points', 0),
+            'away_talent': talent_dict.get(away_team, 0),
+        })
+    for key in rows[0].keys():
+        features[key] = [r[key] for r in rows]
+    
+    features['talent_diff'] = features['home_talent'] - features['away_talent']
+    features['yards_diff'] = features['home_off_total_yards'] - features['away_off_total_yards']
+    features['points_diff'] = features['home_off_points'] - features['away_off_points']
+    return features
+
+
+class TestVectorizedFeatures:
+    """Vectorized feature engine must match the original row-wise output"""
+    
+    teams = ['Team %d' % i for i in range(12)]
+    
+    def _games(self, camel_case=True):
+        rng = np.random.RandomState(0)
+        home = rng.choice(self.teams + ['Unknown FCS'], 40)
+        away = rng.choice(self.teams, 40)
+        if camel_case:
+            return pd.DataFrame({'homeTeam': home, 'awayTeam': away,
+                                 'homePoints': rng.randint(0, 50, 40),
+                                 'awayPoints': rng.randint(0, 50, 40)})
+        return pd.DataFrame({'home_team': home, 'away_team': away,
+                             'home_points': rng.randint(0, 50, 40),
+                             'away_points': rng.randint(0, 50, 40)})
+    
+    def _long_stats(self):
+        rng = np.random.RandomState(1)
+        rows = []
+        # Last team has no stats at all; one team is missing rushingYards
+        for team in self.teams[:-1]:
+            for stat in ['totalYards', 'netPassingYards', 'rushingYards', 'firstDowns']:
+                if team == self.teams[0] and stat == 'rushingYards':
+                    continue
+                rows.append({'team': team, 'statName': stat, 'statValue': rng.randint(100, 5000)})
+        return pd.DataFrame(rows)
+    
+    def _talent(self):
+        return pd.DataFrame({'school': self.teams[2:], 'talent': np.linspace(500, 900, 10)})
+    
+    @pytest.mark.parametrize('camel_case', [True, False])
+    def test_long_format_matches_reference(self, camel_case):
+        games, stats, talent = self._games(camel_case), self._long_stats(), self._talent()
+        expected = _reference_game_features(games, stats, talent)
+        actual = CFBPreprocessor().prepare_game_features(games, stats, talent)
+        assert list(actual.columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    
+    def test_wide_format_without_talent_matches_reference(self):
+        games = self._games(camel_case=False)
+        wide = self._long_stats().pivot(index='team', columns='statName', values='statValue')
+        wide = wide.reset_index().rename(columns={'team': 'school'})
+        expected = _reference_game_features(games, wide)
+        actual = CFBPreprocessor().prepare_game_features(games, wide)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def _reference_rolling_features(games, game_stats, advanced):
+    """Recompute each game's features from scratch using only earlier weeks"""
+    long_rows = []
+    for _, g in games.iterrows():
+        for team, opp, pf, pa in ((g['homeTeam'], g['awayTeam'], g['homePoints'], g['awayPoints']),
+                                  (g['awayTeam'], g['homeTeam'], g['awayPoints'], g['homePoints'])):
+            if pd.isna(pf) or pd.isna(pa):
+                continue
+            own = game_stats[(game_stats['game_id'] == g['id']) & (game_stats['team'] == team)]
+            other = game_stats[(game_stats['game_id'] == g['id']) & (game_stats['team'] == opp)]
+            adv = advanced[(advanced['gameId'] == g['id']) & (advanced['team'] == team)]
+            long_rows.append({
+                'season': g['season'], 'week': g['week'], 'team': team,
+                'points_for': pf, 'points_against': pa,
+                'total_yards': own['totalYards'].iloc[0] if len(own) else np.nan,
+                'passing_yards': own['netPassingYards'].iloc[0] if len(own) else np.nan,
+                'rushing_yards': own['rushingYards'].iloc[0] if len(own) else np.nan,
+                'yards_allowed': other['totalYards'].iloc[0] if len(other) else np.nan,
+                'off_ppa': adv['offense_ppa'].iloc[0] if len(adv) else np.nan,
+                'off_success_rate': adv['offense_successRate'].iloc[0] if len(adv) else np.nan,
+                'def_ppa': adv['defense_ppa'].iloc[0] if len(adv) else np.nan,
+                'def_success_rate': adv['defense_successRate'].iloc[0] if len(adv) else np.nan,
+            })
+    played = pd.DataFrame(long_rows)
+    
+    expected = []
+    for _, g in games.iterrows():
+        row = []
+        for team in (g['homeTeam'], g['awayTeam']):
+            prior = played[(played['season'] == g['season']) & (played['week'] < g['week'])
+                           & (played['team'] == team)]
+            row.append(len(prior))
+            row.extend(prior[m].mean() for m in ROLLING_METRICS)
+        expected.append(row)
+    return np.array(expected, dtype=float)
+
+
+class TestRollingFeatures:
+    """Point-in-time features must only use games from earlier weeks"""
+    
+    teams = ['Team %d' % i for i in range(8)]
+    
+    @staticmethod
+    def _rolling_columns(features):
+        return [c for c in features.columns if c.startswith(('home_avg', 'away_avg', 'avg_'))]
+    
+    def _season_data(self):
+        rng = np.random.RandomState(2)
+        games, stats, advanced = [], [], []
+        game_id = 1
+        for season in (2022, 2023):
+            for week in range(1, 7):
+                order = rng.permutation(self.teams)
+                for home, away in zip(order[::2], order[1::2]):
+                    unplayed = season == 2023 and week == 6
+                    games.append({'id': game_id, 'season': season, 'week': week,
+                                  'homeTeam': home, 'awayTeam': away,
+                                  'homePoints': np.nan if unplayed else rng.randint(0, 50),
+                                  'awayPoints': np.nan if unplayed else rng.randint(0, 50)})
+                    for team in (home, away):
+                        # Leave a few box scores missing to exercise per-metric counts
+                        if rng.rand() > 0.1:
+                            stats.append({'game_id': game_id, 'team': team,
+                                          'totalYards': rng.randint(200, 600),
+                                          'netPassingYards': rng.randint(100, 400),
+                                          'rushingYards': rng.randint(50, 300)})
+                        advanced.append({'gameId': game_id, 'team': team,
+                                         'offense_ppa': rng.normal(0.2, 0.1),
+                                         'offense_successRate': rng.uniform(0.3, 0.5),
+                                         'defense_ppa': rng.normal(0.2, 0.1),
+                                         'defense_successRate': rng.uniform(0.3, 0.5)})
+                    game_id += 1
+        return pd.DataFrame(games), pd.DataFrame(stats), pd.DataFrame(advanced)
+    
+    def test_matches_per_game_recomputation(self):
+        games, stats, advanced = self._season_data()
+        # Shuffle so the engine has to establish chronological order itself
+        games = games.sample(frac=1, random_state=0).reset_index(drop=True)
+        
+        features = CFBPreprocessor().prepare_rolling_features(games, stats, advanced)
+        columns = ([f'home_{c}' for c in ROLLING_FEATURE_COLUMNS]
+                   + [f'away_{c}' for c in ROLLING_FEATURE_COLUMNS])
+        np.testing.assert_allclose(features[columns].to_numpy(dtype=float),
+                                   _reference_rolling_features(games, stats, advanced))
+    
+    def test_no_same_game_or_future_leakage(self):
+        games, stats, advanced = self._season_data()
+        features = CFBPreprocessor().prepare_rolling_features(games, stats, advanced)
+        
+        week_one = features[features['week'] == 1]
+        assert (week_one['home_games_played'] == 0).all()
+        assert week_one['home_avg_points_for'].isna().all()
+        # Changing a later result must not change earlier features
+        changed = games.copy()
+        changed.loc[changed['week'] == 4, 'homePoints'] = 99
+        again = CFBPreprocessor().prepare_rolling_features(changed, stats, advanced)
+        early = features['week'] <= 4
+        pd.testing.assert_frame_equal(again.loc[early, self._rolling_columns(again)],
+                                      features.loc[early, self._rolling_columns(features)])
+    
+    def test_postseason_follows_regular_season(self):
+        games = pd.DataFrame({
+            'id': [1, 2, 3], 'season': 2023, 'week': [1, 12, 1],
+            'seasonType': ['regular', 'regular', 'postseason'],
+            'homeTeam': ['A', 'A', 'A'], 'awayTeam': ['B', 'C', 'D'],
+            'homePoints': [10, 20, 30], 'awayPoints': [0, 0, 0],
+        })
+        features = CFBPreprocessor().prepare_rolling_features(games)
+        assert features['home_games_played'].tolist() == [0, 1, 2]
+        assert features.loc[2, 'home_avg_points_for'] == 15
+    
+    def test_training_data_includes_rolling_features(self):
+        games, stats, advanced = self._season_data()
+        features = CFBPreprocessor().prepare_rolling_features(games, stats, advanced)
+        X, y = CFBPreprocessor().create_training_data(features)
+        assert 'home_avg_off_ppa' in X.columns and 'avg_ppa_diff' in X.columns
+        assert not X.isna().any().any()
+        assert len(y) == len(games)
+
+
+class TestIncrementalRollingFeatures:
+    """Week-by-week updates of a persisted state must match a full rebuild"""
+    
+    def _season(self):
+        games, stats, advanced = TestRollingFeatures()._season_data()
+        games = games[games['season'] == 2023].reset_index(drop=True)
+        return games, stats, advanced
+    
+    def test_weekly_updates_match_full_rebuild(self, tmp_path):
+        games, stats, advanced = self._season()
+        preprocessor = CFBPreprocessor()
+        full = preprocessor.prepare_rolling_features(games, stats, advanced)
+        
+        weekly = []
+        for week in sorted(games['week'].unique()):
+            # Each run starts from the state saved by the previous one
+            state = load_state(2023, str(tmp_path))
+            week_games = games[games['week'] == week]
+            weekly.append(preprocessor.update_rolling_features(state, week_games, stats, advanced))
+            state.save(state_path(2023, str(tmp_path)))
+        incremental = pd.concat(weekly)
+        
+        columns = [c for c in full.columns if c not in games.columns]
+        pd.testing.assert_frame_equal(incremental[columns], full.loc[incremental.index, columns])
+        state = load_state(2023, str(tmp_path))
+        # Week 6 of 2023 has not been played yet
+        assert state.last_processed_week == 5
+        assert verify_state(state, games, stats, advanced)
+    
+    def test_processed_weeks_are_not_folded_twice(self):
+        games, stats, advanced = self._season()
+        preprocessor = CFBPreprocessor()
+        state = TeamAccumulators(2023)
+        preprocessor.update_rolling_features(state, games[games['week'] <= 3], stats, advanced)
+        again = preprocessor.update_rolling_features(state, games[games['week'] <= 4], stats, advanced)
+        
+        assert set(again['week']) == {4}
+        assert verify_state(state, games, stats, advanced)
+    
+    def test_partially_played_week_waits(self):
+        games, stats, advanced = self._season()
+        games = games[games['week'] <= 2].copy()
+        games.loc[games.index[-1], ['homePoints', 'awayPoints']] = np.nan
+        
+        state = TeamAccumulators(2023)
+        CFBPreprocessor().update_rolling_features(state, games, stats, advanced)
+        assert state.last_processed_week == 1
+    
+    def test_verify_detects_drift(self):
+        games, stats, advanced = self._season()
+        state = TeamAccumulators(2023)
+        CFBPreprocessor().update_rolling_features(state, games, stats, advanced)
+        state.sums[0, 0] += 1
+        assert not verify_state(state, games, stats, advanced)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
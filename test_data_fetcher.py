@@ -0,0 +1,364 @@
+"""
+Tests for the CFB Data API client
+Run with: python -m pytest test_data_fetcher.py
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from async_fetcher import AsyncCFBDataFetcher
+from cache import ResponseCache, is_completed_season, ttl_for
+from data_fetcher import CFBDataFetcher
+from rate_limiter import PRIORITY_BACKFILL, PRIORITY_CURRENT, TokenBucketRateLimiter
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, status_code=200, json_data=None, headers=None):
+        self.status_code = status_code
+        self._json = json_data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._json
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+class FakeSession:
+    """Records requests and replays queued responses"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.calls.append({"url": url, "headers": dict(headers or {}), "params": params})
+        return self.responses.pop(0)
+
+
+class TestResponseCache:
+    """Test cases for the on-disk response cache"""
+
+    def test_completed_season_never_expires(self):
+        now = datetime(2025, 10, 1)
+        assert is_completed_season(2023, now)
+        assert not is_completed_season(2025, now)
+        assert ttl_for("/games", {"year": 2023}, now) is None
+        assert ttl_for("/games", {"year": 2025, "week": 6}, now) > 0
+
+    def test_bowl_season_is_not_complete_in_january(self):
+        assert not is_completed_season(2024, datetime(2025, 1, 5))
+        assert is_completed_season(2024, datetime(2025, 2, 5))
+
+    def test_set_and_get_round_trip(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.set("/games", {"year": 2023}, [{"id": 1}], ttl=None, etag='"abc"')
+        entry = cache.get("/games", {"year": 2023})
+        assert entry["data"] == [{"id": 1}]
+        assert entry["etag"] == '"abc"'
+        assert ResponseCache.is_fresh(entry)
+        assert cache.get("/games", {"year": 2024}) is None
+
+    def test_expired_entry_is_stale(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.set("/games", {"year": 2025}, [], ttl=10)
+        entry = cache.get("/games", {"year": 2025})
+        assert not ResponseCache.is_fresh(entry, now=entry["stored_at"] + 11)
+
+    def test_eviction_keeps_cache_under_size_limit(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_bytes=2000)
+        payload = ["x" * 100] * 5
+        for year in range(2010, 2020):
+            cache.set("/games", {"year": year}, payload)
+            # Distinct mtimes so least-recently-used ordering is deterministic
+            path = os.path.join(str(tmp_path), ResponseCache.make_key("/games", {"year": year}) + ".json")
+            os.utime(path, (year, year))
+        assert cache.size_bytes() <= 2000
+        assert cache.get("/games", {"year": 2019}) is not None
+        assert cache.get("/games", {"year": 2010}) is None
+
+
+class TestFetcherCaching:
+    """Test cases for CFBDataFetcher with a response cache"""
+
+    def test_repeat_request_is_served_from_cache(self, tmp_path):
+        fetcher = CFBDataFetcher("key", cache=ResponseCache(str(tmp_path)))
+        fetcher.session = FakeSession([FakeResponse(json_data=[{"id": 1, "homeTeam": "A"}])])
+
+        first = fetcher.get_games(2019)
+        second = fetcher.get_games(2019)
+
+        assert len(fetcher.session.calls) == 1
+        assert first.equals(second)
+
+    def test_stale_entry_is_revalidated_with_etag(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        year = datetime.now().year
+        cache.set("/talent", {"year": year}, [{"school": "A", "talent": 1.0}], ttl=0,
+                  etag='"v1"', last_modified="Sat, 01 Nov 2025 00:00:00 GMT")
+
+        fetcher = CFBDataFetcher("key", cache=cache)
+        fetcher.session = FakeSession([FakeResponse(status_code=304)])
+        talent = fetcher.get_team_talent(year)
+
+        headers = fetcher.session.calls[0]["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+        assert headers["If-Modified-Since"] == "Sat, 01 Nov 2025 00:00:00 GMT"
+        assert talent["school"].tolist() == ["A"]
+        assert ResponseCache.is_fresh(cache.get("/talent", {"year": year}))
+
+    def test_changed_response_replaces_cache_entry(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        year = datetime.now().year
+        cache.set("/talent", {"year": year}, [{"school": "A", "talent": 1.0}], ttl=0, etag='"v1"')
+
+        fetcher = CFBDataFetcher("key", cache=cache)
+        fetcher.session = FakeSession([
+            FakeResponse(json_data=[{"school": "B", "talent": 2.0}], headers={"ETag": '"v2"'})
+        ])
+        talent = fetcher.get_team_talent(year)
+
+        assert talent["school"].tolist() == ["B"]
+        assert cache.get("/talent", {"year": year})["etag"] == '"v2"'
+
+    def test_no_cache_by_default(self):
+        fetcher = CFBDataFetcher("key")
+        fetcher.session = FakeSession([FakeResponse(json_data=[]), FakeResponse(json_data=[])])
+        fetcher.get_teams()
+        fetcher.get_teams()
+        assert len(fetcher.session.calls) == 2
+
+
+class TestGameStats:
+    """Test cases for the per-game stats endpoints"""
+
+    def test_game_stats_are_flattened_per_team(self):
+        fetcher = CFBDataFetcher("key")
+        fetcher.session = FakeSession([FakeResponse(json_data=[{
+            "id": 401, "teams": [
+                {"teamId": 1, "team": "A", "conference": "SEC", "homeAway": "home", "points": 24,
+                 "stats": [{"category": "totalYards", "stat": "410"},
+                           {"category": "thirdDownEff", "stat": "5-12"}]},
+                {"teamId": 2, "team": "B", "conference": "SEC", "homeAway": "away", "points": 17,
+                 "stats": [{"category": "totalYards", "stat": "305"},
+                           {"category": "thirdDownEff", "stat": "4-13"}]},
+            ],
+        }])])
+
+        stats = fetcher.get_game_stats(2023, week=5)
+
+        assert fetcher.session.calls[0]["url"].endswith("/games/teams")
+        assert stats["game_id"].tolist() == [401, 401]
+        assert stats["team"].tolist() == ["A", "B"]
+        assert stats["totalYards"].tolist() == [410, 305]
+        assert stats["thirdDownEff"].tolist() == ["5-12", "4-13"]
+
+    def test_advanced_game_stats_use_csv_column_names(self):
+        fetcher = CFBDataFetcher("key")
+        fetcher.session = FakeSession([FakeResponse(json_data=[{
+            "gameId": 401, "season": 2023, "week": 5, "team": "A", "opponent": "B",
+            "offense": {"ppa": 0.31, "successRate": 0.47, "passingPlays": {"ppa": 0.4}},
+            "defense": {"ppa": 0.12, "successRate": 0.38},
+        }])])
+
+        advanced = fetcher.get_advanced_game_stats(2023, week=5)
+
+        assert fetcher.session.calls[0]["url"].endswith("/stats/game/advanced")
+        assert advanced.loc[0, "offense_ppa"] == 0.31
+        assert advanced.loc[0, "offense_passingPlays_ppa"] == 0.4
+        assert advanced.loc[0, "defense_successRate"] == 0.38
+
+
+class StubAPIServer:
+    """Local HTTP server that mimics the CFBD endpoints used by the fetcher"""
+
+    def __init__(self, delay=0.05, fail_first=0):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                with stub.lock:
+                    stub.requests.append((url.path, params))
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    fail = stub.fail_first > 0
+                    if fail:
+                        stub.fail_first -= 1
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                if fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps([{"path": url.path, **params}]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestAsyncFetcher:
+    """Test cases for the concurrent fetcher against a local stub server"""
+
+    def test_fetch_seasons_matches_sync_client(self):
+        with StubAPIServer(delay=0) as stub:
+            sync = CFBDataFetcher("key", base_url=stub.url)
+            with AsyncCFBDataFetcher("key", base_url=stub.url) as client:
+                results = asyncio.run(client.fetch_seasons([2022, 2023], endpoints=["games", "talent"]))
+
+            assert set(results) == {("games", 2022, None), ("games", 2023, None),
+                                    ("talent", 2022, None), ("talent", 2023, None)}
+            assert results[("games", 2023, None)].equals(sync.get_games(2023))
+            assert results[("talent", 2022, None)].equals(sync.get_team_talent(2022))
+
+    def test_weekly_endpoints_fan_out_per_week(self):
+        with StubAPIServer(delay=0) as stub:
+            with AsyncCFBDataFetcher("key", base_url=stub.url) as client:
+                results = asyncio.run(client.fetch_seasons(
+                    [2023], endpoints=["games", "lines", "records"], weeks=[1, 2, 3]))
+
+        assert ("games", 2023, 2) in results
+        assert ("lines", 2023, 3) in results
+        assert ("records", 2023, None) in results
+        assert results[("games", 2023, 2)]["week"].tolist() == ["2"]
+        assert len(results) == 7
+
+    def test_in_flight_requests_are_capped(self):
+        with StubAPIServer(delay=0.1) as stub:
+            with AsyncCFBDataFetcher("key", max_concurrency=3, base_url=stub.url) as client:
+                start = time.perf_counter()
+                asyncio.run(client.fetch_seasons(range(2015, 2024), endpoints=["games"]))
+                elapsed = time.perf_counter() - start
+
+        assert stub.max_in_flight == 3
+        # 9 requests of 0.1s in batches of 3 instead of 0.9s serially
+        assert elapsed < 0.8
+
+    def test_shares_retry_semantics(self):
+        with StubAPIServer(delay=0, fail_first=1) as stub:
+            with AsyncCFBDataFetcher("key", base_url=stub.url) as client:
+                client.fetcher.session.adapters["http://"].max_retries.backoff_factor = 0
+                results = asyncio.run(client.fetch_seasons([2023], endpoints=["talent"]))
+
+        assert len(stub.requests) == 2
+        assert len(results[("talent", 2023, None)]) == 1
+
+    def test_unknown_endpoint_raises(self):
+        with AsyncCFBDataFetcher("key") as client:
+            with pytest.raises(ValueError):
+                asyncio.run(client.fetch("plays", year=2023))
+
+
+class TestRateLimiter:
+    """Test cases for the token-bucket rate limiter"""
+
+    def test_burst_then_steady_rate(self):
+        limiter = TokenBucketRateLimiter(rate=50, burst=5)
+        start = time.perf_counter()
+        for _ in range(10):
+            limiter.acquire("/games")
+        elapsed = time.perf_counter() - start
+
+        # 5 requests burst through, the other 5 wait ~20ms each
+        assert 0.08 < elapsed < 0.5
+        metrics = limiter.metrics
+        assert metrics["requests"] == 10
+        assert metrics["throttled_requests"] >= 4
+        assert metrics["throttle_wait_seconds"] > 0
+
+    def test_endpoint_weights_consume_more_tokens(self):
+        limiter = TokenBucketRateLimiter(rate=1, burst=4, endpoint_weights={"/stats/season": 3})
+        assert limiter.weight("/stats/season") == 3
+        assert limiter.weight("/games") == 1
+        limiter.acquire("/stats/season")
+        limiter.acquire("/games")
+        assert limiter.metrics["throttled_requests"] == 0
+
+    def test_current_week_preempts_backfill(self):
+        limiter = TokenBucketRateLimiter(rate=10, burst=1)
+        limiter.acquire("/games")  # drain the bucket
+        order = []
+
+        def request(name, priority):
+            limiter.acquire("/games", priority=priority)
+            order.append(name)
+
+        backfill = [threading.Thread(target=request, args=(f"backfill{i}", PRIORITY_BACKFILL))
+                    for i in range(2)]
+        for thread in backfill:
+            thread.start()
+        time.sleep(0.03)
+        current = threading.Thread(target=request, args=("current", PRIORITY_CURRENT))
+        current.start()
+        for thread in backfill + [current]:
+            thread.join()
+
+        assert order[0] == "current"
+        assert limiter.metrics["requests_by_priority"] == {PRIORITY_BACKFILL: 3, PRIORITY_CURRENT: 1}
+
+    def test_fetcher_backs_off_on_429(self):
+        limiter = TokenBucketRateLimiter(rate=100, burst=10)
+        fetcher = CFBDataFetcher("key", rate_limiter=limiter)
+        fetcher.session = FakeSession([
+            FakeResponse(status_code=429, headers={"Retry-After": "0.05"}),
+            FakeResponse(json_data=[{"school": "A", "talent": 1.0}]),
+        ])
+
+        talent = fetcher.get_team_talent(2019)
+
+        assert len(talent) == 1
+        assert len(fetcher.session.calls) == 2
+        metrics = limiter.metrics
+        assert metrics["http_429"] == 1
+        assert metrics["requests"] == 2
+        assert metrics["throttle_wait_seconds"] >= 0.04
+
+    def test_cache_hits_do_not_consume_tokens(self, tmp_path):
+        limiter = TokenBucketRateLimiter(rate=100, burst=10)
+        fetcher = CFBDataFetcher("key", cache=ResponseCache(str(tmp_path)), rate_limiter=limiter)
+        fetcher.session = FakeSession([FakeResponse(json_data=[])])
+        fetcher.get_games(2019)
+        fetcher.get_games(2019)
+        assert limiter.metrics["requests"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -92,7 +92,7 @@ def test_model_training():
     y = pd.Series((X['home_off_total_yards'] > X['away_off_total_yards']).astype(int))
     
     model = CFBModel(model_type="random_forest")
-    metrics = model.train(X, y, test_size=0.3)
+    metrics = model.train(X, y)
     
     assert 'train_accuracy' in metrics
     assert 'test_accuracy' in metrics
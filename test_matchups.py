@@ -0,0 +1,106 @@
+"""
+Tests for the all-pairs matchup probability matrix
+Run with: python -m pytest test_matchups.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import matchups
+from model import CFBModel
+from preprocessor import CFBPreprocessor
+
+
+def _team_stats(n_teams=12, seed=0):
+    rng = np.random.RandomState(seed)
+    teams = [f"Team {i:02d}" for i in range(n_teams)]
+    stats = pd.DataFrame({
+        'team': teams,
+        'totalYards': rng.randint(3000, 6000, n_teams),
+        'netPassingYards': rng.randint(1500, 3500, n_teams),
+        'rushingYards': rng.randint(1000, 2500, n_teams),
+    })
+    talent = pd.DataFrame({'school': teams, 'talent': rng.uniform(500, 1000, n_teams)})
+    return stats, talent
+
+
+def _trained_model(stats, talent, model_type='random_forest'):
+    rng = np.random.RandomState(1)
+    games = pd.DataFrame({
+        'homeTeam': rng.choice(stats['team'], 400),
+        'awayTeam': rng.choice(stats['team'], 400),
+    })
+    preprocessor = CFBPreprocessor()
+    features = preprocessor.prepare_game_features(games, stats, talent)
+    margin = features['talent_diff'] / 20 + features['yards_diff'] / 300 + rng.normal(0, 5, len(games))
+    features['homePoints'] = 28 + margin.clip(lower=0)
+    features['awayPoints'] = 28 - margin.clip(upper=0)
+    X, y = preprocessor.create_training_data(features)
+    model = CFBModel(model_type=model_type)
+    model.train(X, y, cv=3, n_jobs=1)
+    return model
+
+
+class TestMatchupMatrix:
+    """Test cases for the all-pairs matchup matrix"""
+
+    def test_matches_single_game_predictions(self):
+        stats, talent = _team_stats()
+        model = _trained_model(stats, talent)
+        preprocessor = CFBPreprocessor()
+        matrix = matchups.build_matchup_matrix(model, preprocessor.build_team_features(stats, talent))
+
+        # The notebook path: one hand-picked game at a time
+        games = pd.DataFrame({'homeTeam': ['Team 03', 'Team 07'], 'awayTeam': ['Team 07', 'Team 03']})
+        X, _ = preprocessor.create_training_data(preprocessor.prepare_game_features(games, stats, talent))
+        p_home = model.predict_proba(X)[:, 1]
+        assert matrix.probability('Team 03', 'Team 07') == pytest.approx(p_home[0], abs=1e-6)
+        assert matrix.probability('Team 03', 'Team 07', 'away') == pytest.approx(1 - p_home[1], abs=1e-6)
+        assert matrix.probability('Team 03', 'Team 07', 'neutral') == pytest.approx(
+            (p_home[0] + 1 - p_home[1]) / 2, abs=1e-6)
+        # Both teams' neutral-site probabilities sum to one
+        neutral = matrix.neutral
+        off_diagonal = ~np.eye(len(matrix.teams), dtype=bool)
+        np.testing.assert_allclose((neutral + neutral.T)[off_diagonal], 1, atol=1e-6)
+        assert np.isnan(np.diag(matrix.home)).all()
+
+    def test_cached_by_model_version_and_week(self, tmp_path, monkeypatch):
+        stats, talent = _team_stats()
+        model = _trained_model(stats, talent)
+        team_features = CFBPreprocessor().build_team_features(stats, talent)
+        cache_dir = str(tmp_path / 'matchups')
+
+        matrix = matchups.matchup_matrix(model, team_features, week=5, season=2024, cache_dir=cache_dir)
+        version = matchups.model_version(model)
+        assert os.path.exists(matchups.cache_path(version, 5, 2024, cache_dir))
+
+        def no_rebuild(*args, **kwargs):
+            raise AssertionError("matrix was rebuilt")
+        monkeypatch.setattr(matchups, 'build_matchup_matrix', no_rebuild)
+        cached = matchups.matchup_matrix(model, team_features, week=5, season=2024, cache_dir=cache_dir)
+        np.testing.assert_array_equal(cached.home, matrix.home)
+        assert cached.metadata['model_version'] == version and cached.metadata['week'] == 5
+        assert cached.probability('Team 01', 'Team 02') == matrix.probability('Team 01', 'Team 02')
+        # A new week or model is a new key
+        with pytest.raises(AssertionError, match='rebuilt'):
+            matchups.matchup_matrix(model, team_features, week=6, season=2024, cache_dir=cache_dir)
+        other = _trained_model(stats, talent, 'gradient_boosting')
+        assert matchups.model_version(other) != version
+
+    def test_frame_and_lookup_errors(self):
+        matrix = matchups.MatchupMatrix(['A', 'B'], np.array([[np.nan, 0.7], [0.6, np.nan]]))
+        assert matrix.frame('away').loc['A', 'B'] == pytest.approx(0.4)
+        assert matrix.probability('A', 'B', 'neutral') == pytest.approx(0.55)
+        with pytest.raises(KeyError):
+            matrix.probability('A', 'C')
+        with pytest.raises(ValueError):
+            matrix.probability('A', 'B', 'road')
+        with pytest.raises(ValueError):
+            matchups.MatchupMatrix(['A'], np.zeros((2, 2)))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,118 @@
+"""
+Tests for the local model registry
+Run with: python -m pytest test_registry.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from registry import ModelRegistry
+
+
+def _inputs(seed=0, n=120):
+    rng = np.random.RandomState(seed)
+    games = pd.DataFrame({
+        'home_team': ['Team %d' % i for i in rng.randint(0, 30, n)],
+        'away_team': ['Team %d' % i for i in rng.randint(0, 30, n)],
+        'home_points': rng.randint(0, 50, n),
+        'away_points': rng.randint(0, 50, n),
+        'talent_diff': rng.normal(0, 50, n),
+        'yards_diff': rng.normal(0, 80, n),
+    })
+    return {'games': games, 'talent': None}
+
+
+def _builder(inputs, calls):
+    def build():
+        calls.append(1)
+        games = inputs['games']
+        X = games[['talent_diff', 'yards_diff']]
+        y = (games['home_points'] > games['away_points']).astype(int)
+        return X, y
+    return build
+
+
+class TestModelRegistry:
+    """Test cases for ModelRegistry"""
+
+    def test_unchanged_inputs_are_a_cache_hit(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        inputs, calls = _inputs(), []
+
+        first, entry = registry.train(inputs, _builder(inputs, calls), cv=3)
+        assert not entry['features_cached'] and not entry['model_cached']
+
+        second, again = registry.train(inputs, _builder(inputs, calls), cv=3)
+        assert again['features_cached'] and again['model_cached']
+        assert again['version'] == entry['version']
+        assert len(calls) == 1
+        X, _ = registry.load_features(entry['feature_key'])
+        np.testing.assert_array_equal(second.predict_proba(X), first.predict_proba(X))
+
+    def test_changed_data_or_settings_make_new_versions(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        inputs = _inputs()
+        _, base = registry.train(inputs, _builder(inputs, []), cv=3)
+
+        changed = _inputs(seed=1)
+        _, new_data = registry.train(changed, _builder(changed, []), cv=3)
+        _, new_params = registry.train(inputs, _builder(inputs, []), cv=4)
+        _, new_type = registry.train(inputs, _builder(inputs, []), model_type='gradient_boosting', cv=3)
+
+        versions = {base['version'], new_data['version'], new_params['version'], new_type['version']}
+        assert len(versions) == 4
+        assert new_params['features_cached'] and new_type['features_cached']
+        assert len(registry.entries()) == 4
+
+    def test_parallelism_does_not_change_the_version(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        inputs = _inputs()
+        _, serial = registry.train(inputs, _builder(inputs, []), cv=3, n_jobs=1)
+        _, parallel = registry.train(inputs, _builder(inputs, []), cv=3, n_jobs=2)
+        assert parallel['model_cached'] and parallel['version'] == serial['version']
+
+    def test_categorical_features_round_trip(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        inputs, calls = _inputs(), []
+        conferences = np.random.RandomState(3).choice(['SEC', 'Pac-12', 'ACC'], len(inputs['games']))
+        inputs['games']['home_conference'] = conferences
+
+        def build():
+            X, y = _builder(inputs, calls)()
+            X = X.assign(home_conference=inputs['games']['home_conference'].astype('category'),
+                         week=pd.Series(np.arange(len(X)) % 12 + 1).astype('category'))
+            X.loc[0, 'home_conference'] = np.nan
+            return X, y
+
+        first, entry = registry.train(inputs, build, model_type='hist_gradient_boosting',
+                                      feature_params={'categorical': True}, cv=3)
+        second, again = registry.train(inputs, build, model_type='hist_gradient_boosting',
+                                       feature_params={'categorical': True}, cv=3)
+        assert again['features_cached'] and again['model_cached'] and len(calls) == 1
+
+        X, _ = registry.load_features(entry['feature_key'])
+        expected, _ = build()
+        assert isinstance(X['home_conference'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_series_equal(X['home_conference'], expected['home_conference'].reset_index(drop=True))
+        assert list(X['week'].cat.categories) == list(range(1, 13))
+        assert first.model.is_categorical_.sum() == 2
+        np.testing.assert_array_equal(second.predict_proba(X), first.predict_proba(X))
+
+    def test_load_artifact_and_entry_metadata(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        inputs = _inputs()
+        model, entry = registry.train(inputs, _builder(inputs, []), cv=3)
+
+        loaded = registry.load(entry['version'])
+        X, y = registry.load_features(entry['feature_key'])
+        np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X), atol=1e-9)
+        assert entry['training_data_hash'] == loaded.data_hash
+        assert entry['metrics']['test_accuracy'] == pytest.approx(model.metrics['test_accuracy'])
+
+        with pytest.raises(KeyError):
+            registry.entry('missing')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
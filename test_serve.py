@@ -0,0 +1,187 @@
+"""
+Tests for the local prediction service
+Run with: python -m pytest test_serve.py
+"""
+
+import json
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import CFBModel
+from preprocessor import CFBPreprocessor
+from serve import MicroBatcher, PredictionService, make_server
+
+
+def _team_features(n_teams=10, seed=0):
+    rng = np.random.RandomState(seed)
+    teams = [f"Team {i}" for i in range(n_teams)]
+    stats = pd.DataFrame({'team': teams, 'totalYards': rng.randint(3000, 6000, n_teams),
+                          'netPassingYards': rng.randint(1500, 3500, n_teams),
+                          'rushingYards': rng.randint(1000, 2500, n_teams)})
+    talent = pd.DataFrame({'school': teams, 'talent': rng.uniform(500, 1000, n_teams)})
+    return CFBPreprocessor().build_team_features(stats, talent)
+
+
+def _trained_model(team_features, seed=0):
+    rng = np.random.RandomState(seed)
+    games = pd.DataFrame({'homeTeam': rng.choice(team_features.index, 300),
+                          'awayTeam': rng.choice(team_features.index, 300)})
+    preprocessor = CFBPreprocessor()
+    features = preprocessor.join_team_features(games, team_features)
+    margin = features['talent_diff'] / 20 + rng.normal(0, 5, len(games))
+    features['homePoints'] = 28 + margin.clip(lower=0)
+    features['awayPoints'] = 28 - margin.clip(upper=0)
+    model = CFBModel(model_type='random_forest')
+    model.train(*preprocessor.create_training_data(features), cv=3, n_jobs=1)
+    return model
+
+
+def _post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def service(tmp_path):
+    team_features = _team_features()
+    path = _trained_model(team_features).save_artifact(str(tmp_path / 'cfb_model'))
+    service = PredictionService(path, team_features=team_features, max_wait_ms=50)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield service, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+class TestMicroBatcher:
+    """Test cases for request coalescing"""
+
+    def test_concurrent_requests_share_batches(self):
+        sizes = []
+
+        def predict(rows):
+            sizes.append(len(rows))
+            return rows['x'].to_numpy() * 2
+
+        batcher = MicroBatcher(predict, max_batch_size=100, max_wait_ms=100)
+        futures = [batcher.submit(pd.DataFrame({'x': [i, i + 0.5]})) for i in range(10)]
+        results = [future.result(timeout=5) for future in futures]
+        batcher.close()
+
+        assert sum(sizes) == 20 and len(sizes) < 10
+        for i, result in enumerate(results):
+            np.testing.assert_array_equal(result, [2 * i, 2 * i + 1])
+
+    def test_errors_reach_every_caller(self):
+        def predict(rows):
+            raise RuntimeError("model failed")
+        batcher = MicroBatcher(predict, max_wait_ms=1)
+        with pytest.raises(RuntimeError, match='model failed'):
+            batcher.submit(pd.DataFrame({'x': [1]})).result(timeout=5)
+        batcher.close()
+
+
+class TestPredictionService:
+    """Test cases for the HTTP service"""
+
+    def test_predict_matches_model(self, service):
+        service, url = service
+        games = [{'home_team': 'Team 1', 'away_team': 'Team 2'}, {'home_team': 'Team 3', 'away_team': 'Team 0'}]
+        status, body = _post(url + '/predict', {'games': games})
+        assert status == 200
+
+        preprocessor = CFBPreprocessor()
+        X, _ = preprocessor.create_training_data(
+            preprocessor.join_team_features(pd.DataFrame(games), service.team_features))
+        expected = service.model.predict_proba(X)[:, 1]
+        got = [p['home_win_probability'] for p in body['predictions']]
+        np.testing.assert_allclose(got, expected)
+        assert body['predictions'][0]['predicted_winner'] in ('Team 1', 'Team 2')
+
+        with urllib.request.urlopen(url + '/health') as response:
+            health = json.loads(response.read())
+        assert health['model_type'] == 'random_forest' and health['requests'] == 1
+
+    def test_bad_requests_get_400(self, service):
+        service, url = service
+        assert _post(url + '/predict', {'rows': []})[0] == 400
+        status, body = _post(url + '/predict', {'features': [{'talent_diff': 1.0}]})
+        assert status == 400 and 'Feature mismatch' in body['error']
+
+    @pytest.mark.parametrize('save', ['save_artifact', 'save'])
+    def test_feature_rows_in_any_key_order(self, tmp_path, save):
+        team_features = _team_features()
+        model = _trained_model(team_features)
+        path = str(tmp_path / 'cfb_model')
+        if save == 'save':
+            path += '.pkl'
+        getattr(model, save)(path)
+        service = PredictionService(path, team_features=team_features, max_wait_ms=1)
+
+        games = pd.DataFrame([{'home_team': 'Team 1', 'away_team': 'Team 2'}])
+        preprocessor = CFBPreprocessor()
+        X, _ = preprocessor.create_training_data(preprocessor.join_team_features(games, team_features))
+        row = X.iloc[0].to_dict()
+        reordered = {column: row[column] for column in reversed(list(row))}
+        try:
+            got = service.predict({'features': [reordered]})[0]['home_win_probability']
+        finally:
+            service.close()
+        np.testing.assert_allclose(got, model.predict_proba(X)[0, 1])
+
+    def test_concurrent_requests_are_batched(self, service):
+        service, url = service
+        results = [None] * 8
+
+        def call(i):
+            results[i] = _post(url + '/predict', {'games': [{'home_team': f'Team {i}', 'away_team': 'Team 9'}]})
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(status == 200 for status, _ in results)
+        assert service.batcher.requests == 8 and service.batcher.batches < 8
+
+    def test_hot_reload_swaps_model_without_failing_requests(self, service):
+        service, url = service
+        game = {'games': [{'home_team': 'Team 4', 'away_team': 'Team 5'}]}
+        before = _post(url + '/predict', game)[1]['predictions'][0]['home_win_probability']
+        old_model = service.model
+
+        stop, statuses = threading.Event(), []
+
+        def hammer():
+            while not stop.is_set():
+                statuses.append(_post(url + '/predict', game)[0])
+        thread = threading.Thread(target=hammer)
+        thread.start()
+        time.sleep(0.05)
+        _trained_model(service.team_features, seed=3).save_artifact(service.model_path)
+        assert service.maybe_reload()
+        time.sleep(0.05)
+        stop.set()
+        thread.join()
+
+        assert service.model is not old_model and service.reloads == 1
+        assert statuses and all(status == 200 for status in statuses)
+        after = _post(url + '/predict', game)[1]['predictions'][0]['home_win_probability']
+        assert after != before
+        assert not service.maybe_reload()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+"""
+Tests for the Monte Carlo season simulator
+Run with: python -m pytest test_simulator.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulator import SeasonSimulator, home_win_probabilities, simulate_season
+
+
+def _season(n_conferences=3, per_conference=6, weeks=8, seed=0):
+    """Round-robin-ish schedule: odd weeks in conference, even weeks across"""
+    rng = np.random.RandomState(seed)
+    teams = [f"Team {c}{i}" for c in range(n_conferences) for i in range(per_conference)]
+    conference = {team: f"Conf {team[5]}" for team in teams}
+    rows = []
+    for week in range(1, weeks + 1):
+        if week % 2:
+            pairs = []
+            for c in range(n_conferences):
+                members = rng.permutation([t for t in teams if conference[t] == f"Conf {c}"])
+                pairs += list(zip(members[::2], members[1::2]))
+        else:
+            order = rng.permutation(teams)
+            pairs = list(zip(order[::2], order[1::2]))
+        for home, away in pairs:
+            rows.append({'week': week, 'homeTeam': home, 'awayTeam': away,
+                         'homeConference': conference[home], 'awayConference': conference[away],
+                         'homePoints': None, 'awayPoints': None})
+    return pd.DataFrame(rows)
+
+
+class TestSeasonSimulator:
+    """Test cases for the vectorized season simulator"""
+
+    def test_projected_wins_match_expected_wins(self):
+        games = _season()
+        proba = np.random.RandomState(1).uniform(0.1, 0.9, len(games))
+        result = simulate_season(games, proba, n_sims=50_000, seed=0).set_index('team')
+
+        expected = pd.concat([pd.Series(proba, index=games['homeTeam']),
+                              pd.Series(1 - proba, index=games['awayTeam'])]).groupby(level=0).sum()
+        np.testing.assert_allclose(result['projected_wins'], expected[result.index], atol=0.03)
+        assert (result['games'] == 8).all()
+        # One champion per conference and a full playoff field in every season
+        assert result.groupby('conference')['conference_title'].sum().to_numpy() == pytest.approx(1)
+        assert result['playoff'].sum() == pytest.approx(12)
+
+    def test_completed_games_keep_their_results(self):
+        games = _season()
+        played = games['week'] <= 4
+        games.loc[played, 'homePoints'] = 30
+        games.loc[played, 'awayPoints'] = 20
+        result = simulate_season(games, np.full(len(games), 0.5), n_sims=2000, seed=0).set_index('team')
+
+        home_wins = games[played].groupby('homeTeam').size()
+        assert (result['wins'] == home_wins.reindex(result.index, fill_value=0)).all()
+        # Deterministic remaining games: home teams win every one
+        certain = simulate_season(games, np.ones(len(games)), n_sims=100, seed=0).set_index('team')
+        total = games.groupby('homeTeam').size().reindex(certain.index, fill_value=0)
+        assert (certain['projected_wins'] == total).all() and (certain['wins_std'] == 0).all()
+
+    def test_seeded_runs_are_reproducible(self):
+        games = _season()
+        proba = np.full(len(games), 0.6)
+        first = simulate_season(games, proba, n_sims=5000, seed=7)
+        pd.testing.assert_frame_equal(first, simulate_season(games, proba, n_sims=5000, seed=7))
+        assert not first.equals(simulate_season(games, proba, n_sims=5000, seed=8))
+
+    def test_rating_updates_widen_win_distributions(self):
+        games = _season(weeks=12)
+        proba = np.full(len(games), 0.5)
+        static = simulate_season(games, proba, n_sims=20_000, seed=0)
+        updated = simulate_season(games, proba, n_sims=20_000, seed=0, rating_k=0.5)
+        assert updated['projected_wins'].mean() == pytest.approx(static['projected_wins'].mean(), abs=0.05)
+        assert updated['wins_std'].mean() > static['wins_std'].mean() * 1.05
+
+    def test_model_probabilities_and_validation(self):
+        games = _season()
+        X = pd.DataFrame({'x': np.linspace(-1, 1, len(games))})
+
+        class Model:
+            classes_ = np.array([0, 1])
+
+            def predict_proba(self, X):
+                p = (X['x'].to_numpy() + 1) / 2
+                return np.column_stack([1 - p, p])
+        np.testing.assert_allclose(home_win_probabilities(Model(), X), (X['x'] + 1) / 2)
+
+        with pytest.raises(ValueError):
+            SeasonSimulator(games, np.full(len(games) - 1, 0.5))
+        with pytest.raises(ValueError):
+            SeasonSimulator(games, np.full(len(games), 1.5))
+        with pytest.raises(ValueError):
+            SeasonSimulator(games.drop(columns='homeTeam'), np.full(len(games), 0.5))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
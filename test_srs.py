@@ -0,0 +1,122 @@
+"""
+Tests for the opponent-adjustment (SRS) solver
+Run with: python -m pytest test_srs.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import srs
+
+
+def _game_stats(seasons=(2022, 2023), n_teams=30, weeks=10, seed=0):
+    """advanced_game_stats-style rows generated from known team strengths"""
+    rng = np.random.RandomState(seed)
+    teams = ['Team %d' % i for i in range(n_teams)]
+    rows = []
+    game_id = 1
+    for season in seasons:
+        offense = dict(zip(teams, rng.normal(0, 0.1, n_teams)))
+        defense = dict(zip(teams, rng.normal(0, 0.1, n_teams)))
+        for week in range(1, weeks + 1):
+            order = rng.permutation(teams)
+            for home, away in zip(order[::2], order[1::2]):
+                home_ppa = 0.2 + offense[home] + defense[away] + rng.normal(0, 0.01)
+                away_ppa = 0.2 + offense[away] + defense[home] + rng.normal(0, 0.01)
+                home_sr = 0.4 + offense[home] / 2 + defense[away] / 2
+                away_sr = 0.4 + offense[away] / 2 + defense[home] / 2
+                for team, opp, off, de, off_sr, de_sr in (
+                        (home, away, home_ppa, away_ppa, home_sr, away_sr),
+                        (away, home, away_ppa, home_ppa, away_sr, home_sr)):
+                    rows.append({'gameId': game_id, 'season': season, 'week': week,
+                                 'team': team, 'opponent': opp,
+                                 'offense_ppa': off, 'defense_ppa': de,
+                                 'offense_successRate': off_sr, 'defense_successRate': de_sr})
+                game_id += 1
+    return pd.DataFrame(rows)
+
+
+def _dense_reference(stats, metric, damping):
+    """Ridge solution of the same system with dense linear algebra"""
+    keys, Y = srs.build_observations(stats, [metric])
+    X, teams = srs.design_matrix(keys)
+    X = X.toarray()
+    y = Y[:, 0]
+    season_mean = pd.Series(y).groupby(keys['season'].to_numpy()).transform('mean').to_numpy()
+    coef = np.linalg.solve(X.T @ X + damping * np.eye(X.shape[1]), X.T @ (y - season_mean))
+    n = len(teams)
+    means = pd.Series(y).groupby(keys['season'].to_numpy()).mean()
+    base = means.reindex(teams.get_level_values('season')).to_numpy()
+    return pd.DataFrame({f'offense_{metric}': base + coef[:n],
+                         f'defense_{metric}': base + coef[n:]}, index=teams).sort_index()
+
+
+class TestOpponentAdjust:
+    """Test cases for srs.opponent_adjust"""
+
+    def test_matches_dense_solution_for_every_metric(self):
+        stats = _game_stats()
+        result = srs.opponent_adjust(stats, damping=1e-3)
+
+        assert set(srs.available_metrics(stats)) == {'ppa', 'successRate'}
+        for metric in ('ppa', 'successRate'):
+            expected = _dense_reference(stats, metric, 1e-3)
+            np.testing.assert_allclose(result[expected.columns].to_numpy(),
+                                       expected.to_numpy(), atol=1e-7)
+
+    def test_recovers_opponent_strength(self):
+        stats = _game_stats(seasons=(2023,), n_teams=20, weeks=12, seed=3)
+        result = srs.opponent_adjust(stats, metrics=['ppa']).loc[2023]
+        raw = stats.groupby('team')['offense_ppa'].mean()
+
+        # Adjusted offense is closer to the true offense component than the raw
+        # mean, which is polluted by the defenses each team happened to face
+        rng = np.random.RandomState(3)
+        truth = pd.Series(rng.normal(0, 0.1, 20) + 0.2, index=['Team %d' % i for i in range(20)])
+        adjusted_error = (result['offense_ppa'] - truth).abs().mean()
+        raw_error = (raw - truth).abs().mean()
+        assert adjusted_error < raw_error
+        assert (result['games'] == 12).all()
+
+    def test_one_sided_rows_still_cover_the_game(self):
+        stats = _game_stats(seasons=(2023,), n_teams=10, weeks=6)
+        one_sided = stats.drop_duplicates('gameId', keep='first')
+        full = srs.opponent_adjust(stats, metrics=['ppa'])
+        partial = srs.opponent_adjust(one_sided, metrics=['ppa'])
+        pd.testing.assert_frame_equal(full, partial, atol=1e-9)
+
+    def test_missing_values_are_ignored_per_metric(self):
+        stats = _game_stats(seasons=(2023,), n_teams=10, weeks=6)
+        holes = stats.copy()
+        holes.loc[holes.index[:5], ['offense_successRate', 'defense_successRate']] = np.nan
+        result = srs.opponent_adjust(holes)
+        expected = srs.opponent_adjust(stats, metrics=['ppa'])
+        np.testing.assert_allclose(result['offense_ppa'], expected['offense_ppa'])
+        assert result['offense_successRate'].notna().all()
+
+    def test_warm_start_converges_faster(self):
+        stats = _game_stats(seasons=(2023,), n_teams=40, weeks=10, seed=5)
+        last_week = srs.opponent_adjust(stats[stats['week'] < 10])
+
+        keys, Y = srs.build_observations(stats, ['ppa', 'successRate'])
+        X, teams = srs.design_matrix(keys)
+        _, cold = srs.solve(X, Y - Y.mean(axis=0))
+
+        warm = srs.opponent_adjust(stats, previous=last_week)
+        cold_result = srs.opponent_adjust(stats)
+        np.testing.assert_allclose(warm.to_numpy(), cold_result.to_numpy(), atol=1e-6)
+
+        previous = last_week.reindex(teams)
+        offense = previous[['offense_ppa', 'offense_successRate']].to_numpy() - Y.mean(axis=0)
+        defense = previous[['defense_ppa', 'defense_successRate']].to_numpy() - Y.mean(axis=0)
+        _, warm_iterations = srs.solve(X, Y - Y.mean(axis=0), x0=np.vstack([offense, defense]))
+        assert warm_iterations < cold
+
+    def test_empty_input_raises(self):
+        with pytest.raises(ValueError):
+            srs.opponent_adjust(pd.DataFrame())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,73 @@
+"""
+Startup-time benchmark for the command-line entry points
+Run with: python -m pytest test_startup.py
+
+`cfbmodel --help` (main.py) used to import pandas, sklearn and requests
+before parsing its arguments (about 2 s). It now takes about 0.2 s. The
+budget leaves room for slow CI machines but catches an eager import of a
+heavy library.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+HELP_BUDGET_SECONDS = 0.75
+HEAVY_MODULES = ('pandas', 'numpy', 'sklearn', 'scipy', 'requests')
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _best_time(args, runs=3):
+    """Fastest of a few runs (the least noisy startup measurement)"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        assert result.returncode == 0, result.stderr
+    return min(times)
+
+
+def _imported_modules(code):
+    result = subprocess.run([sys.executable, '-c', f"{code}\nimport sys; print(' '.join(sys.modules))"],
+                            cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize('script', ['main.py', 'run_weekly_predictions.py', 'batch_predict.py', 'serve.py'])
+def test_help_within_budget(script):
+    elapsed = _best_time([script, '--help'])
+    assert elapsed < HELP_BUDGET_SECONDS, \
+        f"{script} --help took {elapsed:.2f}s (budget {HELP_BUDGET_SECONDS}s)"
+
+
+@pytest.mark.parametrize('code', ['import main', 'import run_weekly_predictions', 'import batch_predict',
+                                  'import serve', 'import importlib; importlib.import_module("__init__")'])
+def test_entry_points_import_no_heavy_libraries(code):
+    loaded = _imported_modules(code)
+    assert not loaded.intersection(HEAVY_MODULES), sorted(loaded.intersection(HEAVY_MODULES))
+
+
+def test_usage_errors_exit_fast():
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, 'main.py', '--year', 'not-a-year'], cwd=ROOT,
+                            capture_output=True, text=True)
+    assert result.returncode == 2 and 'usage' in result.stderr
+    assert time.perf_counter() - start < HELP_BUDGET_SECONDS
+
+
+def test_package_exports_load_on_access():
+    import importlib
+    package = importlib.import_module('__init__')
+    from model import CFBModel
+    assert package.CFBModel is CFBModel
+    with pytest.raises(AttributeError):
+        package.NotAnExport
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
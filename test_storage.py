@@ -0,0 +1,140 @@
+"""
+Tests for the Parquet data lake
+Run with: python -m pytest test_storage.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from preprocessor import CFBPreprocessor
+from storage import DataLake
+
+
+TEAMS = ["Alabama", "Georgia", "Ohio State", "Michigan", "Texas", "Oregon"]
+
+
+def _games(season):
+    rng = np.random.RandomState(season)
+    rows = []
+    for week in (1, 2, 3):
+        for i in range(0, len(TEAMS), 2):
+            rows.append({
+                "id": season * 100 + week * 10 + i,
+                "season": season,
+                "week": week,
+                "seasonType": "regular",
+                "neutralSite": False,
+                "homeTeam": TEAMS[i],
+                "awayTeam": TEAMS[i + 1],
+                "homePoints": int(rng.randint(0, 50)),
+                "awayPoints": int(rng.randint(0, 50)),
+                "venue": "Stadium",
+            })
+    return pd.DataFrame(rows)
+
+
+def _team_stats(season):
+    rows = []
+    for i, team in enumerate(TEAMS):
+        for stat in ("totalYards", "netPassingYards", "rushingYards", "firstDowns", "sacks"):
+            rows.append({"season": season, "team": team, "conference": "X",
+                         "statName": stat, "statValue": 1000 * (i + 1) + season})
+    return pd.DataFrame(rows)
+
+
+class FakeFetcher:
+    """Serves synthetic data through the CFBDataFetcher interface"""
+
+    def get_games(self, year):
+        return _games(year)
+
+    def get_team_stats(self, year):
+        return _team_stats(year)
+
+    def get_team_talent(self, year):
+        return pd.DataFrame({"year": year, "school": TEAMS, "talent": np.linspace(600, 1000, 6)})
+
+
+class TestDataLake:
+    """Test cases for DataLake"""
+
+    def test_games_are_partitioned_by_season_and_week(self, tmp_path):
+        lake = DataLake(str(tmp_path))
+        lake.write("games", _games(2023), season=2023)
+        assert lake.partitions("games") == [(2023, 1), (2023, 2), (2023, 3)]
+        assert (tmp_path / "games" / "season=2023" / "week=2" / "part-regular.parquet").exists()
+
+    def test_postseason_does_not_replace_regular_season_week(self, tmp_path):
+        lake = DataLake(str(tmp_path))
+        regular = _games(2023)
+        postseason = _games(2023)[lambda df: df["week"] == 1].assign(
+            seasonType="postseason", id=lambda df: df["id"] + 10_000)
+        lake.write("games", regular, season=2023)
+        lake.write("games", postseason, season=2023)
+
+        week_1 = lake.read("games", seasons=[2023], weeks=[1])
+        assert sorted(week_1["seasonType"].astype(str).value_counts().items()) == [("postseason", 3), ("regular", 3)]
+        assert len(lake.read("games")) == len(regular) + len(postseason)
+
+        # Rewriting the postseason replaces only the postseason file
+        lake.write("games", postseason.head(1), season=2023)
+        week_1 = lake.read("games", seasons=[2023], weeks=[1])
+        assert week_1["seasonType"].astype(str).value_counts().to_dict() == {"regular": 3, "postseason": 1}
+
+    def test_round_trip_with_typed_schema(self, tmp_path):
+        lake = DataLake(str(tmp_path))
+        games = _games(2023)
+        lake.write("games", games, season=2023)
+
+        result = lake.read("games").sort_values("id").reset_index(drop=True)
+        assert len(result) == len(games)
+        assert result["homeTeam"].dtype == "category"
+        assert result["homePoints"].tolist() == games["homePoints"].tolist()
+        assert result["week"].tolist() == games["week"].tolist()
+        assert set(result["season"]) == {2023}
+
+    def test_predicate_and_column_pushdown(self, tmp_path):
+        lake = DataLake(str(tmp_path))
+        for season in (2022, 2023):
+            lake.write("games", _games(season), season=season)
+            lake.write("team_stats", _team_stats(season), season=season)
+
+        games = lake.read("games", seasons=[2023], weeks=[2], columns=["homeTeam", "awayTeam"])
+        assert list(games.columns) == ["homeTeam", "awayTeam"]
+        assert len(games) == 3
+
+        stats = lake.read("team_stats", seasons=[2022], columns=["team", "statValue"],
+                          filters=[("statName", "==", "sacks")])
+        assert len(stats) == len(TEAMS)
+        assert stats["statValue"].min() == 1000 + 2022
+
+    def test_rewriting_a_partition_replaces_it(self, tmp_path):
+        lake = DataLake(str(tmp_path))
+        lake.write("team_stats", _team_stats(2023), season=2023)
+        lake.write("team_stats", _team_stats(2023).head(5), season=2023)
+        assert len(lake.read("team_stats", seasons=[2023])) == 5
+
+    def test_lake_features_match_direct_features(self, tmp_path):
+        lake = DataLake(str(tmp_path))
+        fetcher = FakeFetcher()
+        for season in (2022, 2023):
+            lake.ingest(fetcher, season)
+
+        preprocessor = CFBPreprocessor()
+        from_lake = preprocessor.prepare_lake_features(lake, [2022, 2023])
+        direct = pd.concat([
+            preprocessor.prepare_game_features(_games(s), _team_stats(s), fetcher.get_team_talent(s))
+            for s in (2022, 2023)
+        ], ignore_index=True)
+
+        X_lake, y_lake = preprocessor.create_training_data(from_lake.sort_values("id"))
+        X_direct, y_direct = preprocessor.create_training_data(direct.sort_values("id"))
+        np.testing.assert_allclose(X_lake.to_numpy(dtype=float), X_direct.to_numpy(dtype=float))
+        assert y_lake.tolist() == y_direct.tolist()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
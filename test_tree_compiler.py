@@ -0,0 +1,91 @@
+"""
+Tests for the flat-array tree ensemble evaluator
+Run with: python -m pytest test_tree_compiler.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+from model import CFBModel
+from tree_compiler import CompiledEnsemble, compile_ensemble
+
+
+def _data(n=600, n_classes=2, seed=0):
+    rng = np.random.RandomState(seed)
+    X = pd.DataFrame({
+        'talent_diff': rng.normal(0, 50, n),
+        'home_off_total_yards': rng.randint(200, 500, n).astype(float),
+        'away_off_total_yards': rng.randint(200, 500, n).astype(float),
+        'ppa_diff': rng.normal(0, 0.2, n),
+    })
+    score = X['talent_diff'] / 50 + X['ppa_diff'] * 5 + rng.normal(0, 1, n)
+    y = pd.Series(np.digitize(score, np.quantile(score, np.linspace(0, 1, n_classes + 1)[1:-1])))
+    return X, y
+
+
+class TestCompiledEnsemble:
+    """Compiled ensembles must reproduce sklearn's probabilities"""
+
+    @pytest.mark.parametrize('model_type', ['random_forest', 'gradient_boosting'])
+    def test_matches_cfb_model(self, model_type):
+        X, y = _data()
+        model = CFBModel(model_type=model_type)
+        model.model.fit(X, y)
+        compiled = compile_ensemble(model)
+
+        np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-9)
+        np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+        # Small batches and plain arrays take the same path
+        np.testing.assert_allclose(compiled.predict_proba(X.iloc[:3].to_numpy()),
+                                   model.predict_proba(X.iloc[:3]), rtol=0, atol=1e-9)
+
+    def test_gradient_boosting_multiclass_and_decision_function(self):
+        X, y = _data(n_classes=3)
+        estimator = GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=0).fit(X, y)
+        compiled = compile_ensemble(estimator)
+
+        np.testing.assert_allclose(compiled.decision_function(X), estimator.decision_function(X), atol=1e-9)
+        np.testing.assert_allclose(compiled.predict_proba(X), estimator.predict_proba(X), atol=1e-9)
+
+    def test_missing_values_follow_sklearn(self):
+        X, y = _data()
+        X.loc[X.index[::7], 'talent_diff'] = np.nan
+        estimator = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+        compiled = compile_ensemble(estimator)
+
+        np.testing.assert_allclose(compiled.predict_proba(X), estimator.predict_proba(X), atol=1e-9)
+
+    def test_columns_are_matched_by_name(self):
+        X, y = _data()
+        estimator = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+        compiled = compile_ensemble(estimator)
+
+        shuffled = X[X.columns[::-1]]
+        np.testing.assert_allclose(compiled.predict_proba(shuffled), estimator.predict_proba(X), atol=1e-9)
+        with pytest.raises(ValueError):
+            compiled.predict_proba(X.drop(columns='ppa_diff'))
+
+    def test_arrays_round_trip(self, tmp_path):
+        X, y = _data()
+        estimator = GradientBoostingClassifier(n_estimators=20, random_state=0).fit(X, y)
+        compiled = compile_ensemble(estimator)
+
+        path = tmp_path / 'ensemble.npz'
+        np.savez(path, **compiled.arrays())
+        with np.load(path) as arrays:
+            restored = CompiledEnsemble.from_arrays(arrays)
+        np.testing.assert_array_equal(restored.predict_proba(X), compiled.predict_proba(X))
+
+    def test_unfitted_or_unsupported_models_raise(self):
+        with pytest.raises(ValueError):
+            compile_ensemble(CFBModel())
+        X, y = _data()
+        from sklearn.linear_model import LogisticRegression
+        with pytest.raises(ValueError):
+            compile_ensemble(LogisticRegression().fit(X, y))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,128 @@
+"""
+Tests for successive-halving hyperparameter tuning
+Run with: python -m pytest test_tuning.py
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import tuning
+from model import CFBModel
+
+SMALL_SPACE = {
+    'n_estimators': [10, 20],
+    'max_depth': [2, 4, 6],
+    'min_samples_leaf': [1, 5],
+}
+
+
+def _seasons_data(n_per_season=120, seasons=(2019, 2020, 2021, 2022), seed=0):
+    rng = np.random.RandomState(seed)
+    n = n_per_season * len(seasons)
+    X = pd.DataFrame({
+        'talent_diff': rng.normal(0, 50, n),
+        'ppa_diff': rng.normal(0, 0.2, n),
+        'noise': rng.normal(0, 1, n),
+    })
+    y = pd.Series((X['talent_diff'] / 50 + X['ppa_diff'] * 5 + rng.normal(0, 1, n) > 0).astype(int))
+    return X, y, np.repeat(seasons, n_per_season)
+
+
+class TestTuning:
+    """Test cases for the tuning search and profiles"""
+
+    def test_rung_schedule(self):
+        assert tuning.rung_schedule(27, 9, eta=3) == [(27, 1), (9, 3), (3, 9)]
+        assert tuning.rung_schedule(9, 2, eta=3) == [(9, 1), (3, 2)]
+        assert tuning.rung_schedule(1, 4) == [(1, 1)]
+        with pytest.raises(ValueError):
+            tuning.rung_schedule(9, 3, eta=1)
+
+    def test_season_folds_train_on_earlier_seasons_only(self):
+        seasons = np.repeat([2019, 2020, 2021], [3, 4, 5])
+        folds = tuning.season_folds(seasons, n_folds=5)
+        assert [f['season'] for f in folds] == [2021, 2020]
+        assert folds[0] == {'season': 2021, 'train_stop': 7, 'test_start': 7, 'test_stop': 12}
+
+    def test_candidates_are_reproducible(self):
+        first = tuning.sample_candidates('gradient_boosting', 5, random_state=1)
+        assert first == tuning.sample_candidates('gradient_boosting', 5, random_state=1)
+        assert len(first) == 5
+        for model_type in tuning.SEARCH_SPACES:
+            # Every space is valid for its backend
+            for params in tuning.sample_candidates(model_type, 3):
+                CFBModel(model_type=model_type, params=params)
+        with pytest.raises(ValueError):
+            tuning.sample_candidates('xgboost')
+
+    def test_search_halves_and_resumes_from_log(self, tmp_path):
+        X, y, seasons = _seasons_data()
+        log_path = str(tmp_path / 'trials.jsonl')
+        kwargs = dict(model_type='random_forest', n_candidates=9, eta=3, n_folds=3, space=SMALL_SPACE,
+                      max_workers=1, log_path=log_path, cache_dir=str(tmp_path / 'cache'))
+
+        profile = tuning.successive_halving(X, y, seasons, **kwargs)
+        assert [rung['candidates'] for rung in profile['rungs']] == [9, 3]
+        assert profile['seasons'] == [2022, 2021, 2020]
+        with open(log_path) as f:
+            lines = f.readlines()
+        # 9 candidates on one season, then the best 3 on the other two
+        assert len(lines) == 9 + 3 * 2
+
+        # A rerun (e.g. after an interruption) reuses every logged trial
+        with open(log_path, 'a') as f:
+            f.write('{"truncated')
+        assert tuning.successive_halving(X, y, seasons, **kwargs)['params'] == profile['params']
+        with open(log_path) as f:
+            assert len(f.readlines()) == len(lines) + 1
+
+    def test_logged_trials_are_not_reused_for_other_data(self, tmp_path):
+        X, y, seasons = _seasons_data()
+        log_path = str(tmp_path / 'trials.jsonl')
+        kwargs = dict(model_type='random_forest', n_candidates=3, eta=3, n_folds=1, space=SMALL_SPACE,
+                      max_workers=1, log_path=log_path, cache_dir=str(tmp_path / 'cache'))
+        tuning.successive_halving(X, y, seasons, **kwargs)
+
+        # Same seasons and candidates, but the latest season has more games
+        X_more, y_more, seasons_more = _seasons_data(seed=1)
+        X_more = pd.concat([X_more, X_more.tail(40)], ignore_index=True)
+        y_more = pd.concat([y_more, y_more.tail(40)], ignore_index=True)
+        seasons_more = np.concatenate([seasons_more, seasons_more[-40:]])
+        profile = tuning.successive_halving(X_more, y_more, seasons_more, **kwargs)
+
+        with open(log_path) as f:
+            trials = [json.loads(line) for line in f]
+        assert len(trials) == 6 and len({trial['fold'] for trial in trials}) == 2
+        assert profile['n_trials'] == 3
+        assert {trial['n_games'] for trial in trials[3:]} == {160}
+
+    def test_profile_round_trip_builds_model(self, tmp_path):
+        X, y, seasons = _seasons_data()
+        profile = tuning.successive_halving(X, y, seasons, model_type='random_forest', n_candidates=3,
+                                            n_folds=1, space=SMALL_SPACE, max_workers=1,
+                                            log_path=str(tmp_path / 'trials.jsonl'),
+                                            cache_dir=str(tmp_path / 'cache'))
+        path = tuning.save_profile(profile, str(tmp_path / 'profiles' / 'random_forest.json'))
+        with open(path) as f:
+            assert json.load(f)['metric'] == 'log_loss'
+
+        model_type, params = tuning.load_profile(path)
+        model = CFBModel(model_type=model_type, params=params)
+        assert model.model.get_params()['max_depth'] == profile['params']['max_depth']
+        model.train(X, y, n_jobs=1)
+
+        bad = tmp_path / 'bad.json'
+        bad.write_text('{}')
+        with pytest.raises(ValueError):
+            tuning.load_profile(str(bad))
+
+    def test_unknown_params_raise(self):
+        with pytest.raises(ValueError):
+            CFBModel(model_type='random_forest', params={'learning_rate': 0.1})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
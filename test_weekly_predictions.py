@@ -132,7 +132,7 @@ def main():
     print(f"  ✓ Target distribution: {y.sum()} home wins, {len(y) - y.sum()} away wins")
     
     model = CFBModel(model_type="random_forest")
-    metrics = model.train(X, y, test_size=0.25)
+    metrics = model.train(X, y)
     
     print(f"\n  Training Accuracy: {metrics['train_accuracy']:.2%}")
     print(f"  Test Accuracy: {metrics['test_accuracy']:.2%}")
@@ -213,5 +213,62 @@ def main():
     print("="*70)
 
 
+class _SeasonFetcher:
+    """Completed synthetic seasons in the API's shape"""
+    
+    def __init__(self, home_always_wins_week=None):
+        self.home_always_wins_week = home_always_wins_week
+        self.seasons = []
+    
+    def get_games(self, year, week=None, season_type="regular"):
+        self.seasons.append(year)
+        rng = np.random.RandomState(year)
+        teams = [f"Team {i}" for i in range(20)]
+        rows = []
+        for week_number in range(1, 9):
+            order = rng.permutation(teams)
+            for home, away in zip(order[::2], order[1::2]):
+                home_points, away_points = rng.randint(0, 50, 2)
+                if week_number == self.home_always_wins_week:
+                    home_points, away_points = 40, 10
+                rows.append({'homeTeam': home, 'awayTeam': away, 'week': week_number,
+                             'homePoints': home_points, 'awayPoints': away_points})
+        return pd.DataFrame(rows)
+    
+    def get_team_stats(self, year):
+        rng = np.random.RandomState(year)
+        return pd.DataFrame({'team': [f"Team {i}" for i in range(20)],
+                             'totalYards': rng.randint(3000, 6000, 20),
+                             'netPassingYards': rng.randint(1500, 3500, 20),
+                             'rushingYards': rng.randint(1000, 2500, 20)})
+    
+    def get_team_talent(self, year):
+        raise RuntimeError("talent not available")
+
+
+def test_refresh_fetches_history_for_single_outcome_week(tmp_path):
+    """A week with only home wins forces a full retrain, which needs history"""
+    from argparse import Namespace
+    from run_weekly_predictions import refresh_model
+    
+    fetcher = _SeasonFetcher(home_always_wins_week=5)
+    preprocessor = CFBPreprocessor()
+    X, y = preprocessor.create_training_data(preprocessor.prepare_game_features(
+        fetcher.get_games(2024), fetcher.get_team_stats(2024)))
+    model = CFBModel()
+    model.train(X, y, cv=3, n_jobs=1)
+    model.metrics['test_accuracy'] = 0.0  # no drift
+    
+    args = Namespace(model_path=str(tmp_path / 'cfb_model.pkl'), year=2025, rolling_features=False,
+                     refresh_policy='incremental', train_year=2024, artifact_dir=None)
+    with open(f"{args.model_path}.refresh.json", 'w') as f:
+        f.write('{"year": 2025, "week": 4, "baseline_accuracy": 0.0}')
+    fetcher.seasons.clear()
+    
+    result = refresh_model(args, fetcher, preprocessor, model, week=6)
+    assert result['mode'] == 'full'
+    assert 2024 in fetcher.seasons
+
+
 if __name__ == "__main__":
     main()
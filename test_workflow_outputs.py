@@ -35,7 +35,7 @@ def test_model_outputs():
     # Train model
     print("\n2. Training model...")
     model = CFBModel(model_type="random_forest")
-    metrics = model.train(X_train, y_train, test_size=0.3)
+    metrics = model.train(X_train, y_train)
     print(f"   ✓ Model trained successfully")
     print(f"   ✓ Training accuracy: {metrics['train_accuracy']:.2%}")
     print(f"   ✓ Test accuracy: {metrics['test_accuracy']:.2%}")
@@ -0,0 +1,251 @@
+"""
+Flat-array inference for fitted tree ensembles
+
+sklearn's predict_proba pays a fixed per-call cost (input validation,
+per-tree dispatch, thread pool start-up) that dominates on the tiny batches
+used by season simulations and matchup grids. compile_ensemble() copies every
+tree of a fitted random forest or gradient boosting classifier into one set
+of contiguous node arrays, and CompiledEnsemble evaluates all trees for all
+rows together, one tree level per step.
+"""
+
+import logging
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit, softmax
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FOREST = "forest"
+BOOSTING = "boosting"
+
+
+class CompiledEnsemble:
+    """
+    Tree ensemble stored as flat node arrays
+
+    Node i of the combined ensemble splits on feature[i] at threshold[i] and
+    continues at children[i, 0] (x <= threshold, or missing values when
+    missing_left[i]) or children[i, 1]. Leaves point back at themselves with
+    an infinite threshold, so every row can take exactly max_depth steps.
+
+    For forests, value[k] holds every leaf's normalized probability of class
+    k (one contiguous row per class), and the trees are averaged. For
+    boosting, it holds each leaf's raw score for tree_class[t], which is
+    scaled by learning_rate and added to init_raw.
+    """
+
+    def __init__(self, kind: str, classes: np.ndarray, roots: np.ndarray,
+                 feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 missing_left: np.ndarray, value: np.ndarray, max_depth: int,
+                 feature_names=None, tree_class=None, init_raw=None,
+                 learning_rate: float = 1.0):
+        if kind not in (FOREST, BOOSTING):
+            raise ValueError(f"Unknown ensemble kind: {kind}")
+        self.kind = kind
+        self.classes_ = np.asarray(classes)
+        # intp indices avoid a conversion on every np.take
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.children = np.asarray(children, dtype=np.intp)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.max_depth = int(max_depth)
+        self.feature_names = None if feature_names is None else [str(f) for f in feature_names]
+        self.tree_class = None if tree_class is None else np.asarray(tree_class, dtype=np.intp)
+        self.init_raw = None if init_raw is None else np.asarray(init_raw, dtype=np.float64)
+        self.learning_rate = float(learning_rate)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def feature_names_in_(self) -> np.ndarray:
+        """Feature names in training order (same attribute as sklearn's)"""
+        if self.feature_names is None:
+            raise AttributeError("Ensemble was compiled without feature names")
+        return np.array(self.feature_names, dtype=object)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Node arrays and scalars keyed by constructor argument (for saving)"""
+        arrays = {
+            'kind': np.array(self.kind), 'classes': self.classes_, 'roots': self.roots,
+            'feature': self.feature, 'threshold': self.threshold, 'children': self.children,
+            'missing_left': self.missing_left, 'value': self.value,
+            'max_depth': np.array(self.max_depth), 'learning_rate': np.array(self.learning_rate),
+        }
+        if self.feature_names is not None:
+            arrays['feature_names'] = np.array(self.feature_names)
+        if self.tree_class is not None:
+            arrays['tree_class'] = self.tree_class
+        if self.init_raw is not None:
+            arrays['init_raw'] = self.init_raw
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> 'CompiledEnsemble':
+        """Rebuild from the output of arrays() (or an npz file loaded from it)"""
+        scalars = {'kind': str, 'max_depth': int, 'learning_rate': float}
+        kwargs = {name: (scalars[name](arrays[name][()]) if name in scalars else arrays[name])
+                  for name in arrays}
+        return cls(**kwargs)
+
+    def _leaves(self, X) -> np.ndarray:
+        """Leaf node reached in every tree, shape (n_rows, n_trees)"""
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None and list(X.columns) != self.feature_names:
+                missing = [f for f in self.feature_names if f not in X.columns]
+                if missing:
+                    raise ValueError(f"Missing feature columns: {missing}")
+                X = X[self.feature_names]
+            X = X.to_numpy(dtype=np.float32)
+        # sklearn compares float32 inputs, so float32 matches it exactly
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"X must be 2-dimensional. Got shape {X.shape}")
+
+        # One flat slot per (row, tree); np.take on 1-d arrays is much
+        # cheaper than 2-d fancy indexing
+        n_rows, n_features = X.shape
+        values = X.ravel()
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        node = np.tile(self.roots, n_rows)
+        children = self.children.ravel()
+        check_missing = self.missing_left.any() and np.isnan(values).any()
+        for _ in range(self.max_depth):
+            x = np.take(values, row_offset + np.take(self.feature, node))
+            go_left = x <= np.take(self.threshold, node)
+            if check_missing:
+                go_left |= np.isnan(x) & np.take(self.missing_left, node)
+            node = np.take(children, 2 * node + ~go_left)
+        return node.reshape(n_rows, self.n_trees)
+
+    def decision_function(self, X) -> np.ndarray:
+        """Raw boosting scores (log-odds for binary targets)"""
+        if self.kind != BOOSTING:
+            raise AttributeError("decision_function is only available for boosting ensembles")
+        leaves = self._leaves(X)
+        raw = np.tile(self.init_raw, (leaves.shape[0], 1))
+        for k in range(raw.shape[1]):
+            trees = leaves if raw.shape[1] == 1 else leaves[:, self.tree_class == k]
+            raw[:, k] += self.learning_rate * np.take(self.value, trees).sum(axis=1)
+        return raw[:, 0] if raw.shape[1] == 1 else raw
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities, columns ordered as classes_"""
+        if self.kind == FOREST:
+            leaves = self._leaves(X)
+            return np.column_stack([np.take(v, leaves).sum(axis=1)
+                                    for v in self.value]) / self.n_trees
+        raw = self.decision_function(X)
+        if raw.ndim == 1:
+            proba = expit(raw)
+            return np.column_stack([1 - proba, proba])
+        return softmax(raw, axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        """Most probable class for every row"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _float32_threshold(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 not above each float64 threshold
+
+    For any float32 x, x <= result holds exactly when x <= threshold, so the
+    evaluator can compare in float32 without changing a single split.
+    """
+    rounded = threshold.astype(np.float32)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def _flatten_trees(trees, normalize: bool):
+    """Concatenate sklearn Tree objects into global node arrays"""
+    roots, feature, threshold, children, missing_left, value = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        n = tree.node_count
+        nodes = np.arange(n) + offset
+        leaf = tree.children_left == -1
+        roots.append(offset)
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(np.where(leaf, np.inf, _float32_threshold(tree.threshold)))
+        children.append(np.column_stack([np.where(leaf, nodes, tree.children_left + offset),
+                                         np.where(leaf, nodes, tree.children_right + offset)]))
+        missing = getattr(tree, 'missing_go_to_left', None)
+        missing_left.append(np.zeros(n, dtype=bool) if missing is None else missing.astype(bool) & ~leaf)
+        leaf_value = tree.value[:, 0, :]
+        if normalize:
+            totals = leaf_value.sum(axis=1, keepdims=True)
+            leaf_value = leaf_value / np.where(totals == 0, 1.0, totals)
+        value.append(leaf_value)
+        max_depth = max(max_depth, tree.max_depth)
+        offset += n
+    return {
+        'roots': np.array(roots), 'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold), 'children': np.concatenate(children),
+        'missing_left': np.concatenate(missing_left), 'value': np.concatenate(value),
+        'max_depth': max_depth,
+    }
+
+
+def compile_ensemble(model) -> CompiledEnsemble:
+    """
+    Flatten a fitted ensemble into a CompiledEnsemble
+
+    Args:
+        model: Fitted CFBModel, RandomForestClassifier or
+            GradientBoostingClassifier
+
+    Returns:
+        CompiledEnsemble whose predict_proba matches the model's
+
+    Raises:
+        ValueError: If the model is unfitted or of an unsupported type
+    """
+    estimator = getattr(model, 'model', model)
+    if not hasattr(estimator, 'estimators_'):
+        raise ValueError("Model must be fitted before it can be compiled")
+    feature_names = getattr(estimator, 'feature_names_in_', None)
+
+    if isinstance(estimator, RandomForestClassifier):
+        if getattr(estimator, 'n_outputs_', 1) != 1:
+            raise ValueError("Multi-output forests are not supported")
+        arrays = _flatten_trees([tree.tree_ for tree in estimator.estimators_], normalize=True)
+        arrays['value'] = np.ascontiguousarray(arrays['value'].T)
+        compiled = CompiledEnsemble(FOREST, estimator.classes_, feature_names=feature_names, **arrays)
+
+    elif isinstance(estimator, GradientBoostingClassifier):
+        if estimator.init_ != 'zero' and not hasattr(estimator.init_, 'class_prior_'):
+            raise ValueError("Only the default (prior) or zero init estimator can be compiled")
+        stages = estimator.estimators_
+        arrays = _flatten_trees([tree.tree_ for tree in stages.ravel()], normalize=False)
+        arrays['value'] = arrays['value'][:, 0]
+        compiled = CompiledEnsemble(
+            BOOSTING, estimator.classes_, feature_names=feature_names,
+            tree_class=np.tile(np.arange(stages.shape[1]), stages.shape[0]),
+            init_raw=np.zeros(stages.shape[1]), learning_rate=estimator.learning_rate, **arrays)
+        # The init prediction is constant; recover it from any one row
+        probe = np.zeros((1, estimator.n_features_in_), dtype=np.float32)
+        if feature_names is not None:
+            probe = pd.DataFrame(probe, columns=feature_names)
+        init = np.atleast_1d(estimator.decision_function(probe)[0]) - np.atleast_1d(
+            compiled.decision_function(probe)[0])
+        compiled.init_raw = init
+
+    else:
+        raise ValueError(f"Unsupported model type: {type(estimator).__name__}")
+
+    logger.info(f"Compiled {compiled.n_trees} trees ({len(compiled.feature)} nodes, "
+                f"max depth {compiled.max_depth})")
+    return compiled
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter tuning with successive halving over season folds
+
+Each validation fold is one season, trained on every earlier season.
+Candidates are drawn from a per-backend search space and run in rungs:
+the first rung scores every candidate on the most recent season only.
+Each later rung keeps the best 1/eta of the candidates and scores them on
+eta times as many seasons. That way most of the fitting budget goes to
+configurations that already look good.
+
+Every (candidate, season) fit is one trial. Trials run on a process pool,
+and each one is appended to a JSONL log as soon as it finishes, so an
+interrupted search resumes where it stopped. Trials are matched on a hash
+of the data and the fold boundaries too, so a log written for other data
+is never reused. The winner is written as a
+profile:
+
+    profiles/<model type>.json   {"model_type": ..., "params": {...}, ...}
+
+Load it with load_profile() or the --profile option of the training
+scripts.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform, randint, uniform
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss
+from sklearn.model_selection import ParameterSampler
+
+import artifact
+import config
+from backtest import _fold_data, _init_worker, cache_feature_matrix, load_model_pack
+from model import CFBModel
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Search spaces by CFBModel model type (set_params names; lists are sampled
+# uniformly, scipy distributions with rvs)
+SEARCH_SPACES: Dict[str, Dict[str, Any]] = {
+    "random_forest": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [6, 8, 10, 14, None],
+        "min_samples_split": [2, 5, 10, 20],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": ["sqrt", 0.3, 0.5],
+    },
+    "gradient_boosting": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [2, 3, 4, 5],
+        "learning_rate": loguniform(0.01, 0.3),
+        "subsample": uniform(0.6, 0.4),
+        "min_samples_leaf": [1, 5, 20],
+    },
+    "hist_gradient_boosting": {
+        "learning_rate": loguniform(0.01, 0.3),
+        "max_leaf_nodes": randint(8, 64),
+        "min_samples_leaf": [10, 20, 50, 100],
+        "l2_regularization": loguniform(1e-3, 10.0),
+        "max_features": [0.5, 0.8, 1.0],
+    },
+    "logistic_regression": {
+        "classifier__alpha": loguniform(1e-5, 1e-1),
+        "classifier__penalty": ["l2", "l1", "elasticnet"],
+    },
+}
+
+# Metrics where larger is better; the rest are minimized
+_MAXIMIZE = {"accuracy"}
+
+
+def _jsonable(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Sampled values as plain JSON types (numpy scalars -> Python)"""
+    return {name: value.item() if isinstance(value, np.generic) else value
+            for name, value in params.items()}
+
+
+def candidate_key(model_type: str, params: Dict[str, Any]) -> str:
+    """Stable id of a configuration, used to match trials in the log"""
+    payload = json.dumps({'model_type': model_type, 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def fold_key(data_hash: str, fold: Dict[str, int]) -> str:
+    """Stable id of a validation fold of a dataset, used to match trials in the log"""
+    payload = json.dumps({'data': data_hash, 'fold': fold}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def sample_candidates(model_type: str, n_candidates: int = config.TUNING_N_CANDIDATES,
+                      space: Optional[Dict[str, Any]] = None,
+                      random_state: int = config.RANDOM_STATE) -> List[Dict[str, Any]]:
+    """
+    Draw distinct configurations from a search space
+
+    The draw only depends on random_state, so a resumed search sees the same
+    candidates as the run it continues.
+
+    Args:
+        model_type: CFBModel model type
+        n_candidates: Configurations to draw (fewer if the space is smaller)
+        space: Search space (default: SEARCH_SPACES[model_type])
+        random_state: Seed for the draw
+
+    Returns:
+        List of parameter dicts
+    """
+    if space is None:
+        if model_type not in SEARCH_SPACES:
+            raise ValueError(f"Unknown model type: {model_type}")
+        space = SEARCH_SPACES[model_type]
+    candidates, seen = [], set()
+    for params in ParameterSampler(space, n_iter=n_candidates, random_state=random_state):
+        params = _jsonable(params)
+        key = candidate_key(model_type, params)
+        if key not in seen:
+            seen.add(key)
+            candidates.append(params)
+    return candidates
+
+
+def season_folds(seasons: np.ndarray, n_folds: int = config.TUNING_N_FOLDS) -> List[Dict[str, int]]:
+    """
+    Validation folds for chronologically sorted rows, most recent season first
+
+    Args:
+        seasons: Season of every row, sorted ascending
+        n_folds: Number of most recent seasons to validate on; each needs at
+            least one earlier season to train on
+
+    Returns:
+        List of dicts with season, train_stop, test_start and test_stop row
+        positions (the training rows are the prefix before test_start)
+    """
+    unique = np.unique(seasons)
+    folds = []
+    for season in unique[1:][::-1][:n_folds]:
+        start = int(np.searchsorted(seasons, season, side='left'))
+        stop = int(np.searchsorted(seasons, season, side='right'))
+        folds.append({'season': int(season), 'train_stop': start, 'test_start': start, 'test_stop': stop})
+    return folds
+
+
+def rung_schedule(n_candidates: int, n_folds: int, eta: int = config.TUNING_ETA,
+                  min_folds: int = 1) -> List[Tuple[int, int]]:
+    """
+    (candidates, folds) per rung of successive halving
+
+    Candidates shrink and folds grow by eta per rung until one candidate is
+    left or every fold is used.
+    """
+    if eta < 2:
+        raise ValueError(f"eta must be at least 2. Got {eta}")
+    schedule = []
+    candidates, folds = n_candidates, min(min_folds, n_folds)
+    while True:
+        schedule.append((candidates, folds))
+        if candidates <= 1 or folds >= n_folds:
+            return schedule
+        candidates, folds = max(1, candidates // eta), min(n_folds, folds * eta)
+
+
+def read_trials(log_path: str) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """
+    Completed trials from a log, keyed by (candidate key, fold key)
+
+    A line truncated by an interrupted write is ignored; that trial just
+    runs again. So are trials logged without a fold key.
+    """
+    trials = {}
+    if os.path.exists(log_path):
+        with open(log_path) as f:
+            for line in f:
+                try:
+                    trial = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                trials[(trial['key'], trial.get('fold'))] = trial
+    return trials
+
+
+def _run_trial(model_type: str, params: Dict[str, Any], fold: Dict[str, int]) -> Dict[str, Any]:
+    """Fit one candidate on the seasons before a fold and score that season"""
+    X, y = _fold_data['X'], _fold_data['y']
+    X_train, y_train = X[:fold['train_stop']], y[:fold['train_stop']]
+    X_test, y_test = X[fold['test_start']:fold['test_stop']], y[fold['test_start']:fold['test_stop']]
+
+    start = time.time()
+    estimator = CFBModel(model_type=model_type, params=params).model
+    estimator.fit(X_train, y_train)
+    proba = estimator.predict_proba(X_test)[:, list(estimator.classes_).index(1)]
+
+    return {
+        'model_type': model_type,
+        'key': candidate_key(model_type, params),
+        'params': params,
+        'season': fold['season'],
+        'fold': fold['key'],
+        'n_train': len(y_train),
+        'n_games': len(y_test),
+        'accuracy': accuracy_score(y_test, (proba > 0.5).astype(int)),
+        'log_loss': log_loss(y_test, np.clip(proba, 1e-15, 1 - 1e-15), labels=[0, 1]),
+        'brier': brier_score_loss(y_test, proba, pos_label=1),
+        'seconds': round(time.time() - start, 3),
+    }
+
+
+def _score(trials: Dict[Tuple[str, int], Dict[str, Any]], key: str,
+           folds: Sequence[Dict[str, int]], metric: str) -> float:
+    """Game-weighted metric of a candidate over the given folds"""
+    rows = [trials[(key, fold['key'])] for fold in folds]
+    return float(np.average([row[metric] for row in rows], weights=[row['n_games'] for row in rows]))
+
+
+def successive_halving(X: pd.DataFrame, y: pd.Series, seasons: Iterable[int],
+                       model_type: str = "random_forest",
+                       n_candidates: int = config.TUNING_N_CANDIDATES,
+                       eta: int = config.TUNING_ETA,
+                       n_folds: int = config.TUNING_N_FOLDS,
+                       metric: str = config.TUNING_METRIC,
+                       space: Optional[Dict[str, Any]] = None,
+                       max_workers: Optional[int] = None,
+                       log_path: Optional[str] = None,
+                       random_state: int = config.RANDOM_STATE,
+                       cache_dir: str = config.BACKTEST_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Search a backend's hyperparameters with successive halving
+
+    Args:
+        X: Numeric feature matrix (one row per game)
+        y: Binary target aligned with X (1 = home win)
+        seasons: Season of every row
+        model_type: CFBModel model type to tune
+        n_candidates: Configurations in the first rung
+        eta: Halving rate
+        n_folds: Most recent seasons used as validation folds
+        metric: "log_loss", "brier" or "accuracy"
+        space: Search space (default: SEARCH_SPACES[model_type])
+        max_workers: Worker processes (default: all cores; 1 runs in-process)
+        log_path: Trial log; existing trials for the same data are reused (default:
+            TUNING_DIR/<model_type>_trials.jsonl)
+        random_state: Seed for drawing candidates
+        cache_dir: Directory for the cached feature matrix (see backtest)
+
+    Returns:
+        Profile dict with model_type, params, metric, score (over all the
+        folds the winner was scored on), seasons and rungs
+    """
+    if X.empty:
+        raise ValueError("X cannot be empty")
+    if len(X) != len(y):
+        raise ValueError(f"X and y must have same length. Got X={len(X)}, y={len(y)}")
+    if metric not in ('log_loss', 'brier', 'accuracy'):
+        raise ValueError(f"Unknown metric: {metric}")
+
+    data = X.assign(season=np.asarray(seasons), _target=np.asarray(y))
+    data = data.sort_values('season', kind='stable').reset_index(drop=True)
+    folds = season_folds(data['season'].to_numpy(), n_folds)
+    if not folds:
+        raise ValueError("Tuning needs at least two seasons")
+
+    features = data[list(X.columns)].astype(np.float32)
+    x_path, y_path = cache_feature_matrix(features, data['_target'], cache_dir)
+    data_hash = artifact.data_hash(features, data['_target'])
+    for fold in folds:
+        fold['key'] = fold_key(data_hash, fold)
+    candidates = sample_candidates(model_type, n_candidates, space, random_state)
+    keys = [candidate_key(model_type, params) for params in candidates]
+    schedule = rung_schedule(len(candidates), len(folds), eta)
+
+    if log_path is None:
+        log_path = os.path.join(config.TUNING_DIR, f"{model_type}_trials.jsonl")
+    os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+    trials = read_trials(log_path)
+    sign = -1 if metric in _MAXIMIZE else 1
+
+    logger.info(f"Tuning {model_type}: {len(candidates)} candidates, rungs "
+                f"{[n for n, _ in schedule]} on up to {len(folds)} seasons")
+    pool = None
+    if max_workers != 1:
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                   initargs=(x_path, y_path))
+    else:
+        _init_worker(x_path, y_path)
+
+    survivors = list(range(len(candidates)))
+    rungs = []
+    try:
+        with open(log_path, 'a') as log:
+            for rung, (n_keep, n_rung_folds) in enumerate(schedule):
+                rung_folds = folds[:n_rung_folds]
+                if rung > 0:
+                    survivors = survivors[:n_keep]
+                todo = [(i, fold) for i in survivors for fold in rung_folds
+                        if (keys[i], fold['key']) not in trials]
+                logger.info(f"Rung {rung}: {len(survivors)} candidates x {n_rung_folds} seasons "
+                            f"({len(todo)} new trials)")
+
+                if pool is None:
+                    results = (_run_trial(model_type, candidates[i], fold) for i, fold in todo)
+                else:
+                    futures = [pool.submit(_run_trial, model_type, candidates[i], fold) for i, fold in todo]
+                    results = (future.result() for future in as_completed(futures))
+                for trial in results:
+                    trials[(trial['key'], trial['fold'])] = trial
+                    log.write(json.dumps(trial) + "\n")
+                    log.flush()
+
+                scores = {i: _score(trials, keys[i], rung_folds, metric) for i in survivors}
+                survivors.sort(key=lambda i: sign * scores[i])
+                rungs.append({'candidates': len(survivors), 'seasons': [f['season'] for f in rung_folds],
+                              'best_score': scores[survivors[0]]})
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best = survivors[0]
+    key_set, fold_keys = set(keys), {fold['key'] for fold in folds}
+    return {
+        'model_type': model_type,
+        'params': candidates[best],
+        'metric': metric,
+        'score': rungs[-1]['best_score'],
+        'seasons': rungs[-1]['seasons'],
+        'rungs': rungs,
+        'n_trials': sum(1 for key, fold in trials if key in key_set and fold in fold_keys),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def profile_path(model_type: str, profile_dir: str = config.PROFILE_DIR) -> str:
+    """Default location of a model type's profile"""
+    return os.path.join(profile_dir, f"{model_type}.json")
+
+
+def save_profile(profile: Dict[str, Any], path: Optional[str] = None) -> str:
+    """
+    Write a tuning result as a profile
+
+    Returns:
+        The profile path
+    """
+    path = path or profile_path(profile['model_type'])
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved {profile['model_type']} profile to {path}")
+    return path
+
+
+def load_profile(path: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Read a profile
+
+    Returns:
+        Tuple of (model_type, params), ready for
+        CFBModel(model_type=model_type, params=params)
+
+    Raises:
+        FileNotFoundError: If the profile doesn't exist
+        ValueError: If the file is not a profile
+    """
+    with open(path) as f:
+        profile = json.load(f)
+    if 'model_type' not in profile or 'params' not in profile:
+        raise ValueError(f"Not a tuning profile: {path}")
+    return profile['model_type'], profile['params']
+
+
+def main():
+    """Tune CFBModel backends on the bundled model pack from the command line"""
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search over season folds")
+    parser.add_argument("--model-type", action="append", choices=sorted(SEARCH_SPACES),
+                        help="Backend to tune (repeatable; default: all)")
+    parser.add_argument("--start", type=int, default=2016, help="First season of data")
+    parser.add_argument("--end", type=int, default=2024, help="Last season of data")
+    parser.add_argument("--candidates", type=int, default=config.TUNING_N_CANDIDATES,
+                        help="Configurations in the first rung")
+    parser.add_argument("--eta", type=int, default=config.TUNING_ETA, help="Halving rate")
+    parser.add_argument("--folds", type=int, default=config.TUNING_N_FOLDS,
+                        help="Most recent seasons to validate on")
+    parser.add_argument("--metric", default=config.TUNING_METRIC, choices=["log_loss", "brier", "accuracy"])
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--tuning-dir", default=config.TUNING_DIR, help="Directory for the trial logs")
+    parser.add_argument("--profile-dir", default=config.PROFILE_DIR, help="Directory for the winning profiles")
+    args = parser.parse_args()
+
+    df, feature_cols, target = load_model_pack(range(args.start, args.end + 1))
+    for model_type in args.model_type or list(SEARCH_SPACES):
+        profile = successive_halving(
+            df[feature_cols], target, df['season'], model_type=model_type,
+            n_candidates=args.candidates, eta=args.eta, n_folds=args.folds, metric=args.metric,
+            max_workers=args.workers,
+            log_path=os.path.join(args.tuning_dir, f"{model_type}_trials.jsonl"))
+        path = save_profile(profile, profile_path(model_type, args.profile_dir))
+        print(f"{model_type}: {args.metric} {profile['score']:.4f} on {profile['seasons']} "
+              f"with {profile['params']} -> {path}")
+
+
+if __name__ == "__main__":
+    main()
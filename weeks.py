@@ -0,0 +1,64 @@
+"""
+Season calendar helpers shared by the prediction scripts
+
+Only uses the standard library so the command-line scripts can import it
+before parsing their arguments.
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+
+
+def get_current_week(year, start_date=None):
+    """
+    Calculate the current CFB week based on the current date
+
+    Args:
+        year: Season year
+        start_date: Optional start date of the season (defaults to the last
+            Saturday of August, when Week 0 games are played)
+
+    Returns:
+        Current week number (0-15 for regular season, where 0 is "Week 0")
+    """
+    if start_date is None:
+        # Some years have Week 0 games the Saturday before Labor Day, so the
+        # season starts on the last Saturday of August
+        season_start = datetime(year, 8, 24)
+        while season_start.weekday() != 5:  # 5 = Saturday
+            season_start += timedelta(days=1)
+    else:
+        season_start = start_date
+
+    # Calculate weeks since season start
+    current_date = datetime.now()
+    days_since_start = (current_date - season_start).days
+    current_week = (days_since_start // 7) + 1
+
+    # Clamp to valid week range (0-15 for regular season)
+    return max(0, min(current_week, 15))
+
+
+def parse_range(text: str) -> List[int]:
+    """
+    Parse a season or week selection such as "2024", "2022-2024" or "1-4,8"
+
+    Raises:
+        ValueError: For malformed or descending ranges
+    """
+    values = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, stop = part.partition('-')
+        try:
+            start, stop = int(start), int(stop) if sep else int(start)
+        except ValueError:
+            raise ValueError(f"Invalid range: {text!r}") from None
+        if stop < start:
+            raise ValueError(f"Range {part!r} runs backwards")
+        values.extend(range(start, stop + 1))
+    if not values:
+        raise ValueError(f"Empty range: {text!r}")
+    return sorted(set(values))